@@ -0,0 +1,98 @@
+"""
+AI review cost against the local fake LLM server: one request per added
+line (the shape of the old AIAnalyzer) vs token-budgeted batches at a few
+concurrency levels, and a rebased re-review served from the response
+cache. The server runs in-process over ASGI with a fixed per-request
+latency plus a per-token cost.
+
+    PYTHONPATH=src python benchmarks/bench_ai.py --files 20 --lines 40 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from codemate.analyzers.ai_analyzer import AIAnalyzer
+from codemate.cache import TieredCache
+from codemate.llm.client import HTTPBackend
+from codemate.llm.fake_server import create_app
+from codemate.llm.prompt import SYSTEM_PROMPT
+
+
+def make_files(files: int, lines: int, start: int = 1):
+    changed_files = []
+    for i in range(files):
+        body = [f"+    value_{n} = compute(item_{n}, factor={n}, module={i})  # TODO check" if n % 10 == 0
+                else f"+    value_{n} = compute(item_{n}, factor={n}, module={i})" for n in range(lines)]
+        patch = f"@@ -{start - 1},0 +{start},{lines} @@\n" + "\n".join(body) + "\n"
+        changed_files.append({"filename": f"pkg/module_{i}.py", "status": "added", "patch": patch})
+    return changed_files
+
+
+def backend_for(app):
+    return HTTPBackend("http://fake-llm/v1", "gpt-4", transport=httpx.ASGITransport(app=app))
+
+
+def per_line(changed_files, latency, tokens_per_second, concurrency):
+    app = create_app(latency, tokens_per_second)
+    backend = backend_for(app)
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(path, line):
+            async with semaphore:
+                await backend.complete(SYSTEM_PROMPT, f"### {path}\n{line}", 256)
+
+        await asyncio.gather(*(
+            one(f["filename"], line) for f in changed_files for line in f["patch"].splitlines()[1:]
+        ))
+        await backend.aclose()
+
+    t0 = time.perf_counter()
+    asyncio.run(main())
+    return {"seconds": round(time.perf_counter() - t0, 3), "requests": app.state.stats["requests"],
+            "prompt_tokens": app.state.stats["prompt_tokens"]}
+
+
+def batched(changed_files, latency, tokens_per_second, concurrency, cache=None):
+    app = create_app(latency, tokens_per_second)
+    analyzer = AIAnalyzer(backend_for(app), model="gpt-4", concurrency=concurrency, cache=cache)
+    t0 = time.perf_counter()
+    issues = analyzer.analyze(".", changed_files)
+    return {"seconds": round(time.perf_counter() - t0, 3), "requests": app.state.stats["requests"],
+            "max_in_flight": app.state.stats["max_in_flight"], "prompt_tokens": app.state.stats["prompt_tokens"],
+            "issues": len(issues)}
+
+
+def run(files: int = 20, lines: int = 40, latency: float = 0.05, tokens_per_second: float = 50000.0) -> dict:
+    changed_files = make_files(files, lines)
+    results = {"benchmark": "ai", "files": files, "added_lines": files * lines,
+               "latency": latency, "tokens_per_second": tokens_per_second}
+    results["per_line_concurrency_4"] = per_line(changed_files, latency, tokens_per_second, 4)
+    for concurrency in (1, 4, 8):
+        results[f"batched_concurrency_{concurrency}"] = batched(changed_files, latency, tokens_per_second, concurrency)
+
+    # Review, then review the same PR rebased onto 50 new upstream lines
+    cache = TieredCache()
+    results["cached_first_review"] = batched(changed_files, latency, tokens_per_second, 4, cache)
+    rebased = make_files(files, lines, start=51)
+    results["cached_rebased_review"] = batched(rebased, latency, tokens_per_second, 4, cache)
+    results["cached_rebased_review"]["cache"] = cache.stats()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--lines", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=50000.0)
+    args = parser.parse_args()
+    print(json.dumps(run(args.files, args.lines, args.latency, args.tokens_per_second), indent=2))
+
+
+if __name__ == "__main__":
+    main()
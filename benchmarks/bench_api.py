@@ -0,0 +1,81 @@
+"""
+Dashboard API polling cost: a full review response vs a revalidation
+that hits the ETag (304), list pages from the response cache, and the
+JSON encoders on a large review body.
+
+    PYTHONPATH=src python benchmarks/bench_api.py --issues 5000
+"""
+import argparse
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+from codemate.store import ReviewStore
+from codemate.utils import serialize
+from codemate.webhook import server
+
+
+def timed(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return round((time.perf_counter() - t0) / repeat * 1000, 3)
+
+
+def run(issues: int = 5000, prs: int = 200, repeat: int = 50) -> dict:
+    store = ReviewStore()
+    server.get_review_store = lambda: store
+    rows = [{"path": f"pkg/m{n % 40}.py", "line": n, "severity": "error" if n % 7 == 0 else "warning",
+             "rule": f"E{n % 30:03d}", "message": f"line too long ({80 + n} > 79 characters)",
+             "suggestion": "wrap the line"} for n in range(issues)]
+    for n in range(prs):
+        store.record_review(f"org/repo{n % 10}", n, f"{n:040x}", rows[:20], 90)
+    store.record_review("org/big", 1, "f" * 40, rows, 10)
+    store.flush()
+
+    client = TestClient(server.app)
+    big = client.get("/api/pull-requests", params={"repo": "org/big"}).json()[0]["id"]
+    url = f"/api/reviews/{big}"
+    etag = client.get(url).headers["ETag"]
+    review = json.loads(client.get(url).content)
+
+    def uncached_review():
+        server.api_cache.clear()
+        client.get(url, headers={"Accept-Encoding": "identity"})
+
+    def uncached_list():
+        server.api_cache.clear()
+        client.get("/api/pull-requests")
+
+    gzip_size = client.get(url, headers={"Accept-Encoding": "gzip"}).num_bytes_downloaded
+    plain_size = len(client.get(url, headers={"Accept-Encoding": "identity"}).content)
+    results = {
+        "benchmark": "api",
+        "review_issues": issues,
+        "review_full_ms": timed(uncached_review, repeat),
+        "review_cached_body_ms": timed(lambda: client.get(url, headers={"Accept-Encoding": "identity"}), repeat),
+        "review_304_ms": timed(lambda: client.get(url, headers={"If-None-Match": etag}), repeat),
+        "review_bytes": plain_size,
+        "review_gzip_bytes": gzip_size,
+        "list_uncached_ms": timed(uncached_list, repeat),
+        "list_cached_ms": timed(lambda: client.get("/api/pull-requests"), repeat),
+        "encode_stdlib_ms": timed(lambda: json.dumps(review).encode(), repeat),
+        "encode_fast_ms": timed(lambda: serialize.dumps(review), repeat),
+        "fast_encoder": "orjson" if serialize.orjson is not None else "json",
+    }
+    store.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--issues", type=int, default=5000)
+    parser.add_argument("--prs", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.issues, args.prs, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Memory and time of diff parsing on large patches: the old unidiff
+list-of-dicts parser vs the compact FileDiff model.
+
+    PYTHONPATH=src python benchmarks/bench_diff.py --lines 200000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from unidiff import PatchSet
+
+from codemate.diff.model import parse_diff
+from codemate.diff.parser import parse_patch
+
+
+def make_patch(lines: int, hunk_size: int = 200) -> str:
+    """A lockfile-style diff: mostly added lines, some context and removals."""
+    out = ["diff --git a/package-lock.json b/package-lock.json",
+           "--- a/package-lock.json",
+           "+++ b/package-lock.json"]
+    old = new = 1
+    written = 0
+    while written < lines:
+        body = []
+        old_count = new_count = 0
+        for i in range(hunk_size):
+            n = written + i
+            if i % 10 == 0:
+                body.append(f' "context-{n}": true,')
+                old_count += 1
+                new_count += 1
+            elif i % 10 == 1:
+                body.append(f'-    "resolved": "https://registry.npmjs.org/pkg-{n}/-/pkg-{n}-1.0.0.tgz",')
+                old_count += 1
+            else:
+                body.append(f'+    "integrity": "sha512-{n:08d}abcdefghijklmnopqrstuvwxyz0123456789",')
+                new_count += 1
+        out.append(f"@@ -{old},{old_count} +{new},{new_count} @@")
+        out.extend(body)
+        old += old_count + 5
+        new += new_count + 5
+        written += hunk_size
+    return "\n".join(out) + "\n"
+
+
+def unidiff_parse(text: str):
+    """The parse_patch implementation this repo used before the compact model."""
+    mapped = []
+    for patched_file in PatchSet(text.splitlines(True)):
+        for hunk in patched_file:
+            for line in hunk:
+                mapped.append({
+                    "path": patched_file.path,
+                    "line": getattr(line, "target_line_no", None),
+                    "content": line.value.rstrip("\n"),
+                    "is_added": line.is_added,
+                    "is_removed": line.is_removed
+                })
+    return mapped
+
+
+def measure(fn, text):
+    # Time without tracemalloc, which slows allocation-heavy code a lot
+    gc.collect()
+    t0 = time.perf_counter()
+    result = fn(text)
+    elapsed = time.perf_counter() - t0
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = fn(text)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"seconds": round(elapsed, 3), "retained_mb": round(current / 1e6, 2), "peak_mb": round(peak / 1e6, 2)}
+
+
+def run(lines: int = 200000) -> dict:
+    text = make_patch(lines)
+    results = {
+        "benchmark": "diff",
+        "lines": lines,
+        "patch_mb": round(len(text) / 1e6, 2),
+        "unidiff_dicts": measure(unidiff_parse, text),
+        "compat_dicts": measure(parse_patch, text),
+        "compact": measure(parse_diff, text),
+    }
+
+    files = parse_diff(text)
+    t0 = time.perf_counter()
+    added = sum(1 for _ in files[0].iter_lines(added_only=True))
+    results["iter_added"] = {"seconds": round(time.perf_counter() - t0, 3), "lines": added}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.lines), indent=2))
+
+
+if __name__ == "__main__":
+    main()
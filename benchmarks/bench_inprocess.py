@@ -0,0 +1,82 @@
+"""
+Per-file cost of lint + security analysis: flake8/bandit subprocesses vs
+in-process pyflakes/pycodestyle/bandit sharing one parse per file.
+Runs on a real Python tree (the stdlib by default).
+
+    PYTHONPATH=src python benchmarks/bench_inprocess.py --files 300
+    PYTHONPATH=src python benchmarks/bench_inprocess.py --tree ~/src/project
+"""
+import argparse
+import json
+import os
+import sysconfig
+import time
+
+from codemate.analyzers.inprocess import InProcessLintAnalyzer, InProcessSecurityAnalyzer
+from codemate.analyzers.lint_analyzer import LintAnalyzer
+from codemate.analyzers.security_analyzer import SecurityAnalyzer
+from codemate.analyzers.source_cache import SourceCache
+
+SKIP_DIRS = {"site-packages", "test", "tests", "idle_test", "__pycache__"}
+
+
+def collect(root: str, limit: int):
+    changed_files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            if name.endswith(".py"):
+                rel = os.path.relpath(os.path.join(dirpath, name), root)
+                changed_files.append({"filename": rel, "status": "modified", "patch": "@@ -1 +1 @@\n+"})
+                if len(changed_files) >= limit:
+                    return changed_files
+    return changed_files
+
+
+def timed(analyzers, root, changed_files):
+    t0 = time.perf_counter()
+    issues = sum(len(a.analyze(root, changed_files)) for a in analyzers)
+    return time.perf_counter() - t0, issues
+
+
+def run(tree: str | None = None, files: int = 300) -> dict:
+    root = tree or sysconfig.get_paths()["stdlib"]
+    changed_files = collect(root, files)
+    count = len(changed_files)
+    size = sum(os.path.getsize(os.path.join(root, f["filename"])) for f in changed_files)
+
+    sub_seconds, sub_issues = timed([LintAnalyzer(), SecurityAnalyzer()], root, changed_files)
+
+    sources = SourceCache(max_items=count)
+    inprocess = [InProcessLintAnalyzer(sources), InProcessSecurityAnalyzer(sources)]
+    cold_seconds, cold_issues = timed(inprocess, root, changed_files)
+    parses = sources.misses
+    # Same content again (e.g. a re-review): no read is re-parsed
+    warm_seconds, _ = timed(inprocess, root, changed_files)
+
+    def per_file(seconds):
+        return round(seconds / count * 1000, 2)
+
+    return {
+        "benchmark": "inprocess",
+        "tree": root,
+        "files": count,
+        "source_mb": round(size / 1e6, 2),
+        "subprocess": {"seconds": round(sub_seconds, 3), "ms_per_file": per_file(sub_seconds), "issues": sub_issues},
+        "inprocess_cold": {"seconds": round(cold_seconds, 3), "ms_per_file": per_file(cold_seconds),
+                           "issues": cold_issues, "parses": parses},
+        "inprocess_warm": {"seconds": round(warm_seconds, 3), "ms_per_file": per_file(warm_seconds),
+                           "parses": sources.misses - parses},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tree", default=None, help="Python source tree (default: the stdlib)")
+    parser.add_argument("--files", type=int, default=300)
+    args = parser.parse_args()
+    print(json.dumps(run(args.tree, args.files), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Compare per-file vs batched flake8 wall time on a synthetic tree.
+
+    PYTHONPATH=src python benchmarks/bench_lint.py --files 500
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from codemate.analyzers.lint_analyzer import LintAnalyzer
+
+SAMPLE = '''import os
+import sys
+
+
+def handler_{n}(event,context):
+    value = event.get("value_{n}")
+    if value == None:
+        return sys.maxsize
+    total=0
+    for i in range({n} % 17 + 3):
+        total += i * {n}
+    return total
+'''
+
+
+def make_tree(root: Path, count: int):
+    changed_files = []
+    for n in range(count):
+        rel = f"pkg{n % 10}/module_{n}.py"
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Vary file sizes so chunk balancing has something to do
+        path.write_text(SAMPLE.format(n=n) * (1 + n % 5))
+        changed_files.append({"filename": rel, "status": "modified", "patch": ""})
+    return changed_files
+
+
+def run(files: int = 500) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        changed_files = make_tree(root, files)
+        analyzer = LintAnalyzer()
+
+        t0 = time.perf_counter()
+        per_file_lines = 0
+        for f in changed_files:
+            out = analyzer._run_flake8(str(root), [f["filename"]])
+            per_file_lines += len([line for line in out.splitlines() if line])
+        per_file = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        issues = analyzer.analyze(str(root), changed_files)
+        batched = time.perf_counter() - t0
+
+    return {
+        "benchmark": "lint",
+        "files": files,
+        "per_file_seconds": round(per_file, 3),
+        "batched_seconds": round(batched, 3),
+        "speedup": round(per_file / batched, 1) if batched else None,
+        "issues": len(issues),
+        "issues_match": per_file_lines == len(issues),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(run(args.files), indent=2))
+
+
+if __name__ == "__main__":
+    main()
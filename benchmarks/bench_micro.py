@@ -0,0 +1,111 @@
+"""
+Microbenchmarks on a synthetic PR: patch parsing, each analyzer (no
+result cache), GitHubReporter formatting/batching against a recording
+provider, and score_from_issues.
+
+    PYTHONPATH=src python benchmarks/bench_micro.py --files 100 --hunk-size 20
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from codemate.analyzers.lint_analyzer import LintAnalyzer
+from codemate.analyzers.secret_analyzer import SecretAnalyzer
+from codemate.analyzers.security_analyzer import SecurityAnalyzer
+from codemate.diff.parser import parse_file_patch, parse_patch
+from codemate.reporter.github_reporter import GitHubReporter
+from codemate.scoring.scorer import score_from_issues
+
+from synthetic import make_pr
+
+
+class RecordingProvider:
+    def __init__(self):
+        self.reviews = 0
+        self.comments = 0
+
+    def list_review_comments(self, repo, pr_id):
+        return []
+
+    def post_review_comments(self, repo, pr_id, comments, commit_sha=None):
+        self.reviews += 1
+        self.comments += len(comments)
+
+    def list_issue_comments(self, repo, pr_id):
+        return []
+
+    def post_summary(self, repo, pr_id, body):
+        return {"id": 1, "body": body}
+
+
+def best_of(fn, repeat: int) -> float:
+    """Fastest of `repeat` runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return round(best * 1000, 3)
+
+
+def analyzers():
+    found = {"lint_subprocess": LintAnalyzer(), "security_subprocess": SecurityAnalyzer(), "secrets": SecretAnalyzer()}
+    try:
+        from codemate.analyzers.inprocess import InProcessLintAnalyzer, InProcessSecurityAnalyzer
+        found["lint_inprocess"] = InProcessLintAnalyzer()
+        found["security_inprocess"] = InProcessSecurityAnalyzer()
+    except ImportError:
+        pass
+    return found
+
+
+def run(files: int = 100, hunks: int = 3, hunk_size: int = 20, huge_lines: int = 20000, repeat: int = 3) -> dict:
+    pr = make_pr(files=files, hunks=hunks, hunk_size=hunk_size, huge_files=1, huge_lines=huge_lines)
+    combined = "".join(f"diff --git a/{f['filename']} b/{f['filename']}\n--- a/{f['filename']}\n"
+                       f"+++ b/{f['filename']}\n{f['patch']}" for f in pr.files)
+    changed_files = [dict(f, diff=parse_file_patch(f["patch"], f["filename"])) for f in pr.files]
+    results = {"benchmark": "micro", "files": len(pr.files), "added_lines": pr.added_lines}
+
+    results["parse_file_patch_ms"] = best_of(lambda: [parse_file_patch(f["patch"], f["filename"])
+                                                      for f in pr.files], repeat)
+    results["parse_patch_ms"] = best_of(lambda: parse_patch(combined), repeat)
+
+    issues = []
+    with tempfile.TemporaryDirectory() as tmp:
+        pr.write(Path(tmp))
+        for name, analyzer in analyzers().items():
+            found = []
+            results[f"analyzer_{name}_ms"] = best_of(lambda: found.append(analyzer.analyze(tmp, changed_files)),
+                                                     repeat)
+            results[f"analyzer_{name}_issues"] = len(found[-1])
+            if name in ("lint_subprocess", "security_subprocess", "secrets"):
+                issues.extend(found[-1])
+
+    issues = [dict(i, path=os.path.normpath(i["path"])) for i in issues]
+    provider = RecordingProvider()
+    reporter = GitHubReporter(provider)
+    results["issues"] = len(issues)
+    results["reporter_inline_ms"] = best_of(
+        lambda: reporter.post_inline_comments("bench/repo", 1, issues, changed_files), repeat)
+    results["reporter_reviews_per_run"] = provider.reviews // repeat
+    results["reporter_summary_ms"] = best_of(lambda: reporter.post_summary("bench/repo", 1, issues), repeat)
+    results["score_from_issues_ms"] = best_of(lambda: score_from_issues(issues), repeat * 10)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--hunks", type=int, default=3)
+    parser.add_argument("--hunk-size", type=int, default=20)
+    parser.add_argument("--huge-lines", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.files, args.hunks, args.hunk_size, args.huge_lines, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Secret scanner throughput (MB/s of diff) on synthetic multi-MB patches,
+with the built-in rules and with hundreds of extra rules, against running
+every rule's regex on every added line.
+
+    PYTHONPATH=src python benchmarks/bench_secrets.py --mb 8
+"""
+import argparse
+import json
+import random
+import re
+import time
+
+from codemate.analyzers.secret_analyzer import SecretAnalyzer
+from codemate.analyzers.secret_rules import RULES, SecretRule, SecretRules
+from codemate.diff.parser import parse_file_patch
+
+LINES = [
+    "    result = compute_total(items, discount=0.15) + shipping_cost(order)",
+    "  timeout: 30",
+    '    "name": "service-{n}", "replicas": 3, "image": "registry/app:{n}",',
+    "LOG_LEVEL=info",
+    "    for row in rows: values.append(row.get('field_{n}'))",
+    "    url = f\"https://api.example.com/v1/items/{n}\"",
+    "    password_hint = form.cleaned_data['hint']",
+]
+SECRETS = [
+    'AWS_ACCESS_KEY_ID = "AKIA{key16}"',
+    "GITHUB_TOKEN=ghp_{key36}",
+    'db_password = "s3cr3t-{n}-Zq8!xT"',
+]
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ234567"
+
+
+def make_files(mb: float, files: int = 50, secret_every: int = 500):
+    """Patches of mixed file types; mostly added lines with a few secrets."""
+    rng = random.Random(0)
+    target = int(mb * 1e6)
+    per_file = target // files
+    changed_files = []
+    for i in range(files):
+        body, size, n = [], 0, 0
+        while size < per_file:
+            n += 1
+            if n % secret_every == 0:
+                key = "".join(rng.choice(ALPHABET) for _ in range(36))
+                body.append("+" + rng.choice(SECRETS).format(n=n, key16=key[:16], key36=key))
+            else:
+                line = rng.choice(LINES).format(n=n)
+                body.append(("+" if n % 5 else " ") + line)
+            size += len(body[-1]) + 1
+        new_count = len(body)
+        old_count = sum(1 for line in body if line.startswith(" "))
+        patch = f"@@ -1,{old_count} +1,{new_count} @@\n" + "\n".join(body) + "\n"
+        name = f"svc{i}/" + ("settings.py", "values.yaml", "config.json", ".env")[i % 4]
+        changed_files.append({"filename": name, "status": "modified", "patch": patch})
+    return changed_files
+
+
+def naive_scan(rules, changed_files):
+    """Every rule's regex on every added line; what the automaton avoids."""
+    regexes = [re.compile(rule.pattern) for rule in rules]
+    found = 0
+    for f in changed_files:
+        for line in f["diff"].iter_lines(added_only=True):
+            for regex in regexes:
+                if regex.search(line.content):
+                    found += 1
+    return found
+
+
+def mbps(size, seconds):
+    return round(size / 1e6 / seconds, 2)
+
+
+def run(mb: float = 8.0, extra_rules: int = 500) -> dict:
+    changed_files = make_files(mb)
+    size = sum(len(f["patch"]) for f in changed_files)
+    t0 = time.perf_counter()
+    for f in changed_files:
+        f["diff"] = parse_file_patch(f["patch"], f["filename"])
+    parse_seconds = time.perf_counter() - t0
+
+    extra = [SecretRule(f"extra-{n}", "extra", (f"token{n}_",), rf"token{n}_([A-Za-z0-9]{{20}})")
+             for n in range(extra_rules)]
+    results = {"benchmark": "secrets", "diff_mb": round(size / 1e6, 2), "files": len(changed_files),
+               "parse_mbps": mbps(size, parse_seconds)}
+    for label, rules in (("builtin", RULES), ("with_extra_rules", RULES + extra)):
+        t0 = time.perf_counter()
+        compiled = SecretRules(rules)
+        compile_seconds = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        issues = SecretAnalyzer(compiled).analyze(".", changed_files)
+        seconds = time.perf_counter() - t0
+        results[label] = {"rules": len(rules), "compile_seconds": round(compile_seconds, 3),
+                          "seconds": round(seconds, 3), "mbps": mbps(size, seconds), "issues": len(issues)}
+
+    t0 = time.perf_counter()
+    naive_scan(RULES + extra, changed_files)
+    seconds = time.perf_counter() - t0
+    results["naive_regex_with_extra_rules"] = {"seconds": round(seconds, 3), "mbps": mbps(size, seconds)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mb", type=float, default=8.0)
+    parser.add_argument("--extra-rules", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(run(args.mb, args.extra_rules), indent=2))
+
+
+if __name__ == "__main__":
+    main()
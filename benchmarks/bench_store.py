@@ -0,0 +1,69 @@
+"""
+Review store under dashboard load: queued write throughput, then page
+reads (first page, deep cursor page, repo/status filter) and the latest
+review of a PR once hundreds of thousands of issues are stored.
+
+    PYTHONPATH=src python benchmarks/bench_store.py --reviews 5000 --issues 60
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from codemate.store import ReviewStore
+
+
+def timed(fn, repeat: int = 50) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return round((time.perf_counter() - t0) / repeat * 1000, 3)
+
+
+def run(reviews: int = 5000, issues: int = 60, repos: int = 20) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ReviewStore(os.path.join(tmp, "reviews.sqlite3"))
+        rows = [{"path": f"pkg/m{n % 40}.py", "line": n, "severity": "warning" if n % 5 else "error",
+                 "rule": f"E{n % 30:03d}", "message": f"message {n}", "suggestion": ""} for n in range(issues)]
+
+        t0 = time.perf_counter()
+        for n in range(reviews):
+            store.record_review(f"org/repo{n % repos}", n, f"{n:040x}", rows, 80, files_count=5)
+        enqueue_seconds = time.perf_counter() - t0
+        store.flush()
+        write_seconds = time.perf_counter() - t0
+
+        first_rows, cursor = store.list_pull_requests(limit=50)
+        for _ in range(20):
+            _, cursor = store.list_pull_requests(limit=50, cursor=cursor)
+        pr_id = first_rows[0]["id"]
+        results = {
+            "benchmark": "store",
+            "reviews": reviews,
+            "issues": reviews * issues,
+            "enqueue_ms_per_review": round(enqueue_seconds / reviews * 1000, 4),
+            "write_reviews_per_second": round(reviews / write_seconds),
+            "write_batches": store.batches,
+            "first_page_ms": timed(lambda: store.list_pull_requests(limit=50)),
+            "deep_page_ms": timed(lambda: store.list_pull_requests(limit=50, cursor=cursor)),
+            "filtered_page_ms": timed(lambda: store.list_pull_requests(repo="org/repo3", status="reviewed",
+                                                                       limit=50)),
+            "reviews_page_ms": timed(lambda: store.list_reviews(limit=50)),
+            "latest_review_ms": timed(lambda: store.latest_review(pr_id)),
+        }
+        store.close()
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reviews", type=int, default=5000)
+    parser.add_argument("--issues", type=int, default=60)
+    parser.add_argument("--repos", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.reviews, args.issues, args.repos), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Raw-diff fallback for huge PRs: the fake GitHub lists large files without
+a patch, so GitHubProvider streams application/vnd.github.v3.diff and
+splits it per file. Reports time and peak Python memory (tracemalloc)
+for growing diff sizes; the peak should stay flat as the diff grows.
+
+    PYTHONPATH=src python benchmarks/bench_stream.py --files 200 --huge 1 4 16
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from codemate.config import settings
+from codemate.providers.github import GitHubProvider
+
+from fake_github import create_app, serve
+from synthetic import make_pr
+
+
+def run(files: int = 200, huge: tuple = (1, 4, 16), huge_lines: int = 50000, max_patch_lines: int = 3000) -> dict:
+    results = {"benchmark": "stream", "files": files, "max_file_bytes": settings.diff_stream_max_file_bytes,
+               "max_total_bytes": settings.diff_stream_max_total_bytes, "runs": []}
+    app = create_app(max_patch_lines=max_patch_lines)
+    for n, huge_files in enumerate(huge, start=1):
+        pr = make_pr(files=files, huge_files=huge_files, huge_lines=huge_lines, number=n)
+        app.state.github.add_pr("bench/repo", pr)
+    with serve(app) as url:
+        provider = GitHubProvider("bench", api_url=url)
+        for n, huge_files in enumerate(huge, start=1):
+            diff_mb = len(app.state.github.prs[("bench/repo", n)].raw_diff()) / 1e6
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            changed = provider.list_changed_files("bench/repo", n)
+            elapsed = time.perf_counter() - t0
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results["runs"].append({
+                "huge_files": huge_files,
+                "diff_mb": round(diff_mb, 2),
+                "seconds": round(elapsed, 3),
+                "peak_mb": round(peak / 1e6, 2),
+                "files_with_patch": sum(1 for f in changed if f["patch"]),
+                "files_skipped": sum(1 for f in changed if f.get("skipped")),
+            })
+    results["raw_diffs"] = app.state.github.stats["raw_diffs"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--huge", type=int, nargs="+", default=[1, 4, 16], help="Huge files per PR, one PR each")
+    parser.add_argument("--huge-lines", type=int, default=50000)
+    parser.add_argument("--max-patch-lines", type=int, default=3000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.files, tuple(args.huge), args.huge_lines, args.max_patch_lines), indent=2))
+
+
+if __name__ == "__main__":
+    main()
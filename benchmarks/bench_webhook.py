@@ -0,0 +1,138 @@
+"""
+End-to-end webhook throughput and latency: signed pull_request webhooks
+are posted to the FastAPI app, review jobs fetch synthetic PRs from the
+local fake GitHub (with injected latency), run the analyzers on the PR
+contents and post reviews back. Reports per-job latency (webhook to job
+finished) percentiles and reviews per second.
+
+    PYTHONPATH=src python benchmarks/bench_webhook.py --prs 20 --files 30 --latency 0.02
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from codemate.config import settings
+from codemate.providers.github import make_github_provider
+from codemate.reporter.github_reporter import GitHubReporter
+from codemate.webhook.jobs import JobQueue
+
+from fake_github import create_app, serve
+from synthetic import make_pr
+
+SECRET = "bench-secret"
+REPO = "bench/repo"
+
+
+def _signed(body: bytes) -> str:
+    return "sha256=" + hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+
+def run(prs: int = 20, files: int = 30, hunk_size: int = 20, latency: float = 0.02, workers: int = 4,
+        rate_limit: int | None = None) -> dict:
+    github = create_app(latency=latency, rate_limit=rate_limit)
+    pulls = [make_pr(files=files, hunk_size=hunk_size, number=n, seed=n) for n in range(1, prs + 1)]
+    for pr in pulls:
+        github.state.github.add_pr(REPO, pr)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, serve(github) as url:
+        # Analyzers read files from the current directory when the workspace is off
+        for pr in pulls:
+            pr.write(Path(tmp))
+        # Before the server module and the lazily created caches/stores read them
+        for name, value in {"webhook_secret": SECRET, "workspace_enabled": False, "incremental_reviews": False,
+                            "analysis_cache_path": "", "llm_cache_path": "", "review_store_path": ""}.items():
+            setattr(settings, name, value)
+        from codemate.webhook import server
+        server.github_provider = make_github_provider("bench", settings.github_transport, url)
+        server.github_reporter = GitHubReporter(server.github_provider)
+        server.review_queue = JobQueue(workers=workers, max_backlog=max(100, prs * 2))
+
+        os.chdir(tmp)
+        try:
+            with TestClient(server.app) as client:
+                t0 = time.perf_counter()
+                jobs = []
+                for pr in pulls:
+                    body = json.dumps({
+                        "action": "opened",
+                        "repository": {"full_name": REPO},
+                        "pull_request": {"number": pr.number, "title": f"PR {pr.number}",
+                                         "head": {"sha": pr.head_sha, "ref": "bench"}},
+                    }).encode()
+                    resp = client.post("/webhook", content=body, headers={
+                        "X-Hub-Signature-256": _signed(body), "X-GitHub-Event": "pull_request",
+                        "Content-Type": "application/json"})
+                    jobs.append(resp.json()["job_id"])
+                ingest_seconds = time.perf_counter() - t0
+
+                while server.review_queue.depth() or server.review_queue.in_flight():
+                    time.sleep(0.01)
+                elapsed = time.perf_counter() - t0
+                finished = [server.review_queue.get(job_id) for job_id in jobs]
+                latencies = [(j.finished_at - j.created_at).total_seconds() for j in finished if j.finished_at]
+                statuses = {}
+                for j in finished:
+                    statuses[j.status] = statuses.get(j.status, 0) + 1
+                metrics = client.get("/metrics").text
+        finally:
+            os.chdir(cwd)
+
+        stats = github.state.github.stats
+        return {
+            "benchmark": "webhook",
+            "prs": prs,
+            "files_per_pr": files,
+            "github_latency": latency,
+            "workers": workers,
+            "webhook_ingest_ms_per_request": round(ingest_seconds / prs * 1000, 3),
+            "seconds": round(elapsed, 3),
+            "reviews_per_second": round(prs / elapsed, 3),
+            "latency_p50": _percentile(latencies, 0.5),
+            "latency_p95": _percentile(latencies, 0.95),
+            "latency_mean": round(statistics.mean(latencies), 3) if latencies else None,
+            "statuses": statuses,
+            "github_requests": stats["requests"],
+            "github_rate_limited": stats["rate_limited"],
+            "review_comments_posted": stats["review_comments"],
+            "stage_seconds": _stage_sums(metrics),
+        }
+
+
+def _stage_sums(metrics: str) -> dict:
+    sums = {}
+    for line in metrics.splitlines():
+        if line.startswith("codemate_stage_seconds_sum{"):
+            name = line.split('stage="', 1)[1].split('"', 1)[0]
+            sums[name] = round(float(line.rsplit(" ", 1)[1]), 3)
+    return sums
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prs", type=int, default=20)
+    parser.add_argument("--files", type=int, default=30)
+    parser.add_argument("--hunk-size", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate-limit", type=int, default=None)
+    args = parser.parse_args()
+    print(json.dumps(run(args.prs, args.files, args.hunk_size, args.latency, args.workers, args.rate_limit),
+                     indent=2))
+
+
+if __name__ == "__main__":
+    main()
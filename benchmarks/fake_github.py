@@ -0,0 +1,230 @@
+"""
+Local stand-in for the GitHub REST endpoints GitHubProvider and
+AsyncGitHubProvider call, serving synthetic PRs (see synthetic.py).
+
+Latency and rate limits are injectable: every response carries
+X-RateLimit-* headers, and once `rate_limit` requests were made in the
+current `rate_window` further requests get a 403 until the window resets.
+Posted reviews and comments are recorded and listable (authored by
+`login`, the token's user), so dedupe and summary updates behave as
+against GitHub. Like GitHub, the files API leaves
+out patches of files with more than `max_patch_lines` changes; the raw
+diff (Accept: application/vnd.github.v3.diff) is always complete.
+
+    with serve(create_app(latency=0.02)) as url:
+        provider = GitHubProvider("token", api_url=url)
+
+    PYTHONPATH=src python benchmarks/fake_github.py --port 8090 --prs 10 --latency 0.05
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from synthetic import SyntheticPR, make_pr
+
+
+class FakeGitHubState:
+    def __init__(self):
+        self.prs: Dict[Tuple[str, int], SyntheticPR] = {}
+        self.review_comments: Dict[Tuple[str, int], list] = {}
+        self.issue_comments: Dict[Tuple[str, int], list] = {}
+        self.stats = {"requests": 0, "rate_limited": 0, "reviews": 0, "review_comments": 0,
+                      "summaries_posted": 0, "summaries_updated": 0, "raw_diffs": 0}
+        self.window_start = time.time()
+        self.window_requests = 0
+        self.next_id = 1
+
+    def add_pr(self, repo: str, pr: SyntheticPR):
+        self.prs[(repo, pr.number)] = pr
+
+
+def create_app(latency: float = 0.0, rate_limit: int | None = None, rate_window: float = 60.0,
+               per_page_max: int = 100, max_patch_lines: int | None = None, login: str = "codemate") -> FastAPI:
+    """
+    latency: seconds added to every request
+    rate_limit: requests allowed per rate_window seconds (None = unlimited)
+    max_patch_lines: files with more changes are listed without a patch
+    login: user the token authenticates as, and author of posted comments
+    """
+    app = FastAPI(title="Codemate fake GitHub")
+    state = FakeGitHubState()
+    app.state.github = state
+
+    @app.middleware("http")
+    async def throttle(request: Request, call_next):
+        state.stats["requests"] += 1
+        if latency:
+            await asyncio.sleep(latency)
+        now = time.time()
+        if now - state.window_start >= rate_window:
+            state.window_start, state.window_requests = now, 0
+        state.window_requests += 1
+        limit = rate_limit if rate_limit is not None else 5000
+        remaining = max(0, limit - state.window_requests)
+        headers = {"X-RateLimit-Limit": str(limit), "X-RateLimit-Remaining": str(remaining),
+                   "X-RateLimit-Reset": str(int(state.window_start + rate_window))}
+        if rate_limit is not None and state.window_requests > rate_limit:
+            state.stats["rate_limited"] += 1
+            headers["Retry-After"] = str(max(0, int(state.window_start + rate_window - now)))
+            return JSONResponse({"message": "API rate limit exceeded"}, status_code=403, headers=headers)
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
+
+    def pr_or_404(owner: str, name: str, number: int) -> SyntheticPR | None:
+        return state.prs.get((f"{owner}/{name}", number))
+
+    def not_found():
+        return JSONResponse({"message": "Not Found"}, status_code=404)
+
+    def paged(request: Request, items: list):
+        per_page = min(int(request.query_params.get("per_page", 30)), per_page_max)
+        page = int(request.query_params.get("page", 1))
+        last = max(1, -(-len(items) // per_page))
+        headers = {}
+        if last > 1:
+            base = str(request.url.remove_query_params(["page", "per_page"]))
+            links = [f'<{base}?page={page + 1}&per_page={per_page}>; rel="next"'] if page < last else []
+            links.append(f'<{base}?page={last}&per_page={per_page}>; rel="last"')
+            headers["Link"] = ", ".join(links)
+        return JSONResponse(items[(page - 1) * per_page:page * per_page], headers=headers)
+
+    @app.get("/user")
+    async def get_user():
+        return {"login": login, "type": "User"}
+
+    @app.get("/repos/{owner}/{name}/pulls")
+    async def list_pulls(request: Request, owner: str, name: str):
+        repo = f"{owner}/{name}"
+        return paged(request, [{"number": number, "state": "open", "head": {"sha": pr.head_sha}}
+                               for (r, number), pr in sorted(state.prs.items()) if r == repo])
+
+    @app.get("/repos/{owner}/{name}/pulls/{number}")
+    async def get_pull(request: Request, owner: str, name: str, number: int):
+        pr = pr_or_404(owner, name, number)
+        if pr is None:
+            return not_found()
+        if request.headers.get("Accept") == "application/vnd.github.v3.diff":
+            state.stats["raw_diffs"] += 1
+            return StreamingResponse((part.encode() for part in pr.iter_raw_diff()), media_type="text/plain")
+        return {"number": number, "title": f"Synthetic PR {number}", "state": "open",
+                "user": {"login": "bench"}, "head": {"sha": pr.head_sha, "ref": f"bench/{number}"},
+                "html_url": f"https://github.com/{owner}/{name}/pull/{number}"}
+
+    @app.get("/repos/{owner}/{name}/pulls/{number}/files")
+    async def get_files(request: Request, owner: str, name: str, number: int):
+        pr = pr_or_404(owner, name, number)
+        if pr is None:
+            return not_found()
+        if max_patch_lines is None:
+            return paged(request, pr.files)
+        return paged(request, [f if f["changes"] <= max_patch_lines else {k: v for k, v in f.items() if k != "patch"}
+                               for f in pr.files])
+
+    @app.get("/repos/{owner}/{name}/pulls/{number}/commits")
+    async def get_commits(owner: str, name: str, number: int):
+        pr = pr_or_404(owner, name, number)
+        return not_found() if pr is None else [{"sha": pr.head_sha}]
+
+    @app.get("/repos/{owner}/{name}/compare/{spec}")
+    async def compare(owner: str, name: str, spec: str):
+        # History is linear per synthetic PR: report everything as new
+        for (repo, _), pr in state.prs.items():
+            if repo == f"{owner}/{name}" and spec.endswith(pr.head_sha):
+                return {"status": "ahead", "files": pr.files}
+        return not_found()
+
+    @app.get("/repos/{owner}/{name}/pulls/{number}/comments")
+    async def list_review_comments(request: Request, owner: str, name: str, number: int):
+        return paged(request, state.review_comments.get((f"{owner}/{name}", number), []))
+
+    @app.post("/repos/{owner}/{name}/pulls/{number}/reviews")
+    async def post_review(request: Request, owner: str, name: str, number: int):
+        body = await request.json()
+        comments = state.review_comments.setdefault((f"{owner}/{name}", number), [])
+        for c in body.get("comments", []):
+            # Position-based comments are stored without a file line; good enough for dedupe of line comments
+            comments.append({"id": state.next_id, "path": c["path"], "line": c.get("line"),
+                             "side": c.get("side", "RIGHT"), "body": c["body"], "user": {"login": login}})
+            state.next_id += 1
+        state.stats["reviews"] += 1
+        state.stats["review_comments"] += len(body.get("comments", []))
+        return {"id": state.next_id, "state": "COMMENTED"}
+
+    @app.get("/repos/{owner}/{name}/issues/{number}/comments")
+    async def list_issue_comments(request: Request, owner: str, name: str, number: int):
+        return paged(request, state.issue_comments.get((f"{owner}/{name}", number), []))
+
+    @app.post("/repos/{owner}/{name}/issues/{number}/comments")
+    async def post_issue_comment(request: Request, owner: str, name: str, number: int):
+        body = await request.json()
+        comment = {"id": state.next_id, "body": body["body"], "repo": f"{owner}/{name}", "user": {"login": login}}
+        state.next_id += 1
+        state.issue_comments.setdefault((f"{owner}/{name}", number), []).append(comment)
+        state.stats["summaries_posted"] += 1
+        return JSONResponse(comment, status_code=201)
+
+    @app.patch("/repos/{owner}/{name}/issues/comments/{comment_id}")
+    async def update_issue_comment(request: Request, owner: str, name: str, comment_id: int):
+        body = await request.json()
+        for comments in state.issue_comments.values():
+            for comment in comments:
+                if comment["id"] == comment_id:
+                    comment["body"] = body["body"]
+                    state.stats["summaries_updated"] += 1
+                    return comment
+        return not_found()
+
+    @app.get("/stats")
+    async def get_stats():
+        return state.stats
+
+    return app
+
+
+@contextmanager
+def serve(app: FastAPI, host: str = "127.0.0.1", port: int = 0):
+    """Run `app` under uvicorn in a background thread; yields its base URL."""
+    import uvicorn
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://{host}:{sock.getsockname()[1]}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+        sock.close()
+
+
+def main():
+    import uvicorn
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--repo", default="bench/repo")
+    parser.add_argument("--prs", type=int, default=10)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=None)
+    args = parser.parse_args()
+    app = create_app(args.latency, args.rate_limit)
+    for n in range(1, args.prs + 1):
+        app.state.github.add_pr(args.repo, make_pr(files=args.files, number=n))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark harness: runs the benchmarks (each in its own process, so
+settings and singletons don't leak between them), writes one JSON file
+per run to benchmarks/results/ tagged with the git commit, and compares
+against an earlier result file.
+
+    PYTHONPATH=src python benchmarks/run_all.py                       # default suite
+    PYTHONPATH=src python benchmarks/run_all.py --only micro webhook --profile full
+    PYTHONPATH=src python benchmarks/run_all.py --compare benchmarks/results/<earlier>.json
+
+The comparison lists every numeric result whose value changed by more
+than --threshold percent. Keys ending in _ms, seconds, latency_* and
+*_bytes count as "lower is better"; keys like *_per_second count as
+"higher is better".
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+RESULTS_DIR = HERE / "results"
+
+# name -> (script, quick args, full args)
+SUITE = {
+    "micro": ("bench_micro.py", ["--files", "40", "--huge-lines", "5000"], ["--files", "200"]),
+    "webhook": ("bench_webhook.py", ["--prs", "8", "--files", "15"], ["--prs", "40", "--files", "40"]),
+    "diff": ("bench_diff.py", ["--lines", "50000"], ["--lines", "200000"]),
+    "stream": ("bench_stream.py", ["--huge", "1", "4"], ["--huge", "1", "4", "16"]),
+    "secrets": ("bench_secrets.py", [], []),
+    "store": ("bench_store.py", ["--reviews", "1000"], ["--reviews", "5000"]),
+    "api": ("bench_api.py", ["--issues", "2000", "--repeat", "20"], ["--issues", "5000"]),
+    "ai": ("bench_ai.py", ["--files", "10"], []),
+    "inprocess": ("bench_inprocess.py", [], []),
+    "lint": ("bench_lint.py", ["--files", "100"], ["--files", "500"]),
+}
+DEFAULT = ("micro", "webhook", "diff", "stream", "secrets", "store", "api")
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=HERE,
+                               capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "")
+    except FileNotFoundError:
+        return "unknown"
+
+
+def run_one(name: str, profile: str) -> dict:
+    script, quick, full = SUITE[name]
+    args = full if profile == "full" else quick
+    env = dict(os.environ)
+    src = str(HERE.parent / "src")
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src, env.get("PYTHONPATH")) if p)
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, str(HERE / script), *args], capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+    try:
+        result = json.loads(proc.stdout[proc.stdout.index("{"):])
+    except ValueError:
+        return {"error": "no JSON output"}
+    result["wall_seconds"] = round(time.perf_counter() - t0, 3)
+    return result
+
+
+def flatten(value, prefix: str = "") -> dict:
+    if isinstance(value, dict):
+        out = {}
+        for k, v in value.items():
+            out.update(flatten(v, f"{prefix}.{k}" if prefix else k))
+        return out
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+
+def direction(key: str) -> int:
+    """+1 if higher is better, -1 if lower is better, 0 if neutral."""
+    leaf = key.rsplit(".", 1)[-1]
+    if "per_second" in leaf or leaf.endswith("_rate") or "mb_per_s" in leaf:
+        return 1
+    if (leaf.endswith(("_ms", "seconds", "_bytes", "_mb")) or leaf.startswith("latency")
+            or leaf in ("requests", "github_requests", "rate_limited")):
+        return -1
+    return 0
+
+
+def compare(old: dict, new: dict, threshold: float) -> list:
+    rows = []
+    old_flat, new_flat = flatten(old.get("results", {})), flatten(new.get("results", {}))
+    for key, after in new_flat.items():
+        before = old_flat.get(key)
+        if before is None or before == after:
+            continue
+        change = (after - before) / abs(before) * 100 if before else float("inf")
+        if abs(change) < threshold:
+            continue
+        sign = direction(key)
+        verdict = "" if sign == 0 else ("better" if change * sign > 0 else "WORSE")
+        rows.append((key, before, after, change, verdict))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=sorted(SUITE), help="Benchmarks to run")
+    parser.add_argument("--profile", choices=("quick", "full"), default="quick")
+    parser.add_argument("--output", type=Path, help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent change worth reporting")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "profile": args.profile,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": {},
+    }
+    for name in args.only or DEFAULT:
+        print(f"running {name}...", file=sys.stderr)
+        report["results"][name] = run_one(name, args.profile)
+
+    output = args.output or RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        old = json.loads(args.compare.read_text())
+        rows = compare(old, report, args.threshold)
+        print(f"\n{old.get('commit')} -> {commit}: {len(rows)} changes over {args.threshold:g}%")
+        for key, before, after, change, verdict in sorted(rows, key=lambda r: r[4] != "WORSE"):
+            print(f"  {key:<55} {before:>12g} -> {after:<12g} {change:+7.1f}% {verdict}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Synthetic pull requests for benchmarks: a mix of Python and non-Python
+files with configurable hunk sizes, plus optional huge generated files
+(lockfile/minified-style), shaped like GitHub's PR files API.
+
+    pr = make_pr(files=50, hunks=3, hunk_size=20, python_ratio=0.7, huge_files=1)
+    pr.files      # [{"filename", "status", "sha", "additions", "patch"}, ...]
+    pr.contents   # {path: file text at the PR head}
+    pr.write(root)
+"""
+import hashlib
+import random
+from pathlib import Path
+from typing import Dict, List
+
+PYTHON_LINES = [
+    "import os",
+    "import subprocess",
+    "def handler_{n}(event,context):",
+    "    value = event.get('value_{n}')",
+    "    if value == None:",
+    "        return os.environ.get('HOME')",
+    "    total=0",
+    "    for i in range({n} % 17 + 3):",
+    "        total += i * {n}",
+    "    password = 'hunter{n}'",
+    "    subprocess.call('ls ' + str(value), shell=True)",
+    "    return total",
+    "",
+]
+TEXT_LINES = [
+    "## Section {n}",
+    "Some documentation text for item {n}.",
+    "- bullet {n}",
+    "key_{n}: value_{n}",
+    "",
+]
+NON_PYTHON_EXTENSIONS = (".md", ".yaml", ".js", ".txt")
+
+
+class SyntheticPR:
+    def __init__(self, number: int, files: List[Dict], contents: Dict[str, str], head_sha: str):
+        self.number = number
+        self.files = files
+        self.contents = contents
+        self.head_sha = head_sha
+
+    @property
+    def added_lines(self) -> int:
+        return sum(f["additions"] for f in self.files)
+
+    def iter_raw_diff(self):
+        """The whole PR as GitHub's application/vnd.github.v3.diff media type returns it, per file."""
+        for f in self.files:
+            path = f["filename"]
+            if f["status"] == "added":
+                header = f"diff --git a/{path} b/{path}\nnew file mode 100644\n--- /dev/null\n+++ b/{path}\n"
+            else:
+                header = f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n"
+            yield header + f["patch"]
+
+    def raw_diff(self) -> str:
+        return "".join(self.iter_raw_diff())
+
+    def write(self, root: Path):
+        """Write the head contents of all files under root."""
+        for path, text in self.contents.items():
+            target = Path(root) / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(text)
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha1(text.encode(), usedforsecurity=False).hexdigest()
+
+
+def _file(path: str, hunks: int, hunk_size: int, template: List[str], seed: int, rng: random.Random):
+    """Head content and patch for a modified file with `hunks` hunks of `hunk_size` added lines."""
+    lines: List[str] = []
+    patch: List[str] = []
+    gap = 12  # unchanged lines between hunks
+    n = seed
+    for h in range(hunks):
+        for _ in range(gap):
+            lines.append(f"# unchanged {n}" if path.endswith(".py") else f"unchanged {n}")
+            n += 1
+        start = len(lines) + 1
+        added = []
+        for k in range(hunk_size):
+            # Python hunks follow the template in order so the file stays parseable
+            line = template[k % len(template)] if template is PYTHON_LINES else rng.choice(template)
+            added.append(line.format(n=n))
+            n += 1
+        if added[-1].endswith(":"):
+            indent = len(added[-1]) - len(added[-1].lstrip())
+            added[-1] = " " * indent + "pass"
+        context_before = lines[-3:]
+        lines.extend(added)
+        old_start = start - len(context_before) - h * hunk_size
+        patch.append(f"@@ -{old_start},{len(context_before)} +{start - len(context_before)},"
+                     f"{len(context_before) + hunk_size} @@")
+        patch.extend(" " + line for line in context_before)
+        patch.extend("+" + line for line in added)
+    text = "\n".join(lines) + "\n"
+    return text, "\n".join(patch) + "\n", hunks * hunk_size
+
+
+def _huge_file(path: str, lines: int, seed: int):
+    """A newly added generated file, e.g. a lockfile."""
+    body = [f'    "pkg-{seed}-{n}": "sha512-{_sha(f"{seed}:{n}")}",' for n in range(lines)]
+    text = "{\n" + "\n".join(body) + "\n}\n"
+    patch = f"@@ -0,0 +1,{lines + 2} @@\n" + "".join("+" + line + "\n" for line in text.splitlines())
+    return text, patch
+
+
+def make_pr(files: int = 50, hunks: int = 3, hunk_size: int = 20, python_ratio: float = 0.7,
+            huge_files: int = 0, huge_lines: int = 50000, number: int = 1, seed: int = 0) -> SyntheticPR:
+    rng = random.Random(seed * 100003 + number)
+    entries: List[Dict] = []
+    contents: Dict[str, str] = {}
+    for i in range(files):
+        if rng.random() < python_ratio:
+            path, template = f"pkg{i % 8}/module_{number}_{i}.py", PYTHON_LINES
+        else:
+            path, template = f"docs/page_{number}_{i}{NON_PYTHON_EXTENSIONS[i % 4]}", TEXT_LINES
+        text, patch, additions = _file(path, hunks, hunk_size, template, seed * 7919 + number * 1000 + i, rng)
+        contents[path] = text
+        entries.append({"filename": path, "status": "modified", "sha": _sha(text),
+                        "additions": additions, "changes": additions, "patch": patch})
+    for i in range(huge_files):
+        path = f"generated/package-lock-{number}-{i}.json"
+        text, patch = _huge_file(path, huge_lines, seed * 31 + number * 100 + i)
+        contents[path] = text
+        entries.append({"filename": path, "status": "added", "sha": _sha(text),
+                        "additions": huge_lines + 2, "changes": huge_lines + 2, "patch": patch})
+    head_sha = _sha("".join(f["sha"] for f in entries))
+    return SyntheticPR(number, entries, contents, head_sha)
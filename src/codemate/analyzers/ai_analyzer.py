@@ -1,24 +1,202 @@
-from .base import AnalyzerBase
-from typing import List, Dict
+import asyncio
+from typing import AsyncIterator, List, Dict
 from codemate.config import settings
+from codemate.diff.model import ADDED, CONTEXT, REMOVED
+from codemate.diff.parser import parse_file_patch
+from codemate.cache import TieredCache
+from codemate.llm.cache import pack_issues, unit_key, unpack_issues
+from codemate.llm.client import LLMBackend, LLMError, make_llm_backend
+from codemate.llm.prompt import (
+    PROMPT_VERSION, SYSTEM_PROMPT, ReviewUnit, build_prompt, context_tokens, estimate_tokens, parse_response,
+)
+from codemate.utils.cancel import check_cancelled
+from codemate.utils.paths import has_generated_marker, is_generated_path
+from .base import AnalyzerBase
+
 
 class AIAnalyzer(AnalyzerBase):
+    """
+    LLM review of the added code. Hunks are packed into batches that fit the
+    model's context window, and batches are sent concurrently (at most
+    `concurrency` in flight). Vendored, generated and lock files are skipped.
+
+    With a `cache`, answers are stored per hunk (see llm.cache), so hunks
+    seen before (re-reviews, rebases, cherry-picks) aren't sent again.
+    """
+
+    reads_files = False
+
+    def __init__(self, backend: LLMBackend | None = None, model: str | None = None,
+                 concurrency: int | None = None, max_output_tokens: int | None = None,
+                 cache: TieredCache | None = None):
+        self.backend = backend
+        self.cache = cache
+        self.model = model or settings.llm_model
+        self.concurrency = concurrency or settings.llm_concurrency
+        self.max_output_tokens = max_output_tokens or settings.llm_max_output_tokens
+
+    def version(self) -> str:
+        return f"{self.model}/prompt-{PROMPT_VERSION}"
+
     def analyze(self, repo_path: str, changed_files: List[Dict]) -> List[Dict]:
+        """Review changed files; returns the issues of all batches."""
+        async def collect():
+            issues: List[Dict] = []
+            async for batch_issues in self.astream(changed_files):
+                issues.extend(batch_issues)
+            return issues
+
+        return asyncio.run(collect())
+
+    async def astream(self, changed_files: List[Dict]) -> AsyncIterator[List[Dict]]:
         """
-        Use an LLM to generate feedback for each added line.
-        Currently stub: returns dummy feedback.
+        Yield each batch's issues as soon as that batch completes; cached hunks come first.
+        If any batch failed (backend error or unusable answer), raises LLMError
+        once the others are done, so the run reports the analyzer as failed
+        rather than as having found nothing.
         """
-        issues: List[Dict] = []
+        units = self.units(changed_files, self.batch_budget())
+        if self.cache is not None:
+            cached: List[Dict] = []
+            missed: List[ReviewUnit] = []
+            for unit in units:
+                packed = self.cache.get(unit_key(unit, self.model))
+                if packed is None:
+                    missed.append(unit)
+                else:
+                    cached.extend(unpack_issues(unit, packed))
+            if cached:
+                yield cached
+            units = missed
+
+        batches = self.pack(units)
+        if not batches:
+            return
+        backend = self.backend or make_llm_backend()
+        semaphore = asyncio.Semaphore(self.concurrency)
 
+        async def review(batch: List[ReviewUnit]) -> List[Dict]:
+            async with semaphore:
+                check_cancelled()
+                answer = await backend.complete(SYSTEM_PROMPT, build_prompt(batch), self.max_output_tokens)
+            try:
+                issues = parse_response(answer, batch)
+            except ValueError as e:
+                # Not cached: these hunks are sent again next time
+                raise LLMError(f"unusable answer: {e}")
+            if self.cache is not None:
+                self._store(batch, issues)
+            return issues
+
+        tasks = [asyncio.ensure_future(review(batch)) for batch in batches]
+        errors: List[LLMError] = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    issues = await next_done
+                except LLMError as e:
+                    errors.append(e)
+                    continue
+                check_cancelled()
+                yield issues
+            if errors:
+                raise LLMError(f"{len(errors)} of {len(tasks)} AI review batches failed: {errors[0]}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await backend.aclose()
+
+    def batch_budget(self) -> int:
+        """Prompt tokens available per request."""
+        reserved = self.max_output_tokens + estimate_tokens(SYSTEM_PROMPT) + 256  # message framing
+        return max(512, context_tokens(self.model) - reserved)
+
+    def _store(self, batch: List[ReviewUnit], issues: List[Dict]):
+        # Per unit, including units without comments, so they aren't re-sent
+        by_unit: Dict[ReviewUnit, List[Dict]] = {}
+        owner = {(u.path, line): u for u in batch for line in u.added}
+        for issue in issues:
+            by_unit.setdefault(owner[(issue["path"], issue["line"])], []).append(issue)
+        for unit in batch:
+            self.cache.set(unit_key(unit, self.model), pack_issues(unit, by_unit.get(unit, [])))
+
+    def batches(self, changed_files: List[Dict]) -> List[List[ReviewUnit]]:
+        """Review units of `changed_files` packed into batches (see pack)."""
+        return self.pack(self.units(changed_files, self.batch_budget()))
+
+    def pack(self, units: List[ReviewUnit]) -> List[List[ReviewUnit]]:
+        """Greedily pack review units, in file order, into token-budgeted batches."""
+        budget = self.batch_budget()
+        batches: List[List[ReviewUnit]] = []
+        current: List[ReviewUnit] = []
+        used = 0
+        for unit in units:
+            cost = unit.tokens + estimate_tokens(unit.path) + 2
+            if current and used + cost > budget:
+                batches.append(current)
+                current, used = [], 0
+            current.append(unit)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def units(self, changed_files: List[Dict], budget: int) -> List[ReviewUnit]:
+        """Review units of the reviewable files: one per hunk with added lines, oversized hunks split."""
+        units: List[ReviewUnit] = []
         for f in changed_files:
-            for i, line in enumerate(f.get("patch", "").splitlines(), start=1):
-                if line.startswith("+") and not line.startswith("+++"):
-                    issues.append({
-                        "path": f["filename"],
-                        "line": i,
-                        "severity": "info",
-                        "rule": "ai-feedback",
-                        "message": f"AI suggestion: Review this line: {line[1:]}",
-                        "suggestion": ""
-                    })
-        return issues
+            if f.get("status") == "removed" or is_generated_path(f["filename"]):
+                continue
+            if f.get("changed_lines") is not None and not f["changed_lines"]:
+                continue
+            diff = f.get("diff")
+            if diff is None:
+                diff = parse_file_patch(f.get("patch"), f["filename"])
+            if _starts_generated(diff):
+                continue
+            # Leave room for the file's "### path" header
+            unit_budget = budget - estimate_tokens(f["filename"]) - 2
+            for hunk in diff.hunks:
+                units.extend(_hunk_units(f["filename"], hunk, unit_budget))
+        return units
+
+
+def _starts_generated(diff) -> bool:
+    """Whether the diff shows the top of a file carrying a "generated" marker."""
+    if not diff.hunks or diff.hunks[0].new_start > 1:
+        return False
+    hunk = diff.hunks[0]
+    return has_generated_marker("\n".join(hunk.content(i) for i in range(min(5, len(hunk)))))
+
+
+def _hunk_units(path: str, hunk, budget: int) -> List[ReviewUnit]:
+    units = []
+    lines: List[str] = []
+    added: List[int] = []
+    first = last = None
+    size = 0
+    for i in range(len(hunk)):
+        kind = hunk.kinds[i]
+        if kind not in (ADDED, CONTEXT, REMOVED):
+            continue  # "\\ No newline at end of file"
+        number = hunk.new_lines[i]
+        if kind == REMOVED:
+            rendered = f"{'':>5} | -{hunk.content(i)}"
+        else:
+            rendered = f"{number:>5} | {'+' if kind == ADDED else ' '}{hunk.content(i)}"
+        cost = estimate_tokens(rendered)
+        if lines and size + cost > budget:
+            if added:
+                units.append(ReviewUnit(path, first, last, tuple(added), "\n".join(lines)))
+            lines, added, first, size = [], [], None, 0
+        lines.append(rendered)
+        size += cost
+        if kind != REMOVED:
+            first = number if first is None else first
+            last = number
+        if kind == ADDED:
+            added.append(number)
+    if lines and added:
+        units.append(ReviewUnit(path, first, last, tuple(added), "\n".join(lines)))
+    return units
@@ -2,10 +2,40 @@ from abc import ABC, abstractmethod
 from typing import List, Dict
 
 class AnalyzerBase(ABC):
+    # Whether analyze() reads file contents under repo_path; those need the
+    # PR head materialized, diff-only analyzers (secrets, AI) don't
+    reads_files = True
+
+    @property
+    def name(self) -> str:
+        """Name used in run reports; defaults to the class name."""
+        return type(self).__name__
+
+    def version(self) -> str:
+        """Analyzer/tool version; part of the result cache key."""
+        return "0"
+
+    def config_fingerprint(self, repo_path: str) -> str:
+        """Hash of whatever configuration affects results; part of the result cache key."""
+        return ""
+
+    def targets(self, repo_path: str, changed_files: List[Dict]) -> List[str]:
+        """
+        Filenames analyze() would actually look at; files left out are
+        skipped for reasons other than their content (type, scope, deleted).
+        CachedAnalyzer only looks up and stores results for these.
+        """
+        return [f["filename"] for f in changed_files if f.get("status") != "removed"]
+
     @abstractmethod
     def analyze(self, repo_path: str, changed_files: List[Dict]) -> List[Dict]:
         """
         Analyze changed files and return a list of issues.
+        Each changed file dict has "filename" and "patch", and may carry
+        "changed_lines" (a diff.scope.ChangedLines, or None if unknown);
+        analyzers can use it to skip files or lines nobody touched.
+        Files of a local analysis have no patch and "local": True; all of
+        their content is in scope.
         Each issue dict contains:
             - path: file path
             - line: line number
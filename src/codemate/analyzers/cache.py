@@ -0,0 +1,120 @@
+import hashlib
+import os
+import threading
+from typing import List, Dict
+from codemate.cache import TieredCache
+from codemate.config import settings
+from .base import AnalyzerBase
+
+
+def blob_sha(data: bytes) -> str:
+    """Git blob SHA of `data`; equals the `sha` GitHub reports for a PR file."""
+    h = hashlib.sha1(b"blob %d\0" % len(data))
+    h.update(data)
+    return h.hexdigest()
+
+
+def file_fingerprint(repo_path: str, changed_file: Dict) -> str | None:
+    """
+    Content hash of a changed file as the analyzers will see it, i.e. of
+    the file on disk under repo_path. None means the file can't be cached:
+    deleted, or not on disk (e.g. no workspace). The provider's blob SHA is
+    deliberately not used then, since the analyzers didn't read that content.
+    """
+    if changed_file.get("status") == "removed":
+        return None
+    path = os.path.join(repo_path, changed_file["filename"])
+    try:
+        with open(path, "rb") as fh:
+            return blob_sha(fh.read())
+    except OSError:
+        return None
+
+
+class CachedAnalyzer(AnalyzerBase):
+    """
+    Wrap a per-file analyzer so it only runs on files whose content,
+    tool version or config changed since a previous run.
+    Results are cached per file, keyed by
+    (path, content hash, analyzer name, analyzer version, config hash);
+    the path is part of the key since per-path config (per-file-ignores,
+    excludes) can change the result for the same content.
+    """
+
+    def __init__(self, analyzer: AnalyzerBase, cache: TieredCache):
+        self.analyzer = analyzer
+        self.cache = cache
+
+    @property
+    def name(self) -> str:
+        return self.analyzer.name
+
+    @property
+    def reads_files(self) -> bool:
+        return self.analyzer.reads_files
+
+    def version(self) -> str:
+        return self.analyzer.version()
+
+    def config_fingerprint(self, repo_path: str) -> str:
+        return self.analyzer.config_fingerprint(repo_path)
+
+    def targets(self, repo_path: str, changed_files: List[Dict]) -> List[str]:
+        return self.analyzer.targets(repo_path, changed_files)
+
+    def analyze(self, repo_path: str, changed_files: List[Dict]) -> List[Dict]:
+        prefix = "|".join([self.name, self.version(), self.config_fingerprint(repo_path)])
+
+        # Files the analyzer skips (type, scope, no patch) have no result to
+        # cache; storing [] for them would read as "clean" once they are in scope
+        targeted = set(self.targets(repo_path, changed_files))
+        issues: List[Dict] = []
+        missed: List[Dict] = []
+        keys: Dict[str, str] = {}
+        for f in changed_files:
+            if f["filename"] not in targeted:
+                continue
+            content = file_fingerprint(repo_path, f)
+            if content is None:
+                missed.append(f)
+                continue
+            key = hashlib.sha256(f"{prefix}|{os.path.normpath(f['filename'])}|{content}".encode()).hexdigest()
+            cached = self.cache.get(key)
+            if cached is None:
+                missed.append(f)
+                keys[f["filename"]] = key
+                continue
+            for issue in cached:
+                issues.append({"path": f["filename"], **issue})
+
+        if not missed:
+            return issues
+
+        fresh = self.analyzer.analyze(repo_path, missed)
+        by_path: Dict[str, List[Dict]] = {os.path.normpath(name): [] for name in keys}
+        for issue in fresh:
+            found = by_path.get(os.path.normpath(issue["path"]))
+            if found is not None:
+                found.append({k: v for k, v in issue.items() if k != "path"})
+        for name, key in keys.items():
+            self.cache.set(key, by_path[os.path.normpath(name)])
+
+        return issues + fresh
+
+
+_analysis_cache: TieredCache | None = None
+_analysis_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> TieredCache:
+    """Process-wide analyzer result cache, configured from settings."""
+    global _analysis_cache
+    with _analysis_cache_lock:
+        if _analysis_cache is None:
+            _analysis_cache = TieredCache(
+                max_items=settings.analysis_cache_items,
+                path=settings.analysis_cache_path or None,
+                ttl=settings.analysis_cache_ttl_hours * 3600 if settings.analysis_cache_ttl_hours else None,
+                max_disk_bytes=settings.analysis_cache_max_mb * 1024 * 1024 if settings.analysis_cache_max_mb else None,
+            )
+        return _analysis_cache
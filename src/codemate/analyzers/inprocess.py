@@ -0,0 +1,330 @@
+# src/codemate/analyzers/inprocess.py
+import configparser
+import io
+import os
+import re
+import threading
+import tokenize
+from typing import Dict, List, Tuple
+import pycodestyle
+from flake8.plugins.pyflakes import FLAKE8_PYFLAKES_CODES
+from pyflakes import __version__ as pyflakes_version
+from pyflakes.checker import Checker as FlakesChecker
+from codemate.utils.cancel import check_cancelled
+from .lint_analyzer import LintAnalyzer
+from .security_analyzer import SecurityAnalyzer
+from .source_cache import ParsedSource, SourceCache, get_source_cache
+
+# flake8's defaults and inline suppression syntax
+FLAKE8_DEFAULT_IGNORE = ("E121", "E123", "E126", "E226", "E24", "E704", "W503", "W504")
+FLAKE8_DEFAULT_MAX_LINE_LENGTH = 79
+NOQA = re.compile(r"# noqa(?::[\s]?(?P<codes>([A-Z]+[0-9]+(?:[,\s]+)?)+))?", re.I)
+NOQA_FILE = re.compile(r"#\s*flake8[:=]\s*noqa\s*$", re.I)
+
+# Raised by library internals that changed between versions; the analyzers
+# then fall back to running the tool as a subprocess
+INCOMPATIBLE = (ImportError, AttributeError, TypeError)
+PROBE_SOURCE = b"import os\nassert os  # noqa: E501 # nosec\n"
+
+
+class InProcessLintAnalyzer(LintAnalyzer):
+    """
+    flake8-equivalent checks (pyflakes + pycodestyle) run as library calls
+    on a shared ParsedSource instead of a flake8 subprocess.
+    Reads the [flake8] section of the repo's config for max-line-length,
+    select, ignore and extend-ignore; plugins and mccabe aren't run.
+    Runs flake8 itself if the installed pyflakes/pycodestyle don't fit.
+    """
+
+    def __init__(self, sources: SourceCache | None = None):
+        super().__init__()
+        self.sources = sources
+
+    def analyze(self, repo_path: str, changed_files: List[Dict]) -> List[Dict]:
+        if not lint_supported():
+            return super().analyze(repo_path, changed_files)
+        issues: List[Dict] = []
+        sources = self.sources or get_source_cache()
+        options = _Flake8Options.load(repo_path)
+        for filename in self.targets(repo_path, changed_files):
+            check_cancelled()
+            try:
+                source = sources.get(os.path.join(repo_path, filename))
+            except OSError:
+                continue
+            for line, code, message in lint_source(filename, source, options):
+                issues.append({
+                    "path": filename,
+                    "line": line,
+                    "severity": "error" if code.startswith("E") else "warning",
+                    "rule": code,
+                    "message": message,
+                    "suggestion": ""
+                })
+        return issues
+
+    def version(self) -> str:
+        if not lint_supported():
+            return super().version()
+        return f"pyflakes {pyflakes_version}, pycodestyle {pycodestyle.__version__}"
+
+
+class InProcessSecurityAnalyzer(SecurityAnalyzer):
+    """
+    bandit's AST checks run as library calls on a shared ParsedSource.
+    Runs the bandit command if bandit is missing or its internals don't fit.
+    """
+
+    def __init__(self, sources: SourceCache | None = None):
+        self.sources = sources
+
+    def analyze(self, repo_path: str, changed_files: List[Dict]) -> List[Dict]:
+        if not bandit_supported():
+            return super().analyze(repo_path, changed_files)
+        issues: List[Dict] = []
+        engine = _get_bandit()
+        sources = self.sources or get_source_cache()
+        for filename in self.targets(repo_path, changed_files):
+            check_cancelled()
+            path = os.path.join(repo_path, filename)
+            try:
+                source = sources.get(path)
+            except OSError:
+                continue
+            for r in engine.run(path, source):
+                issues.append({
+                    "path": filename,
+                    "line": r.lineno,
+                    "severity": "warning",
+                    "rule": r.test,
+                    "message": r.text,
+                    "suggestion": ""
+                })
+        return issues
+
+    def version(self) -> str:
+        if not bandit_supported():
+            return super().version()
+        import bandit
+        return f"bandit {bandit.__version__}"
+
+
+_supported: Dict[str, bool] = {}
+_supported_lock = threading.Lock()
+
+
+def _probe(name: str, check) -> bool:
+    """Whether `check` runs on the installed library versions; tried once per process."""
+    with _supported_lock:
+        if name not in _supported:
+            try:
+                check(ParsedSource(PROBE_SOURCE))
+                _supported[name] = True
+            except INCOMPATIBLE:
+                _supported[name] = False
+        return _supported[name]
+
+
+def lint_supported() -> bool:
+    return _probe("lint", lambda source: lint_source("probe.py", source))
+
+
+def bandit_supported() -> bool:
+    return _probe("bandit", lambda source: _get_bandit().run("probe.py", source))
+
+
+# -------------------------
+# flake8 emulation
+
+class _Flake8Options:
+    def __init__(self, max_line_length: int = FLAKE8_DEFAULT_MAX_LINE_LENGTH,
+                 select: Tuple[str, ...] = (), ignore: Tuple[str, ...] = FLAKE8_DEFAULT_IGNORE):
+        self.max_line_length = max_line_length
+        self.select = select
+        self.ignore = ignore
+
+    @classmethod
+    def load(cls, repo_path: str) -> "_Flake8Options":
+        """Options from the first config file with a [flake8] section, as flake8 does."""
+        for name in ("setup.cfg", "tox.ini", ".flake8"):
+            parser = configparser.RawConfigParser()
+            try:
+                parser.read(os.path.join(repo_path, name), encoding="utf-8")
+            except (configparser.Error, UnicodeDecodeError):
+                continue
+            if not parser.has_section("flake8"):
+                continue
+            section = parser["flake8"]
+            options = cls()
+            if section.get("max-line-length", "").strip().isdigit():
+                options.max_line_length = int(section["max-line-length"])
+            if "select" in section:
+                options.select = _codes(section["select"])
+            if "ignore" in section:
+                options.ignore = _codes(section["ignore"])
+            options.ignore += _codes(section.get("extend-ignore", ""))
+            return options
+        return cls()
+
+    def selected(self, code: str) -> bool:
+        # The longest matching prefix wins, like flake8's decision engine
+        select = max((len(p) for p in self.select if code.startswith(p)), default=-1 if self.select else 0)
+        if select < 0:
+            return False
+        ignore = max((len(p) for p in self.ignore if code.startswith(p)), default=-1)
+        return ignore < 0 or ignore < select
+
+
+def _codes(value: str) -> Tuple[str, ...]:
+    return tuple(c for c in re.split(r"[,\s]+", value.strip()) if c)
+
+
+def _noqa(source: ParsedSource) -> Dict[int, Tuple[str, ...] | None] | None:
+    """Line -> suppressed code prefixes (None: all), or None if the whole file is skipped."""
+    found: Dict[int, Tuple[str, ...] | None] = {}
+    for line, comment in source.comments():
+        if NOQA_FILE.search(comment):
+            return None
+        match = NOQA.search(comment)
+        if match:
+            found[line] = _codes(match.group("codes")) if match.group("codes") else None
+    return found
+
+
+_style_options: Dict[int, object] = {}
+_style_options_lock = threading.Lock()
+
+
+def _style_guide_options(max_line_length: int):
+    with _style_options_lock:
+        options = _style_options.get(max_line_length)
+        if options is None:
+            # Run every check; selection happens afterwards, flake8-style
+            options = pycodestyle.StyleGuide(select=("E", "W"), max_line_length=max_line_length).options
+            _style_options[max_line_length] = options
+        return options
+
+
+def lint_source(filename: str, source: ParsedSource,
+                options: _Flake8Options | None = None) -> List[Tuple[int, str, str]]:
+    """flake8-style (line, code, message) results for one parsed file, sorted by position."""
+    options = options or _Flake8Options()
+    noqa = _noqa(source)
+    if noqa is None:
+        return []
+
+    if source.tree is None:
+        err = source.syntax_error
+        found = [(err.lineno or 1, 0, "E999", f"{type(err).__name__}: {err.msg}")]
+    else:
+        found = []
+        for m in FlakesChecker(source.tree, filename=filename, withDoctest=False).messages:
+            code = FLAKE8_PYFLAKES_CODES.get(type(m).__name__, "F999")
+            found.append((m.lineno, m.col, code, m.message % m.message_args))
+        style_options = _style_guide_options(options.max_line_length)
+        report = _StyleReport(style_options)
+        _StyleChecker(filename, source, style_options, report).check_all()
+        found.extend(report.found)
+
+    results = []
+    for line, col, code, message in sorted(found, key=lambda r: (r[0], r[1])):
+        if not options.selected(code):
+            continue
+        if line in noqa and (noqa[line] is None or code.startswith(noqa[line])):
+            continue
+        results.append((line, code, message))
+    return results
+
+
+class _StyleReport(pycodestyle.BaseReport):
+    def __init__(self, options):
+        super().__init__(options)
+        self.found = []
+
+    def error(self, line_number, offset, text, check):
+        code = text[:4]
+        self.found.append((line_number, offset + 1, code, text[5:]))
+        return code
+
+
+class _StyleChecker(pycodestyle.Checker):
+    """pycodestyle.Checker fed from a ParsedSource's lines, tokens and tree."""
+
+    def __init__(self, filename: str, source: ParsedSource, options, report: _StyleReport):
+        super().__init__(filename, lines=list(source.lines), options=options, report=report)
+        self.source = source
+
+    def check_ast(self):
+        for _, cls, _ in self._ast_checks:
+            for lineno, offset, text, check in cls(self.source.tree, self.filename).run():
+                self.report_error(lineno, offset, text, check)
+
+    def generate_tokens(self):
+        prev_physical = ""
+        for token in self.source.tokens:
+            if token.start[0] > self.total_lines:
+                return
+            # Keep the readline() bookkeeping (line_number, indent_char)
+            # that physical checks rely on
+            while self.line_number < min(token.end[0], self.total_lines):
+                self.readline()
+            self.maybe_check_physical(token, prev_physical)
+            yield token
+            prev_physical = token.line
+        if self.source.token_error is not None:
+            try:
+                raise self.source.token_error
+            except (SyntaxError, tokenize.TokenError):
+                self.report_invalid_syntax()
+
+
+# -------------------------
+# bandit
+
+class _BanditEngine:
+    """bandit's config and test set, loaded once; runs its node visitor on a pre-parsed tree."""
+
+    def __init__(self):
+        from bandit.core import config, test_set
+        self.config = config.BanditConfig()
+        self.tests = test_set.BanditTestSet(self.config)
+
+    def run(self, path: str, source: ParsedSource) -> List:
+        from bandit.core import manager, meta_ast, metrics, node_visitor
+        if source.tree is None:
+            return []  # bandit skips files it can't parse
+        nosec_lines = {}
+        for line, comment in source.comments():
+            tests = manager._parse_nosec_comment(comment)
+            if tests is not None:
+                nosec_lines[line] = tests
+
+        file_metrics = metrics.Metrics()
+        file_metrics.begin(path)
+        fdata = io.BytesIO(source.raw)
+        visitor = node_visitor.BanditNodeVisitor(
+            path, fdata, meta_ast.BanditMetaAst(), self.tests, False, nosec_lines, file_metrics,
+        )
+        # BanditNodeVisitor.process() without its own ast.parse()
+        visitor.generic_visit(source.tree)
+        visitor.context = {
+            "file_data": fdata,
+            "filename": path,
+            "lineno": 0,
+            "linerange": [0, 1],
+            "col_offset": 0,
+        }
+        visitor.update_scores(visitor.tester.run_tests(visitor.context, "File"))
+        return sorted(visitor.tester.results, key=lambda r: r.lineno or 0)
+
+
+_bandit: _BanditEngine | None = None
+_bandit_lock = threading.Lock()
+
+
+def _get_bandit() -> _BanditEngine:
+    global _bandit
+    with _bandit_lock:
+        if _bandit is None:
+            _bandit = _BanditEngine()
+        return _bandit
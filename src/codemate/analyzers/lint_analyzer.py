@@ -1,44 +1,130 @@
-import subprocess
+import hashlib
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from codemate.utils.process import ToolError, run_command, tool_failure, tool_version
 from .base import AnalyzerBase
 from typing import List, Dict
 
+FLAKE8_FORMAT = "--format=%(path)s::%(row)d::%(code)s::%(text)s"
+FLAKE8_CONFIG_FILES = (".flake8", "setup.cfg", "tox.ini")
+
+
 class LintAnalyzer(AnalyzerBase):
+    def __init__(self, jobs: int | None = None, min_chunk_files: int = 25):
+        """
+        jobs: max number of flake8 processes run in parallel (default: CPU count)
+        min_chunk_files: don't split the file list into chunks smaller than this;
+            small PRs are linted in a single invocation
+        """
+        self.jobs = jobs or os.cpu_count() or 1
+        self.min_chunk_files = min_chunk_files
+
     def analyze(self, repo_path: str, changed_files: List[Dict]) -> List[Dict]:
         """
         Run flake8 on the changed files and return issues.
+        All files are linted in one invocation, or in a few size-balanced
+        chunks run in parallel, and results are mapped back per file.
         """
         issues: List[Dict] = []
 
-        for f in changed_files:
-            filename = f["filename"]
-            patch = f.get("patch", "")
-            # Skip deleted files
-            if patch is None:
-                continue
+        targets = self.targets(repo_path, changed_files)
+        if not targets:
+            return issues
 
-            # Run flake8 only on the changed file
-            try:
-                result = subprocess.run(
-                    ["flake8", filename, "--format=%(path)s::%(row)d::%(code)s::%(text)s"],
-                    capture_output=True,
-                    text=True,
-                    cwd=repo_path
-                )
-            except FileNotFoundError:
-                print("flake8 not installed. Install with 'pip install flake8'")
-                return issues
-
-            for line in result.stdout.strip().split("\n"):
+        chunks = self._chunks(repo_path, targets)
+        try:
+            if len(chunks) == 1:
+                outputs = [self._run_flake8(repo_path, chunks[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+                    outputs = list(pool.map(lambda c: self._run_flake8(repo_path, c), chunks))
+        except FileNotFoundError:
+            raise ToolError("flake8 not installed. Install with 'pip install flake8'")
+
+        # flake8 echoes paths as given; map them back to the PR filenames
+        by_path: Dict[str, List[Dict]] = {os.path.normpath(t): [] for t in targets}
+        for output in outputs:
+            for line in output.strip().split("\n"):
                 if not line:
                     continue
                 path, row, code, msg = line.split("::", 3)
                 severity = "error" if code.startswith("E") else "warning"
-                issues.append({
-                    "path": path,
+                by_path.setdefault(os.path.normpath(path), []).append({
                     "line": int(row),
                     "severity": severity,
                     "rule": code,
                     "message": msg,
+                })
+
+        for filename in targets:
+            for found in by_path.get(os.path.normpath(filename), []):
+                issues.append({
+                    "path": filename,
+                    "line": found["line"],
+                    "severity": found["severity"],
+                    "rule": found["rule"],
+                    "message": found["message"],
                     "suggestion": ""
                 })
         return issues
+
+    def version(self) -> str:
+        return tool_version("flake8")
+
+    def config_fingerprint(self, repo_path: str) -> str:
+        h = hashlib.sha256(FLAKE8_FORMAT.encode())
+        for name in FLAKE8_CONFIG_FILES:
+            try:
+                with open(os.path.join(repo_path, name), "rb") as fh:
+                    h.update(name.encode() + b"\0" + fh.read())
+            except OSError:
+                continue
+        return h.hexdigest()
+
+    def targets(self, repo_path: str, changed_files: List[Dict]) -> List[str]:
+        """
+        Python files that still exist in the checkout and have added lines;
+        deleted files and pure deletions are skipped.
+        """
+        targets = []
+        for f in changed_files:
+            filename = f["filename"]
+            if not filename.endswith(".py") or f.get("status") == "removed":
+                continue
+            if f.get("changed_lines") is not None and not f["changed_lines"]:
+                continue
+            if not os.path.isfile(os.path.join(repo_path, filename)):
+                continue
+            targets.append(filename)
+        return targets
+
+    def _chunks(self, repo_path: str, targets: List[str]) -> List[List[str]]:
+        """Split targets into at most `jobs` chunks of roughly equal total size."""
+        count = min(self.jobs, max(1, len(targets) // self.min_chunk_files))
+        if count <= 1:
+            return [targets]
+
+        sized = sorted(
+            ((os.path.getsize(os.path.join(repo_path, t)), t) for t in targets),
+            reverse=True,
+        )
+        # Largest file first into the currently lightest chunk
+        heap = [(0, i) for i in range(count)]
+        chunks: List[List[str]] = [[] for _ in range(count)]
+        for size, target in sized:
+            total, i = heapq.heappop(heap)
+            chunks[i].append(target)
+            heapq.heappush(heap, (total + size, i))
+        return [c for c in chunks if c]
+
+    def _run_flake8(self, repo_path: str, filenames: List[str]) -> str:
+        # Parallelism is handled here, so keep each flake8 single-process
+        result = run_command(
+            ["flake8", "--jobs=1", FLAKE8_FORMAT, "--", *filenames],
+            cwd=repo_path
+        )
+        # Exit status 1 with violations on stdout is a normal run; otherwise flake8 failed
+        if result.returncode != 0 and not result.stdout.strip():
+            raise ToolError(tool_failure(result))
+        return result.stdout
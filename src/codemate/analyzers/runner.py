@@ -0,0 +1,125 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict
+from codemate.utils.cancel import CancelToken, Cancelled, current_token, use_token
+from codemate.metrics import observe_analyzer
+from .base import AnalyzerBase
+
+
+class AnalyzerRun:
+    """Merged outcome of running several analyzers over the same files."""
+
+    def __init__(self):
+        self.issues: List[Dict] = []
+        self.completed: List[str] = []
+        self.timed_out: List[str] = []
+        self.failed: Dict[str, str] = {}
+        self.durations: Dict[str, float] = {}
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.timed_out or self.failed)
+
+    def to_dict(self) -> Dict:
+        return {
+            "completed": self.completed,
+            "timed_out": self.timed_out,
+            "failed": self.failed,
+            "durations": {k: round(v, 3) for k, v in self.durations.items()},
+        }
+
+
+class AnalyzerRunner:
+    """
+    Run analyzers concurrently on a thread pool.
+    The analyzers shipped here spend their time in subprocesses (flake8,
+    bandit) or network calls, so threads give real parallelism.
+
+    timeout: wall-clock limit per analyzer, in seconds
+    budget: wall-clock limit for the whole run, in seconds
+    An analyzer that overruns is cancelled (killing its subprocesses) and its
+    issues are left out; results of the others are still returned.
+    """
+
+    def __init__(self, analyzers: List[AnalyzerBase], timeout: float | None = None,
+                 budget: float | None = None, max_workers: int | None = None):
+        self.analyzers = analyzers
+        self.timeout = timeout
+        self.budget = budget
+        self.max_workers = max_workers or max(1, len(analyzers))
+
+    def run(self, repo_path: str, changed_files: List[Dict]) -> AnalyzerRun:
+        result = AnalyzerRun()
+        if not self.analyzers:
+            return result
+
+        start = time.monotonic()
+        budget_end = start + self.budget if self.budget is not None else None
+        parent = current_token()
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="codemate-analyzer")
+        running = {}
+        try:
+            for analyzer in self.analyzers:
+                token = CancelToken(parent)
+                ctx = contextvars.copy_context()
+                future = pool.submit(ctx.run, self._run_one, analyzer, token, repo_path, changed_files)
+                running[future] = (analyzer, token)
+
+            outcomes: Dict[AnalyzerBase, List[Dict]] = {}
+            pending = set(running)
+            while pending:
+                now = time.monotonic()
+                deadlines = [d for d in (budget_end, self._deadline(start)) if d is not None]
+                wait_for = max(0.0, min(deadlines) - now) if deadlines else None
+                done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    analyzer, _ = running[future]
+                    result.durations[analyzer.name] = time.monotonic() - start
+                    try:
+                        outcomes[analyzer] = future.result()
+                        result.completed.append(analyzer.name)
+                    except Cancelled:
+                        result.timed_out.append(analyzer.name)
+                    except Exception as e:
+                        print(f"Analyzer {analyzer.name} failed:", e)
+                        result.failed[analyzer.name] = str(e)
+
+                if pending and deadlines and time.monotonic() >= min(deadlines):
+                    for future in pending:
+                        analyzer, token = running[future]
+                        token.cancel("timeout")
+                        result.timed_out.append(analyzer.name)
+                        result.durations[analyzer.name] = time.monotonic() - start
+                    pending = set()
+        finally:
+            # Don't block on overrunning analyzers; their tokens are cancelled
+            pool.shutdown(wait=False)
+
+        if parent is not None:
+            parent.check()
+
+        # Merge in analyzer order so output is deterministic
+        for analyzer in self.analyzers:
+            result.issues.extend(outcomes.get(analyzer, []))
+        return result
+
+    def _deadline(self, start: float) -> float | None:
+        return start + self.timeout if self.timeout is not None else None
+
+    def _run_one(self, analyzer: AnalyzerBase, token: CancelToken, repo_path: str,
+                 changed_files: List[Dict]) -> List[Dict]:
+        t0 = time.perf_counter()
+        outcome = "failed"
+        try:
+            with use_token(token):
+                issues = analyzer.analyze(repo_path, changed_files)
+                token.check()
+            outcome = "completed"
+        except Cancelled as e:
+            outcome = str(e) or "cancelled"
+            raise
+        finally:
+            observe_analyzer(analyzer.name, time.perf_counter() - t0, outcome)
+        return issues
@@ -0,0 +1,63 @@
+# src/codemate/analyzers/secret_analyzer.py
+import os
+from typing import Dict, Iterator, List, Tuple
+from codemate.diff.parser import parse_file_patch
+from codemate.utils.cancel import check_cancelled
+from .base import AnalyzerBase
+from .secret_rules import SecretRules, get_secret_rules
+
+
+class SecretAnalyzer(AnalyzerBase):
+    """
+    Looks for credentials in the added lines of every changed file,
+    whatever its type (.env, YAML, JSON, source...). Only the diff is
+    scanned, so cost grows with the size of the change, not of the files.
+    A local analysis has no diff; there, whole files are scanned.
+    """
+
+    reads_files = False
+
+    def __init__(self, rules: SecretRules | None = None):
+        self.rules = rules
+
+    def analyze(self, repo_path: str, changed_files: List[Dict]) -> List[Dict]:
+        issues: List[Dict] = []
+        rules = self.rules or get_secret_rules()
+
+        for f in changed_files:
+            if f.get("status") == "removed":
+                continue
+            check_cancelled()
+            for line_no, content in _scanned_lines(repo_path, f):
+                for rule, secret in rules.scan(content):
+                    issues.append({
+                        "path": f["filename"],
+                        "line": line_no,
+                        "severity": rule.severity,
+                        "rule": rule.id,
+                        "message": f"Possible {rule.description} added ({_redact(secret)})",
+                        "suggestion": "Remove it, rotate the credential and load it from the environment "
+                                      "or a secret manager instead."
+                    })
+        return issues
+
+
+def _scanned_lines(repo_path: str, changed_file: Dict) -> Iterator[Tuple[int, str]]:
+    """(line number, text) of the added lines; every line of the file for a local analysis."""
+    if changed_file.get("local"):
+        try:
+            with open(os.path.join(repo_path, changed_file["filename"]), encoding="utf-8", errors="replace") as fh:
+                yield from enumerate((line.rstrip("\r\n") for line in fh), start=1)
+        except OSError:
+            pass
+        return
+    diff = changed_file.get("diff")
+    if diff is None:
+        diff = parse_file_patch(changed_file.get("patch"), changed_file["filename"])
+    for line in diff.iter_lines(added_only=True):
+        yield line.new_line, line.content
+
+
+def _redact(secret: str) -> str:
+    # Never echo a credential back into a PR comment
+    return secret[:4] + "****" if len(secret) > 8 else "****"
@@ -0,0 +1,122 @@
+# src/codemate/analyzers/secret_rules.py
+import math
+import re
+import threading
+from collections import Counter
+from typing import Iterator, List, NamedTuple, Tuple
+from codemate.utils.aho_corasick import AhoCorasick
+
+
+class SecretRule(NamedTuple):
+    id: str
+    description: str
+    keywords: Tuple[str, ...]   # lowercase literals, at least one must occur in the line
+    pattern: str                # verification regex; group 1 (if any) is the secret
+    min_entropy: float = 0.0    # Shannon entropy (bits/char) the secret must reach
+    severity: str = "error"
+
+
+# Values that are obviously not real secrets
+PLACEHOLDERS = ("example", "changeme", "placeholder", "xxxx", "dummy", "your_", "your-", "redacted",
+                "<", ">", "${", "{{", "%(", "environ", "getenv", "process.env")
+
+GENERIC_KEYS = r"(?:password|passwd|pwd|secret|token|api[_-]?key|access[_-]?key|private[_-]?key|client[_-]?secret)"
+
+RULES: List[SecretRule] = [
+    SecretRule("aws-access-key-id", "AWS access key ID", ("akia", "asia", "abia", "acca"),
+               r"\b((?:AKIA|ASIA|ABIA|ACCA)[A-Z0-9]{16})\b", 3.0),
+    SecretRule("aws-secret-access-key", "AWS secret access key", ("aws",),
+               r"(?i)aws.{0,20}secret.{0,20}[=:>]\s*[\"']?([A-Za-z0-9/+=]{40})\b", 4.0),
+    SecretRule("github-token", "GitHub token", ("ghp_", "gho_", "ghu_", "ghs_", "ghr_", "github_pat_"),
+               r"\b((?:gh[pousr]_[A-Za-z0-9]{36,255})|(?:github_pat_[A-Za-z0-9_]{82}))\b", 3.0),
+    SecretRule("gitlab-token", "GitLab personal access token", ("glpat-",),
+               r"\b(glpat-[A-Za-z0-9_-]{20,})\b", 3.0),
+    SecretRule("slack-token", "Slack token", ("xoxb-", "xoxa-", "xoxp-", "xoxr-", "xoxs-"),
+               r"\b(xox[baprs]-[A-Za-z0-9-]{10,})\b", 3.0),
+    SecretRule("slack-webhook", "Slack webhook URL", ("hooks.slack.com",),
+               r"(https://hooks\.slack\.com/services/[A-Za-z0-9_]+/[A-Za-z0-9_]+/[A-Za-z0-9_]+)"),
+    SecretRule("stripe-key", "Stripe live key", ("sk_live_", "rk_live_"),
+               r"\b((?:sk|rk)_live_[A-Za-z0-9]{24,})\b", 3.0),
+    SecretRule("google-api-key", "Google API key", ("aiza",),
+               r"\b(AIza[0-9A-Za-z_-]{35})\b", 3.0),
+    SecretRule("private-key", "private key", ("-----begin",),
+               r"-----BEGIN (?:RSA |EC |DSA |OPENSSH |PGP |ENCRYPTED )?PRIVATE KEY(?: BLOCK)?-----"),
+    SecretRule("jwt", "JSON web token", ("eyj",),
+               r"\b(eyJ[A-Za-z0-9_-]{10,}\.eyJ[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{10,})", 3.0, "warning"),
+    SecretRule("url-credentials", "password in URL", ("://",),
+               r"\b[a-z][a-z0-9+.-]*://[^\s:/@\"']+:([^\s:/@\"']{6,})@", 2.5, "warning"),
+    SecretRule("generic-secret", "hardcoded secret",
+               ("password", "passwd", "pwd", "secret", "token", "api_key", "api-key", "apikey",
+                "access_key", "access-key", "accesskey", "private_key", "private-key", "client_secret"),
+               # Quoted values anywhere, unquoted ones only at the end of a
+               # KEY=value line (.env, properties, YAML) and with a digit
+               r"(?i)" + GENERIC_KEYS + r"[\w.-]{0,20}[\"']?\s*(?:=|:|=>|:=)\s*"
+               r"(?:[\"']([^\"'\s]{8,})[\"']|([A-Za-z0-9+/=_-]*[0-9][A-Za-z0-9+/=_-]*)\s*$)",
+               3.0, "warning"),
+]
+
+
+def shannon_entropy(value: str) -> float:
+    if not value:
+        return 0.0
+    length = len(value)
+    return -sum(n / length * math.log2(n / length) for n in Counter(value).values())
+
+
+class SecretRules:
+    """
+    A rule set compiled once: every keyword of every rule goes into one
+    Aho-Corasick automaton, so a line is scanned in a single pass and only
+    the rules whose keywords occur in it run their verification regex.
+    """
+
+    def __init__(self, rules: List[SecretRule]):
+        self.rules = list(rules)
+        self._regexes = [re.compile(rule.pattern) for rule in self.rules]
+        keywords: List[str] = []
+        self._keyword_rules: List[Tuple[int, ...]] = []
+        positions = {}
+        for r, rule in enumerate(self.rules):
+            for keyword in rule.keywords:
+                if keyword not in positions:
+                    positions[keyword] = len(keywords)
+                    keywords.append(keyword)
+                    self._keyword_rules.append(())
+                self._keyword_rules[positions[keyword]] += (r,)
+        self._matcher = AhoCorasick(keywords)
+
+    def scan(self, line: str) -> Iterator[Tuple[SecretRule, str]]:
+        """Yield (rule, secret) for each rule with a verified match in `line`."""
+        hits = self._matcher.matched(line.lower())
+        if not hits:
+            return
+        candidates = set()
+        for keyword in hits:
+            candidates.update(self._keyword_rules[keyword])
+        found = set()
+        # Rules are ordered specific to generic; a secret is reported once
+        for r in sorted(candidates):
+            rule = self.rules[r]
+            for match in self._regexes[r].finditer(line):
+                secret = next((g for g in match.groups() if g), match.group(0))
+                if rule.min_entropy and shannon_entropy(secret) < rule.min_entropy:
+                    continue
+                lowered = secret.lower()
+                if secret in found or any(p in lowered for p in PLACEHOLDERS):
+                    continue
+                found.add(secret)
+                yield rule, secret
+                break  # one finding per rule and line
+
+
+_secret_rules: SecretRules | None = None
+_secret_rules_lock = threading.Lock()
+
+
+def get_secret_rules() -> SecretRules:
+    """Process-wide compiled rule set (built on first use)."""
+    global _secret_rules
+    with _secret_rules_lock:
+        if _secret_rules is None:
+            _secret_rules = SecretRules(RULES)
+        return _secret_rules
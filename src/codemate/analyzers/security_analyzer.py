@@ -1,32 +1,68 @@
-import subprocess
+import hashlib
+import json
+import os
+from codemate.utils.process import ToolError, run_command, tool_failure, tool_version
 from .base import AnalyzerBase
 from typing import List, Dict
 
+BANDIT_CONFIG_FILE = ".bandit"
+
+
+def _pyproject_bandit_section(text: str) -> str:
+    """The [tool.bandit] table of a pyproject.toml (and its subtables), as written."""
+    section: List[str] = []
+    inside = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("["):
+            header = stripped.strip("[]").strip()
+            inside = header == "tool.bandit" or header.startswith("tool.bandit.")
+        if inside:
+            section.append(line)
+    return "\n".join(section)
+
+
 class SecurityAnalyzer(AnalyzerBase):
+    def version(self) -> str:
+        return tool_version("bandit")
+
+    def config_fingerprint(self, repo_path: str) -> str:
+        h = hashlib.sha256()
+        try:
+            with open(os.path.join(repo_path, BANDIT_CONFIG_FILE), "rb") as fh:
+                h.update(BANDIT_CONFIG_FILE.encode() + b"\0" + fh.read())
+        except OSError:
+            pass
+        try:
+            with open(os.path.join(repo_path, "pyproject.toml"), encoding="utf-8", errors="replace") as fh:
+                h.update(b"pyproject.toml\0" + _pyproject_bandit_section(fh.read()).encode())
+        except OSError:
+            pass
+        return h.hexdigest()
+
     def analyze(self, repo_path: str, changed_files: List[Dict]) -> List[Dict]:
         issues: List[Dict] = []
 
-        filenames = [f["filename"] for f in changed_files if f.get("patch")]
+        filenames = self.targets(repo_path, changed_files)
         if not filenames:
             return issues
 
         try:
-            result = subprocess.run(
-                ["bandit", "-f", "json", "-q", *filenames],
-                capture_output=True, text=True, cwd=repo_path
-            )
-            import json
-            data = json.loads(result.stdout)
+            result = run_command(["bandit", "-f", "json", "-q", *filenames], cwd=repo_path)
         except FileNotFoundError:
-            print("bandit not installed. Install with 'pip install bandit'")
-            return issues
-        except Exception as e:
-            print("Bandit failed:", e)
-            return issues
+            raise ToolError("bandit not installed. Install with 'pip install bandit'")
+        # Exit status 1 only means issues were found
+        if result.returncode not in (0, 1):
+            raise ToolError(tool_failure(result))
+        try:
+            data = json.loads(result.stdout)
+        except ValueError:
+            raise ToolError(f"bandit output is not JSON ({tool_failure(result)})")
 
         for r in data.get("results", []):
             issues.append({
-                "path": r.get("filename"),
+                # bandit reports "./path"; match the PR filename
+                "path": os.path.normpath(r.get("filename")),
                 "line": r.get("line_number"),
                 "severity": "warning",
                 "rule": r.get("test_name"),
@@ -35,3 +71,11 @@ class SecurityAnalyzer(AnalyzerBase):
             })
 
         return issues
+
+    def targets(self, repo_path: str, changed_files: List[Dict]) -> List[str]:
+        # bandit parses any file it is given explicitly, even a lockfile
+        return [
+            f["filename"] for f in changed_files
+            if f["filename"].endswith(".py") and f.get("status") != "removed" and (f.get("patch") or f.get("local"))
+            and (f.get("changed_lines") is None or f["changed_lines"])
+        ]
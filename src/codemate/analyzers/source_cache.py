@@ -0,0 +1,107 @@
+# src/codemate/analyzers/source_cache.py
+import ast
+import io
+import threading
+import tokenize
+from collections import OrderedDict
+from typing import List
+from codemate.config import settings
+from .cache import blob_sha
+
+
+class ParsedSource:
+    """
+    One Python source read, tokenized and parsed once.
+    Shared read-only by every in-process analyzer looking at the same content.
+    """
+
+    __slots__ = ("raw", "text", "lines", "tokens", "token_error", "tree", "syntax_error")
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        try:
+            encoding, _ = tokenize.detect_encoding(io.BytesIO(raw).readline)
+            self.text = raw.decode(encoding)
+        except (SyntaxError, LookupError, UnicodeDecodeError):
+            self.text = raw.decode("utf-8", "replace")
+        if self.text.startswith("\ufeff"):
+            self.text = self.text[1:]
+        # Universal newlines, like the tools' own readers
+        self.text = io.StringIO(self.text, newline=None).read()
+        self.lines: List[str] = io.StringIO(self.text).readlines()
+
+        # Tokens up to the first error; consumers replay the error themselves
+        self.tokens: List[tokenize.TokenInfo] = []
+        self.token_error: Exception | None = None
+        try:
+            self.tokens.extend(tokenize.generate_tokens(io.StringIO(self.text).readline))
+        except (SyntaxError, tokenize.TokenError) as e:
+            self.token_error = e
+
+        self.tree: ast.Module | None = None
+        self.syntax_error: SyntaxError | None = None
+        try:
+            self.tree = ast.parse(self.text)
+        except (SyntaxError, ValueError) as e:
+            self.syntax_error = e if isinstance(e, SyntaxError) else SyntaxError(str(e))
+
+    def comments(self):
+        """(line, comment text) for every comment token."""
+        for tok in self.tokens:
+            if tok.type == tokenize.COMMENT:
+                yield tok.start[0], tok.string
+
+
+class SourceCache:
+    """
+    LRU of ParsedSource keyed by content hash (git blob SHA), so a file is
+    parsed once per content no matter how many analyzers, files or reviews
+    look at it.
+    """
+
+    def __init__(self, max_items: int = 512):
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[str, ParsedSource]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> ParsedSource:
+        """Parsed source of the file at `path`; raises OSError if unreadable."""
+        with open(path, "rb") as fh:
+            raw = fh.read()
+        return self.parse(raw)
+
+    def parse(self, raw: bytes) -> ParsedSource:
+        key = blob_sha(raw)
+        # Parsing under the lock keeps concurrent analyzers from parsing the
+        # same file twice; it's CPU-bound under the GIL either way
+        with self._lock:
+            parsed = self._items.get(key)
+            if parsed is not None:
+                self.hits += 1
+                self._items.move_to_end(key)
+                return parsed
+            self.misses += 1
+            parsed = ParsedSource(raw)
+            self._items[key] = parsed
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+            return parsed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "items": len(self._items)}
+
+
+_source_cache: SourceCache | None = None
+_source_cache_lock = threading.Lock()
+
+
+def get_source_cache() -> SourceCache:
+    """Process-wide parse cache, configured from settings."""
+    global _source_cache
+    with _source_cache_lock:
+        if _source_cache is None:
+            _source_cache = SourceCache(settings.source_cache_items)
+        return _source_cache
@@ -0,0 +1,278 @@
+# src/codemate/batch.py
+"""
+Batch backfills (`codemate batch`): review many pull requests, or all
+open ones of a repository, with a bounded number running at once.
+
+- Workers lease providers from a fixed pool, so HTTP sessions and their
+  keep-alive connections are reused across reviews.
+- A rate-limit budget, fed from the X-RateLimit headers the providers
+  saw, holds back new reviews while the remaining API calls get close to
+  the reserve, until the window resets.
+- Each finished review is appended to a JSON-lines checkpoint; a rerun
+  skips PRs already done there at the same head commit.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+Target = Tuple[str, int | None]  # (repo, PR number); None means all open PRs
+
+
+def parse_target(text: str) -> Target:
+    """Parse "owner/repo#123" (or "owner/repo 123") to ("owner/repo", 123), "owner/repo" to ("owner/repo", None)."""
+    text = text.strip()
+    repo, _, number = text.replace(" ", "#", 1).partition("#")
+    if repo.count("/") != 1 or not all(repo.split("/")):
+        raise ValueError(f"Not a repo or PR: {text!r} (expected owner/repo or owner/repo#123)")
+    if not number:
+        return repo, None
+    if not number.isdigit():
+        raise ValueError(f"Not a PR number: {text!r}")
+    return repo, int(number)
+
+
+def read_targets(path: str) -> List[Target]:
+    """Targets from a file, one per line; blank lines and # comments are ignored."""
+    targets = []
+    with open(path) as fh:
+        for line in fh:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                targets.append(parse_target(line))
+    return targets
+
+
+class ProviderPool:
+    """A fixed set of providers shared by the batch workers."""
+
+    def __init__(self, factory: Callable, size: int):
+        self.providers = [factory() for _ in range(max(1, size))]
+        self._free: "queue.Queue" = queue.Queue()
+        for provider in self.providers:
+            self._free.put(provider)
+
+    @contextmanager
+    def lease(self) -> Iterator:
+        provider = self._free.get()
+        try:
+            yield provider
+        finally:
+            self._free.put(provider)
+
+    def request_count(self) -> int:
+        return sum(getattr(p, "request_count", 0) for p in self.providers)
+
+    def close(self):
+        for provider in self.providers:
+            close = getattr(provider, "close", None)
+            if close is not None:
+                close()
+
+
+class RateLimitBudget:
+    """
+    Gate for starting reviews within the API rate limit.
+
+    A review may start if the last known remaining calls, minus what the
+    reviews in flight are expected to use, stays above `reserve`. The
+    expected use per review is the running average of observed reviews
+    (`initial_cost` until there is one). Otherwise start() waits for the
+    rate-limit reset. Without any rate-limit reading everything starts.
+    """
+
+    def __init__(self, reserve: int = 500, initial_cost: float = 20.0, clock: Callable[[], float] = time.time):
+        self.reserve = reserve
+        self.cost = initial_cost
+        self.clock = clock
+        self.remaining: int | None = None
+        self.reset: float | None = None
+        self.in_flight = 0
+        self.reviews = 0
+        self.waited_seconds = 0.0
+        self._cond = threading.Condition()
+
+    def start(self):
+        with self._cond:
+            while not self._affordable():
+                wait = (self.reset or 0) - self.clock()
+                if wait <= 0:
+                    # The window has reset since the last reading
+                    self.remaining = None
+                    break
+                t0 = time.monotonic()
+                self._cond.wait(min(wait, 5.0))
+                self.waited_seconds += time.monotonic() - t0
+            self.in_flight += 1
+
+    def _affordable(self) -> bool:
+        return self.remaining is None or self.remaining - (self.in_flight + 1) * self.cost > self.reserve
+
+    def finish(self, requests: int, remaining: int | None, reset: float | None):
+        """Record a finished review: API calls it made and the latest rate-limit reading."""
+        with self._cond:
+            self.in_flight -= 1
+            self.reviews += 1
+            self.cost += (requests - self.cost) / self.reviews
+        self.observe(remaining, reset)
+
+    def observe(self, remaining: int | None, reset: float | None):
+        """
+        Take a rate-limit reading (X-RateLimit-Remaining / -Reset). Readings
+        come from several providers and may arrive out of order: within one
+        window the lowest count wins, and readings of an older window are ignored.
+        """
+        with self._cond:
+            if remaining is None or (reset is not None and self.reset is not None and reset < self.reset):
+                pass
+            elif reset == self.reset and self.remaining is not None:
+                self.remaining = min(self.remaining, remaining)
+            else:
+                self.remaining, self.reset = remaining, reset
+            self._cond.notify_all()
+
+
+class Checkpoint:
+    """Append-only JSON-lines record of finished reviews, so a backfill can resume."""
+
+    def __init__(self, path: str | None):
+        self.path = path
+        self.done: Dict[Tuple[str, int], Dict] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line of an interrupted run
+                    if entry.get("status") == "done":
+                        self.done[(entry["repo"], entry["pr"])] = entry
+
+    def is_done(self, repo: str, pr: int, head_sha: str | None) -> bool:
+        """Whether the PR was reviewed at head_sha; a PR with new commits since is not done."""
+        entry = self.done.get((repo, pr))
+        return entry is not None and head_sha is not None and entry.get("head") == head_sha
+
+    def record(self, entry: Dict):
+        if entry["status"] == "done":
+            self.done[(entry["repo"], entry["pr"])] = entry
+        if not self.path:
+            return
+        with self._lock:
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            with open(self.path, "a") as fh:
+                fh.write(json.dumps(entry) + "\n")
+
+
+def expand_targets(provider, targets: List[Target]) -> List[Tuple[str, int, str | None]]:
+    """(repo, PR, head SHA or None) for each target; repo-only targets list their open PRs."""
+    expanded, seen = [], set()
+    for repo, number in targets:
+        if number is None:
+            prs = [(pr["number"], (pr.get("head") or {}).get("sha")) for pr in provider.list_open_pull_requests(repo)]
+        else:
+            prs = [(number, None)]
+        for pr_number, head_sha in prs:
+            if (repo, pr_number) not in seen:
+                seen.add((repo, pr_number))
+                expanded.append((repo, pr_number, head_sha))
+    return expanded
+
+
+def run_batch(targets: List[Target], pool: ProviderPool, reporter_factory: Callable, review: Callable,
+              concurrency: int = 4, budget: RateLimitBudget | None = None, checkpoint: Checkpoint | None = None,
+              dry_run: bool = False, progress: Callable[[Dict], None] | None = None) -> Dict:
+    """
+    Review all targets, at most `concurrency` at a time, skipping those
+    done in the checkpoint at their current head. `review` is called like
+    review_pull_request().
+    Returns {"results": [per-PR entries], "skipped", "seconds", "requests", "budget_wait_seconds"}.
+    """
+    budget = budget or RateLimitBudget()
+    checkpoint = checkpoint or Checkpoint(None)
+    t0 = time.perf_counter()
+    requests_before = pool.request_count()
+    with pool.lease() as provider:
+        work = expand_targets(provider, targets)
+        # Explicit PRs come without a head; look it up for those in the checkpoint
+        work = [(repo, pr_id, provider.get_head_sha(repo, pr_id)
+                 if head_sha is None and (repo, pr_id) in checkpoint.done else head_sha)
+                for repo, pr_id, head_sha in work]
+        budget.observe(getattr(provider, "rate_limit_remaining", None), getattr(provider, "rate_limit_reset", None))
+    pending = [w for w in work if not checkpoint.is_done(*w)]
+
+    def one(repo: str, pr_id: int, head_sha: str | None) -> Dict:
+        budget.start()
+        with pool.lease() as provider:
+            calls = getattr(provider, "request_count", 0)
+            started = time.perf_counter()
+            entry = {"repo": repo, "pr": pr_id}
+            try:
+                result = review(provider, reporter_factory(provider), repo, pr_id, head_sha=head_sha,
+                                dry_run=dry_run)
+                entry.update(status="done", head=result.get("head"), files=result.get("files_count"),
+                             issues=result.get("issues_count"), score=result.get("score"))
+            except Exception as e:
+                entry.update(status="failed", error=str(e) or type(e).__name__)
+            entry["seconds"] = round(time.perf_counter() - started, 3)
+            entry["requests"] = getattr(provider, "request_count", 0) - calls
+            budget.finish(entry["requests"], getattr(provider, "rate_limit_remaining", None),
+                          getattr(provider, "rate_limit_reset", None))
+        if not dry_run:
+            checkpoint.record(entry)
+        return entry
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="codemate-batch") as executor:
+        futures = [executor.submit(one, *w) for w in pending]
+        try:
+            for future in as_completed(futures):
+                entry = future.result()
+                results.append(entry)
+                if progress is not None:
+                    progress(entry)
+        except BaseException:
+            # Interrupted: let running reviews finish (and be checkpointed), drop the rest
+            for future in futures:
+                future.cancel()
+            raise
+
+    return {
+        "results": results,
+        "skipped": len(work) - len(pending),
+        "seconds": round(time.perf_counter() - t0, 3),
+        "requests": pool.request_count() - requests_before,
+        "budget_wait_seconds": round(budget.waited_seconds, 3),
+    }
+
+
+def format_report(report: Dict) -> str:
+    """Per-PR timings and aggregate throughput as a plain-text table."""
+    results = sorted(report["results"], key=lambda e: (e["repo"], e["pr"]))
+    width = max([len(f"{e['repo']}#{e['pr']}") for e in results] + [len("PR")])
+    lines = [f"{'PR':<{width}}  {'status':<7} {'seconds':>8} {'issues':>7} {'requests':>9}"]
+    for e in results:
+        issues = "" if e.get("issues") is None else e["issues"]
+        lines.append(f"{e['repo'] + '#' + str(e['pr']):<{width}}  {e['status']:<7} {e['seconds']:>8.2f} "
+                     f"{issues:>7} {e['requests']:>9}")
+        if e["status"] == "failed":
+            lines.append(f"{'':<{width}}  {e['error']}")
+    done = sum(1 for e in results if e["status"] == "done")
+    seconds = report["seconds"]
+    lines.append("")
+    lines.append(f"{done} reviewed, {len(results) - done} failed, {report['skipped']} already done "
+                 f"in {seconds:.1f}s ({done / seconds * 60 if seconds else 0:.1f} PRs/min)")
+    review_seconds = [e["seconds"] for e in results if e["status"] == "done"]
+    if review_seconds:
+        review_seconds.sort()
+        lines.append(f"per PR: mean {sum(review_seconds) / len(review_seconds):.2f}s, "
+                     f"p50 {review_seconds[len(review_seconds) // 2]:.2f}s, max {review_seconds[-1]:.2f}s")
+    lines.append(f"API requests: {report['requests']}, waited for rate limit: {report['budget_wait_seconds']:.1f}s")
+    return "\n".join(lines)
@@ -0,0 +1,167 @@
+# src/codemate/cache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+
+class TieredCache:
+    """
+    Key/value cache for JSON-serializable values.
+    An in-memory LRU tier sits in front of an optional SQLite file, so
+    entries survive process restarts. Thread-safe.
+
+    ttl: entries older than this many seconds are treated as missing
+    max_disk_bytes: oldest entries are evicted from the file beyond this size
+    """
+
+    def __init__(self, max_items: int = 10000, path: str | None = None,
+                 ttl: float | None = None, max_disk_bytes: int | None = None):
+        self.max_items = max_items
+        self.path = path
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        # key -> (JSON bytes, created)
+        self._memory: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        if path:
+            self._open(path)
+
+    def _open(self, path: str):
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, created REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS cache_created ON cache (created)")
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM cache WHERE created < ?", (time.time() - self.ttl,))
+        self._db.commit()
+        self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+    def _fresh(self, created: float) -> bool:
+        return self.ttl is None or time.time() - created <= self.ttl
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            stale = False
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._fresh(entry[1]):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return json.loads(entry[0])
+                self._forget(key)
+                stale = True
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    raw, created = bytes(row[0]), row[1]
+                    if self._fresh(created):
+                        self._remember(key, raw, created)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return json.loads(raw)
+                    self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._disk_bytes -= len(raw)
+                    stale = True
+
+            self.expired += stale
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        raw = json.dumps(value, separators=(",", ":")).encode()
+        created = time.time()
+        with self._lock:
+            self._remember(key, raw, created)
+            if self._db is not None:
+                old = self._db.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, size, created) VALUES (?, ?, ?, ?)",
+                    (key, raw, len(raw), created),
+                )
+                self._disk_bytes += len(raw) - (old[0] if old else 0)
+                if self.max_disk_bytes is not None and self._disk_bytes > self.max_disk_bytes:
+                    self._evict_disk()
+                self._db.commit()
+
+    def _evict_disk(self):
+        """Drop expired entries, then the oldest ones, down to 90% of the size budget."""
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM cache WHERE created < ?", (time.time() - self.ttl,))
+        self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        target = self.max_disk_bytes * 0.9
+        if self._disk_bytes <= target:
+            return
+        doomed = []
+        cursor = self._db.execute("SELECT key, size FROM cache ORDER BY created")
+        for key, size in cursor:
+            if self._disk_bytes <= target:
+                break
+            doomed.append((key,))
+            self._disk_bytes -= size
+        cursor.close()
+        self._db.executemany("DELETE FROM cache WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def _remember(self, key: str, raw: bytes, created: float):
+        self._forget(key)
+        self._memory[key] = (raw, created)
+        self._memory_bytes += len(raw)
+        while len(self._memory) > self.max_items:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _forget(self, key: str):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old[0])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            disk_bytes = 0
+            disk_items = 0
+            if self._db is not None:
+                disk_items, disk_bytes = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+                ).fetchone()
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_items": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_items": disk_items,
+                "disk_bytes": disk_bytes,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -1,52 +1,162 @@
 import argparse
-from codemate.providers.github import GitHubProvider
-from codemate.diff.parser import parse_patch
-from codemate.analyzers.lint_analyzer import LintAnalyzer
-from codemate.analyzers.security_analyzer import SecurityAnalyzer
-from codemate.reporter.github_reporter import GitHubReporter
-from codemate.config import settings
+import sys
+
+# Keep module-level imports to the standard library: `--help` and local runs
+# must not pay for settings, HTTP clients, providers or reporters they don't
+# use. Each mode imports what it needs when it runs.
+
 
 def main():
     parser = argparse.ArgumentParser(description="Codemate PR Review Agent CLI")
     parser.add_argument("--repo", type=str, help="GitHub repo in format owner/repo")
     parser.add_argument("--pr", type=int, help="PR number to analyze")
+    parser.add_argument("--since", type=str, help="Only review changes since this commit SHA")
     parser.add_argument("--local", type=str, help="Path to local repo for analysis")
-    args = parser.parse_args()
-
-    if args.pr and args.repo:
-        # Remote GitHub PR
-        provider = GitHubProvider(token=settings.github_token)
-        reporter = GitHubReporter(provider)
-        changed_files = provider.list_changed_files(args.repo, args.pr)
-
-        for f in changed_files:
-            f["parsed_lines"] = parse_patch(f.get("patch", ""))
+    parser.add_argument("--against", type=str, metavar="REF",
+                        help="With --local: only files changed against this git ref (e.g. origin/main)")
+    parser.add_argument("--changed", action="store_true",
+                        help="With --local: only files whose content changed since the last --changed run")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="With --local: worker processes (default: CPU count)")
+    parser.add_argument("--timings", action="store_true", help="Print time spent per pipeline stage and analyzer")
 
-        # Run analyzers
-        issues = LintAnalyzer().analyze(".", changed_files)
-        issues += SecurityAnalyzer().analyze(".", changed_files)
+    commands = parser.add_subparsers(dest="command")
+    batch = commands.add_parser("batch", help="Review many PRs, or all open PRs of repositories")
+    batch.add_argument("targets", nargs="*", help="owner/repo#123, or owner/repo for all its open PRs")
+    batch.add_argument("--file", help="Read targets from this file, one per line")
+    batch.add_argument("--concurrency", type=int, default=None, help="Reviews running at once")
+    batch.add_argument("--rate-limit-reserve", type=int, default=None,
+                       help="Don't start reviews while fewer API calls than this would be left")
+    batch.add_argument("--checkpoint", default=None, help="Progress file; finished PRs are skipped on rerun")
+    batch.add_argument("--restart", action="store_true", help="Ignore (and truncate) the checkpoint")
+    batch.add_argument("--dry-run", action="store_true",
+                       help="Analyze without posting comments or recording reviews")
+    args = parser.parse_args()
 
-        # Post comments and summary
-        reporter.post_inline_comments(args.repo, args.pr, issues)
-        reporter.post_summary(args.repo, args.pr, issues)
-        print(f"✅ PR #{args.pr} analysis complete.")
+    from codemate.metrics import collect_timings
+    with collect_timings() as timings:
+        _run(parser, args)
+    if args.timings and timings.entries:
+        print()
+        print(timings.table())
 
+def _run(parser, args):
+    if args.command == "batch":
+        _batch(parser, args)
+    elif args.pr and args.repo:
+        _review_pr(args)
     elif args.local:
-        # Local repo analysis
-        from pathlib import Path
-        repo_path = Path(args.local)
-        changed_files = [{"filename": str(f), "patch": None} for f in repo_path.rglob("*.py")]
-
-        # Run analyzers
-        issues = LintAnalyzer().analyze(str(repo_path), changed_files)
-        issues += SecurityAnalyzer().analyze(str(repo_path), changed_files)
-
-        # Print summary
-        print(f"Local analysis complete. Total issues: {len(issues)}")
-        for i in issues:
-            print(f"- {i['path']}:{i['line']} [{i['rule']}] {i['message']}")
+        _review_local(args)
     else:
         parser.print_help()
 
+def _review_pr(args):
+    # Remote GitHub PR
+    from codemate.config import get_settings
+    from codemate.pipeline import review_pull_request
+    from codemate.providers.github import make_github_provider
+    from codemate.reporter.github_reporter import GitHubReporter
+    from codemate.store import get_review_store
+
+    settings = get_settings()
+    provider = make_github_provider(settings.github_token, settings.github_transport, settings.github_api_url)
+    reporter = GitHubReporter(provider)
+
+    # Fetch, analyze, post comments and summary
+    review_pull_request(provider, reporter, args.repo, args.pr, since=args.since)
+    get_review_store().flush()  # writes are queued to a daemon thread
+    print(f"✅ PR #{args.pr} analysis complete.")
+
+def _review_local(args):
+    # Local repo analysis: no network, no provider or reporter
+    from pathlib import Path
+    from codemate.local import (INDEX_PATH, FileHashIndex, LocalAnalysisError, analyze_local, changed_against,
+                                python_files)
+    from codemate.metrics import stage
+
+    repo_path = args.local
+    # Analyzers run with cwd=repo_path, so filenames are relative to it
+    try:
+        paths = changed_against(repo_path, args.against) if args.against else python_files(repo_path)
+    except LocalAnalysisError as e:
+        print(f"Cannot list files changed against {args.against}: {e}")
+        return
+    index = entries = None
+    if args.changed:
+        index = FileHashIndex(str(Path(repo_path) / INDEX_PATH))
+        paths, entries = index.changed(repo_path, paths)
+    print(f"Analyzing {len(paths)} files...", flush=True)
+
+    # Issues are printed per shard, as soon as it's done
+    total = 0
+    incomplete = set()
+    failed = []
+    with stage("analyze"):
+        for shard in analyze_local(repo_path, paths, args.jobs):
+            for i in shard["issues"]:
+                print(f"- {i['path']}:{i['line']} [{i['rule']}] {i['message']}")
+            total += len(shard["issues"])
+            sys.stdout.flush()
+            if shard["error"]:
+                failed.append(shard)
+            elif shard["incomplete"]:
+                incomplete.update(shard["incomplete"])
+            elif index is not None:
+                # Files of incomplete or failed shards stay "changed" for the next run
+                index.update({p: entries[p] for p in shard["paths"]})
+
+    # Print summary
+    print(f"Local analysis complete. Total issues: {total}")
+    if incomplete:
+        print(f"Incomplete analyzers: {', '.join(sorted(incomplete))}")
+    if failed:
+        print(f"Not analyzed ({sum(len(s['paths']) for s in failed)} files in {len(failed)} failed shards): "
+              f"{failed[0]['error']}")
+
+def _batch(parser, args):
+    # Many PRs through a shared provider pool, within the rate limit
+    import os
+    from codemate.batch import Checkpoint, ProviderPool, RateLimitBudget, format_report, parse_target, \
+        read_targets, run_batch
+    from codemate.config import get_settings
+    from codemate.pipeline import review_pull_request
+    from codemate.providers.github import make_github_provider
+    from codemate.reporter.github_reporter import GitHubReporter
+    from codemate.store import get_review_store
+
+    try:
+        targets = [parse_target(t) for t in args.targets]
+        if args.file:
+            targets += read_targets(args.file)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if not targets:
+        parser.error("batch needs at least one target (owner/repo#123 or owner/repo) or --file")
+
+    settings = get_settings()
+    concurrency = args.concurrency or settings.batch_concurrency
+    checkpoint_path = args.checkpoint or settings.batch_checkpoint_path or None
+    if args.restart and checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    reserve = settings.batch_rate_limit_reserve if args.rate_limit_reserve is None else args.rate_limit_reserve
+
+    pool = ProviderPool(lambda: make_github_provider(settings.github_token, settings.github_transport,
+                                                     settings.github_api_url), concurrency)
+
+    def progress(entry):
+        detail = f"{entry['issues']} issues" if entry["status"] == "done" else entry["error"]
+        print(f"{entry['repo']}#{entry['pr']}: {entry['status']} in {entry['seconds']:.1f}s ({detail})", flush=True)
+
+    try:
+        report = run_batch(targets, pool, GitHubReporter, review_pull_request, concurrency=concurrency,
+                           budget=RateLimitBudget(reserve), checkpoint=Checkpoint(checkpoint_path),
+                           dry_run=args.dry_run, progress=progress)
+    finally:
+        pool.close()
+    if not args.dry_run:
+        get_review_store().flush()  # writes are queued to a daemon thread
+    print()
+    print(format_report(report))
+
 if __name__ == "__main__":
     main()
@@ -1,4 +1,5 @@
 # src/codemate/config.py
+import threading
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -7,12 +8,98 @@ class Settings(BaseSettings):
     gitlab_token: str | None = None
     bitbucket_token: str | None = None
 
+    # GitHub API transport: "sync" (requests) or "async" (pooled httpx with ETag caching)
+    github_transport: str = "sync"
+    github_api_url: str = "https://api.github.com"  # GitHub Enterprise, or a local fake for benchmarks
+    # Login the reviews are posted as, to recognise our own comments. Defaults to
+    # the token's user; set it for GitHub App tokens, e.g. "codemate[bot]"
+    github_bot_login: str | None = None
+
+    # Huge PRs: when GitHub leaves patches out of the files API (or lists its
+    # 3000-file maximum), stream the raw .diff instead. Generated/vendored files
+    # are skipped by path; patches beyond these sizes are left out
+    diff_stream_fallback: bool = True
+    diff_stream_max_file_bytes: int = 1024 * 1024
+    diff_stream_max_total_bytes: int = 64 * 1024 * 1024
+
     # Webhook
     webhook_secret: str | None = None
+    webhook_max_body_bytes: int = 25 * 1024 * 1024  # GitHub caps payloads at 25 MB
+    webhook_delivery_ttl_seconds: float = 24 * 3600  # redeliveries of a seen delivery ID are ignored
+    webhook_delivery_items: int = 100000
 
     # LLM / AI Feedback
     llm_api_key: str | None = None
     llm_model: str = "gpt-4"  # default model
+    llm_backend: str = "stub"  # "stub" (offline) or "http" (OpenAI-compatible API)
+    llm_base_url: str = "https://api.openai.com/v1"
+    llm_concurrency: int = 4  # batches in flight
+    llm_max_output_tokens: int = 1024
+    llm_max_retries: int = 5
+    llm_timeout_seconds: float = 60.0
+    ai_review: bool = False  # add the AI analyzer to the default analyzers
+
+    # LLM response cache, per normalized hunk (set path to "" to keep it in memory only)
+    llm_cache_items: int = 20000
+    llm_cache_path: str = ".codemate/llm_cache.sqlite3"
+    llm_cache_ttl_hours: float = 168.0
+    llm_cache_max_mb: int = 512
+
+    # Review job queue
+    review_workers: int = 4
+    review_max_backlog: int = 100
+    review_debounce_seconds: float = 2.0  # coalesce bursts of pushes per PR
+
+    # Analyzer execution limits (seconds)
+    analyzer_timeout_seconds: float = 120.0
+    review_budget_seconds: float = 300.0
+
+    # Analyzer result cache (set path to "" to keep it in memory only)
+    analysis_cache_items: int = 50000
+    analysis_cache_path: str = ".codemate/analysis_cache.sqlite3"
+    analysis_cache_ttl_hours: float = 720.0
+    analysis_cache_max_mb: int = 1024
+
+    # Run pyflakes/pycodestyle/bandit as libraries ("inprocess") instead of
+    # shelling out to flake8/bandit ("subprocess")
+    analyzer_mode: str = "subprocess"
+    source_cache_items: int = 512  # parsed files kept in memory
+
+    # Scan added diff lines of every file for credentials
+    secret_scan: bool = True
+
+    # Incremental reviews: only analyze what changed since the last reviewed head
+    incremental_reviews: bool = True
+    review_state_path: str = ".codemate/review_state.sqlite3"
+
+    # Only report issues on added/modified lines, widened by this many lines
+    diff_scope: bool = True
+    diff_scope_context: int = 0
+
+    # Workspace: changed files at the PR head, read from local bare mirrors
+    workspace_enabled: bool = True
+    mirror_dir: str = ".codemate/mirrors"
+    mirror_budget_mb: int = 2048
+    mirror_partial_clone: bool = False  # clone with --filter=blob:none
+
+    # Review reporting: inline comments are posted in batches bounded by count
+    # and payload size; the summary lists the top issues and is edited in place
+    review_comments_per_batch: int = 50
+    review_batch_max_bytes: int = 256 * 1024
+    summary_top_issues: int = 25
+
+    # Review store behind the dashboard API (set path to "" to keep it in memory only)
+    review_store_path: str = ".codemate/reviews.sqlite3"
+    api_page_size: int = 50
+    api_max_page_size: int = 500
+    api_cache_ttl_seconds: float = 5.0  # list pages; any store write invalidates them
+    api_cache_items: int = 512
+    api_gzip_min_bytes: int = 1024
+
+    # Batch backfills (`codemate batch`)
+    batch_concurrency: int = 4
+    batch_rate_limit_reserve: int = 500  # API calls left untouched for everything else
+    batch_checkpoint_path: str = ".codemate/batch_checkpoint.jsonl"
 
     # Other options
     ci_mode: bool = False
@@ -22,5 +109,22 @@ class Settings(BaseSettings):
         env_file = ".env"
         env_file_encoding = "utf-8"
 
-# Singleton instance
-settings = Settings()
+# Singleton instance, created (and .env read) on first use: get_settings(),
+# or `from codemate.config import settings`
+_settings: Settings | None = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = Settings()
+    return _settings
+
+
+def __getattr__(name: str):
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,233 @@
+# src/codemate/diff/model.py
+from array import array
+from typing import Dict, Iterator, List, NamedTuple
+
+# Line kinds stored in Hunk.kinds
+CONTEXT = 0
+ADDED = 1
+REMOVED = 2
+NO_NEWLINE = 3  # "\ No newline at end of file" marker
+
+_MARKERS = {" ": CONTEXT, "+": ADDED, "-": REMOVED, "\\": NO_NEWLINE}
+
+
+class DiffLine(NamedTuple):
+    path: str
+    old_line: int | None
+    new_line: int | None
+    kind: int
+    content: str
+
+    @property
+    def is_added(self) -> bool:
+        return self.kind == ADDED
+
+    @property
+    def is_removed(self) -> bool:
+        return self.kind == REMOVED
+
+
+class Hunk:
+    """
+    One @@ hunk. Per-line data is kept in parallel arrays instead of one
+    object per line; content is sliced out of the original diff text on demand.
+    Line numbers are 0 where a side has no line (e.g. new_lines of a removal).
+    """
+
+    __slots__ = ("file", "old_start", "old_count", "new_start", "new_count", "section",
+                 "kinds", "old_lines", "new_lines", "starts", "ends")
+
+    def __init__(self, file: "FileDiff", old_start: int, old_count: int, new_start: int,
+                 new_count: int, section: str = ""):
+        self.file = file
+        self.old_start = old_start
+        self.old_count = old_count
+        self.new_start = new_start
+        self.new_count = new_count
+        self.section = section
+        self.kinds = array("b")
+        self.old_lines = array("i")
+        self.new_lines = array("i")
+        self.starts = array("q")
+        self.ends = array("q")
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def content(self, i: int) -> str:
+        return self.file.text[self.starts[i]:self.ends[i]]
+
+    def line(self, i: int) -> DiffLine:
+        return DiffLine(self.file.path, self.old_lines[i] or None, self.new_lines[i] or None,
+                        self.kinds[i], self.content(i))
+
+    def __iter__(self) -> Iterator[DiffLine]:
+        for i in range(len(self.kinds)):
+            yield self.line(i)
+
+
+class FileDiff:
+    """All hunks for one file, sharing a reference to the original diff text."""
+
+    __slots__ = ("path", "source_path", "target_path", "text", "hunks")
+
+    def __init__(self, text: str, path: str = "", source_path: str | None = None,
+                 target_path: str | None = None):
+        self.text = text
+        self.path = path
+        self.source_path = source_path
+        self.target_path = target_path
+        self.hunks: List[Hunk] = []
+
+    def __len__(self) -> int:
+        return sum(len(h) for h in self.hunks)
+
+    def iter_lines(self, added_only: bool = False) -> Iterator[DiffLine]:
+        """Lazily yield DiffLine tuples, optionally only added lines."""
+        for hunk in self.hunks:
+            if not added_only:
+                yield from hunk
+                continue
+            kinds = hunk.kinds
+            for i in range(len(kinds)):
+                if kinds[i] == ADDED:
+                    yield hunk.line(i)
+
+    def added_line_numbers(self) -> array:
+        """New-file line numbers of all added lines, ascending."""
+        numbers = array("i")
+        for hunk in self.hunks:
+            kinds, new_lines = hunk.kinds, hunk.new_lines
+            for i in range(len(kinds)):
+                if kinds[i] == ADDED:
+                    numbers.append(new_lines[i])
+        return numbers
+
+
+def _strip_prefix(name: str) -> str:
+    name = name.split("\t", 1)[0].rstrip()
+    if name.startswith(("a/", "b/")):
+        return name[2:]
+    return name
+
+
+def _parse_range(spec: str):
+    start, _, count = spec.partition(",")
+    return int(start), int(count) if count else 1
+
+
+def parse_diff(text: str | None, path: str | None = None) -> List[FileDiff]:
+    """
+    Parse unified diff text into FileDiff objects in a single pass.
+    Accepts full multi-file diffs (git or plain ---/+++ headers) as well as
+    the header-less per-file `patch` strings GitHub returns, in which case
+    `path` names the file.
+    """
+    files: List[FileDiff] = []
+    if not text:
+        return files
+
+    current: FileDiff | None = None
+    hunk: Hunk | None = None
+    old_left = new_left = 0
+    old_no = new_no = 0
+    pos = 0
+    size = len(text)
+
+    while pos < size:
+        eol = text.find("\n", pos)
+        if eol == -1:
+            eol = next_pos = size
+        else:
+            next_pos = eol + 1
+        end = eol - 1 if eol > pos and text[eol - 1] == "\r" else eol
+
+        marker = text[pos] if end > pos else " "
+        in_hunk = hunk is not None and (old_left > 0 or new_left > 0)
+
+        if in_hunk and marker in _MARKERS and marker != "\\":
+            kind = _MARKERS[marker]
+            hunk.kinds.append(kind)
+            if kind == ADDED:
+                hunk.old_lines.append(0)
+                hunk.new_lines.append(new_no)
+                new_no += 1
+                new_left -= 1
+            elif kind == REMOVED:
+                hunk.old_lines.append(old_no)
+                hunk.new_lines.append(0)
+                old_no += 1
+                old_left -= 1
+            else:
+                hunk.old_lines.append(old_no)
+                hunk.new_lines.append(new_no)
+                old_no += 1
+                new_no += 1
+                old_left -= 1
+                new_left -= 1
+            hunk.starts.append(min(pos + 1, end))
+            hunk.ends.append(end)
+        elif marker == "\\" and hunk is not None:
+            hunk.kinds.append(NO_NEWLINE)
+            hunk.old_lines.append(0)
+            hunk.new_lines.append(0)
+            hunk.starts.append(pos + 1)
+            hunk.ends.append(end)
+        elif text.startswith("@@ ", pos):
+            header_end = text.find(" @@", pos + 3, end)
+            if header_end == -1:
+                raise ValueError(f"Malformed hunk header: {text[pos:end]}")
+            old_spec, new_spec = text[pos + 3:header_end].split()
+            old_start, old_count = _parse_range(old_spec.lstrip("-"))
+            new_start, new_count = _parse_range(new_spec.lstrip("+"))
+            if current is None:
+                current = FileDiff(text, path or "")
+                files.append(current)
+            hunk = Hunk(current, old_start, old_count, new_start, new_count,
+                        text[header_end + 3:end].strip())
+            current.hunks.append(hunk)
+            old_left, new_left = old_count, new_count
+            old_no, new_no = old_start, new_start
+        elif text.startswith("diff --git ", pos):
+            current = FileDiff(text)
+            files.append(current)
+            hunk = None
+            parts = text[pos + 11:end].split(" b/", 1)
+            current.path = parts[1] if len(parts) == 2 else _strip_prefix(parts[0])
+        elif text.startswith("--- ", pos):
+            if current is None or current.hunks:
+                current = FileDiff(text)
+                files.append(current)
+                hunk = None
+            current.source_path = text[pos + 4:end]
+        elif text.startswith("+++ ", pos) and current is not None:
+            current.target_path = text[pos + 4:end]
+            target = _strip_prefix(current.target_path)
+            current.path = target if target != "/dev/null" else _strip_prefix(current.source_path or "")
+        # Anything else (index, mode, rename and binary lines) is metadata
+
+        pos = next_pos
+
+    return files
+
+
+def iter_added_lines(files: List[FileDiff]) -> Iterator[DiffLine]:
+    for f in files:
+        yield from f.iter_lines(added_only=True)
+
+
+def to_legacy(files: List[FileDiff]) -> List[Dict]:
+    """Adapter to the list-of-dicts shape historically returned by parse_patch."""
+    mapped = []
+    for f in files:
+        for hunk in f.hunks:
+            for i in range(len(hunk)):
+                kind = hunk.kinds[i]
+                mapped.append({
+                    "path": f.path,
+                    "line": hunk.new_lines[i] or None,
+                    "content": hunk.content(i),
+                    "is_added": kind == ADDED,
+                    "is_removed": kind == REMOVED
+                })
+    return mapped
@@ -1,8 +1,9 @@
 # src/codemate/diff/parser.py
-from unidiff import PatchSet
 from typing import List, Dict
+from codemate.diff.model import FileDiff, parse_diff, to_legacy
 
-def parse_patch(patch_text: str) -> List[Dict]:
+
+def parse_patch(patch_text: str, path: str | None = None) -> List[Dict]:
     """
     Parse a unified patch and return a list of changes.
     Each entry contains:
@@ -11,19 +12,19 @@ def parse_patch(patch_text: str) -> List[Dict]:
         - content: line content
         - is_added: True if line was added
         - is_removed: True if line was removed
+
+    Compatibility wrapper: prefer parse_file_patch()/parse_diff(), which
+    return the compact FileDiff model instead of one dict per line.
+    `path` names the file for header-less patches (GitHub's `patch` field).
     """
-    patch = PatchSet(patch_text.splitlines(True))
-    mapped = []
+    return to_legacy(parse_diff(patch_text, path))
+
 
-    for patched_file in patch:
-        path = patched_file.path
-        for hunk in patched_file:
-            for line in hunk:
-                mapped.append({
-                    "path": path,
-                    "line": getattr(line, "target_line_no", None),
-                    "content": line.value.rstrip("\n"),
-                    "is_added": line.is_added,
-                    "is_removed": line.is_removed
-                })
-    return mapped
+def parse_file_patch(patch_text: str | None, path: str) -> FileDiff:
+    """Parse the patch of a single changed file into a FileDiff."""
+    files = parse_diff(patch_text, path)
+    if not files:
+        return FileDiff(patch_text or "", path)
+    diff = files[0]
+    diff.path = diff.path or path
+    return diff
@@ -0,0 +1,74 @@
+# src/codemate/diff/position.py
+from array import array
+from bisect import bisect_right
+from codemate.diff.model import ADDED, CONTEXT, FileDiff
+
+
+class PositionIndex:
+    """
+    Maps new-file line numbers to GitHub diff positions for one file.
+
+    GitHub's `position` counts lines down from the first @@ header of the
+    file's patch; later @@ headers count as lines too. Commentable lines
+    (context and added) are stored as sorted runs where both the line
+    number and the position advance by one, so a lookup is one bisect.
+    """
+
+    __slots__ = ("path", "starts", "ends", "positions", "added")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.starts = array("i")     # first new-file line of each run
+        self.ends = array("i")       # last new-file line of each run
+        self.positions = array("i")  # diff position of each run's first line
+        self.added = array("i")      # added new-file lines, ascending
+
+    @classmethod
+    def from_file_diff(cls, diff: FileDiff) -> "PositionIndex":
+        index = cls(diff.path)
+        position = 0
+        for h, hunk in enumerate(diff.hunks):
+            if h:
+                position += 1  # the @@ header line
+            kinds, new_lines = hunk.kinds, hunk.new_lines
+            for i in range(len(kinds)):
+                position += 1
+                kind = kinds[i]
+                if kind != CONTEXT and kind != ADDED:
+                    continue
+                line = new_lines[i]
+                if kind == ADDED:
+                    index.added.append(line)
+                if index.ends and index.ends[-1] == line - 1 and \
+                        index.positions[-1] + (line - index.starts[-1]) == position:
+                    index.ends[-1] = line
+                else:
+                    index.starts.append(line)
+                    index.ends.append(line)
+                    index.positions.append(position)
+        return index
+
+    def position(self, line: int | None) -> int | None:
+        """Diff position of a new-file line, or None if it isn't in the diff."""
+        if line is None:
+            return None
+        i = bisect_right(self.starts, line) - 1
+        if i < 0 or line > self.ends[i]:
+            return None
+        return self.positions[i] + (line - self.starts[i])
+
+    def is_added(self, line: int | None) -> bool:
+        if line is None:
+            return False
+        i = bisect_right(self.added, line) - 1
+        return i >= 0 and self.added[i] == line
+
+    def intervals(self):
+        """Commentable new-file line ranges as merged (first, last) pairs."""
+        merged = []
+        for start, end in zip(self.starts, self.ends):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+            else:
+                merged.append((start, end))
+        return merged
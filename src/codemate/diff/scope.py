@@ -0,0 +1,75 @@
+# src/codemate/diff/scope.py
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Tuple
+from codemate.diff.model import FileDiff
+from codemate.diff.parser import parse_file_patch
+
+
+class ChangedLines:
+    """
+    Added/modified new-file lines of one file as sorted, merged intervals,
+    optionally widened by a context radius. Membership is one bisect.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, ranges: List[Tuple[int, int]] = ()):
+        self.starts = array("i")
+        self.ends = array("i")
+        for start, end in ranges:
+            self._add(start, end)
+
+    @classmethod
+    def from_file_diff(cls, diff: FileDiff, context: int = 0) -> "ChangedLines":
+        changed = cls()
+        for line in diff.added_line_numbers():
+            changed._add(max(1, line - context), line + context)
+        return changed
+
+    def _add(self, start: int, end: int):
+        # Input arrives in ascending order, so merging only looks at the tail
+        if self.ends and start <= self.ends[-1] + 1:
+            if end > self.ends[-1]:
+                self.ends[-1] = end
+            return
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __contains__(self, line: int | None) -> bool:
+        if line is None:
+            return False
+        i = bisect_right(self.starts, line) - 1
+        return i >= 0 and line <= self.ends[i]
+
+    def __bool__(self) -> bool:
+        return bool(self.starts)
+
+    def ranges(self) -> List[Tuple[int, int]]:
+        return list(zip(self.starts, self.ends))
+
+
+def changed_line_map(changed_files: List[Dict], context: int = 0) -> Dict[str, ChangedLines | None]:
+    """
+    ChangedLines per file. None means the scope is unknown (no patch,
+    e.g. binary, oversized or local files), so issues there aren't filtered.
+    """
+    scopes: Dict[str, ChangedLines | None] = {}
+    for f in changed_files:
+        diff = f.get("diff")
+        if diff is None:
+            diff = parse_file_patch(f.get("patch"), f["filename"])
+        scopes[f["filename"]] = ChangedLines.from_file_diff(diff, context) if diff.hunks else None
+    return scopes
+
+
+def filter_issues(issues: List[Dict], scopes: Dict[str, ChangedLines | None]) -> List[Dict]:
+    """Keep only issues on added/modified lines of the files in `scopes` (see changed_line_map)."""
+    kept = []
+    for issue in issues:
+        if issue["path"] not in scopes:
+            continue
+        scope = scopes[issue["path"]]
+        if scope is None or issue["line"] in scope:
+            kept.append(issue)
+    return kept
@@ -0,0 +1,131 @@
+# src/codemate/diff/stream.py
+from typing import Callable, Dict, Iterable, Iterator, List
+
+DIFF_MEDIA_TYPE = "application/vnd.github.v3.diff"
+
+
+class DiffSplitter:
+    """
+    Incremental splitter for a raw multi-file git diff, fed in chunks as it
+    streams in. Each completed file comes out as a GitHub-style entry
+    ({"filename", "status", "patch"}) whose patch is header-less, as in the
+    PR files API, so it parses with parse_file_patch().
+
+    Memory is bounded: a file's patch is only buffered once its path passed
+    `skip` (called with the path before the first hunk; returns a reason to
+    skip, or None), a file whose patch grows past `max_file_bytes` is
+    dropped, and once the patches handed out reach `max_total_bytes` the
+    remaining files are listed with an empty patch. Skipped files carry the
+    reason in "skipped".
+    """
+
+    def __init__(self, max_file_bytes: int = 1024 * 1024, max_total_bytes: int = 64 * 1024 * 1024,
+                 skip: Callable[[str], str | None] | None = None):
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        self.skip = skip
+        self.total_bytes = 0  # patch bytes handed out so far
+        self.bytes_read = 0
+        self._pending = b""  # incomplete last line
+        self._discarding_line = False  # inside an over-long line of a dropped file
+        self._file: Dict | None = None
+        self._parts: List[bytes] = []
+        self._size = 0
+        self._in_hunks = False
+
+    def feed(self, chunk: bytes) -> List[Dict]:
+        """Consume the next chunk; returns the files completed by it."""
+        self.bytes_read += len(chunk)
+        done: List[Dict] = []
+        start = 0
+        if self._discarding_line:
+            nl = chunk.find(b"\n")
+            if nl == -1:
+                return done
+            self._discarding_line = False
+            start = nl + 1
+        data = self._pending + chunk[start:] if self._pending else chunk[start:]
+        lines = data.split(b"\n")
+        self._pending = lines.pop()
+        for line in lines:
+            self._line(line, done)
+        if len(self._pending) > self.max_file_bytes:
+            # A single line larger than a whole file may be: its file is dropped anyway
+            self._drop("too large")
+            self._pending = b""
+            self._discarding_line = True
+        return done
+
+    def close(self) -> List[Dict]:
+        """End of stream: returns the last file, if any."""
+        done: List[Dict] = []
+        if self._pending and not self._discarding_line:
+            self._line(self._pending, done)
+        self._pending = b""
+        self._finish(done)
+        return done
+
+    def _line(self, line: bytes, done: List[Dict]):
+        if line.startswith(b"diff --git "):
+            self._finish(done)
+            names = line[11:].decode("utf-8", "replace").rstrip("\r").split(" b/", 1)
+            path = names[1] if len(names) == 2 else names[0][2:] if names[0].startswith("a/") else names[0]
+            self._file = {"filename": path, "status": "modified", "patch": "", "skipped": None}
+            self._parts, self._size, self._in_hunks = [], 0, False
+            return
+        current = self._file
+        if current is None:
+            return
+        if not self._in_hunks:
+            if line.startswith(b"@@ "):
+                self._in_hunks = True
+                if current["skipped"] is None and self.skip is not None:
+                    current["skipped"] = self.skip(current["filename"])
+            else:
+                self._header(line, current)
+                return
+        if current["skipped"] is not None:
+            return
+        self._size += len(line) + 1
+        if self._size > self.max_file_bytes:
+            self._drop("too large")
+        elif self.total_bytes + self._size > self.max_total_bytes:
+            self._drop("memory ceiling")
+        else:
+            self._parts.append(line)
+
+    def _header(self, line: bytes, current: Dict):
+        if line.startswith(b"new file mode"):
+            current["status"] = "added"
+        elif line.startswith(b"deleted file mode"):
+            current["status"] = "removed"
+        elif line.startswith(b"rename to "):
+            current["status"] = "renamed"
+            current["filename"] = line[10:].decode("utf-8", "replace").rstrip("\r")
+        elif line.startswith(b"+++ b/"):
+            current["filename"] = line[6:].decode("utf-8", "replace").rstrip("\r").split("\t", 1)[0]
+        elif line.startswith(b"Binary files "):
+            current["skipped"] = "binary"
+
+    def _drop(self, reason: str):
+        if self._file is not None and self._file["skipped"] is None:
+            self._file["skipped"] = reason
+        self._parts, self._size = [], 0
+
+    def _finish(self, done: List[Dict]):
+        current = self._file
+        if current is None:
+            return
+        if current["skipped"] is None and self._parts:
+            current["patch"] = b"\n".join(self._parts).decode("utf-8", "replace") + "\n"
+            self.total_bytes += self._size
+        done.append(current)
+        self._file, self._parts, self._size = None, [], 0
+
+
+def iter_file_patches(chunks: Iterable[bytes], splitter: DiffSplitter | None = None) -> Iterator[Dict]:
+    """Split a streamed raw diff into per-file entries as they complete."""
+    splitter = splitter or DiffSplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
@@ -0,0 +1,67 @@
+# src/codemate/llm/cache.py
+import hashlib
+import re
+import threading
+from typing import Dict, List
+from codemate.cache import TieredCache
+from codemate.config import settings
+from .prompt import PROMPT_VERSION, ReviewUnit
+
+_LINE_NUMBER = re.compile(r"^\s*\d*\s\|\s")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalized_hunk(unit: ReviewUnit) -> str:
+    """
+    Unit text without line numbers, indentation or whitespace differences,
+    so the same change re-sent after a rebase or cherry-pick (shifted lines,
+    re-indented, another file) normalizes the same.
+    """
+    lines = []
+    for line in unit.text.splitlines():
+        line = _LINE_NUMBER.sub("", line, count=1)
+        marker, code = line[:1], line[1:]
+        lines.append(marker + _WHITESPACE.sub(" ", code).strip())
+    return "\n".join(lines)
+
+
+def unit_key(unit: ReviewUnit, model: str) -> str:
+    h = hashlib.sha256(f"{model}\0{PROMPT_VERSION}\0".encode())
+    h.update(normalized_hunk(unit).encode())
+    return "llm:" + h.hexdigest()
+
+
+def pack_issues(unit: ReviewUnit, issues: List[Dict]) -> List[Dict]:
+    """Cacheable form of a unit's issues: lines become indexes into its added lines."""
+    index = {line: k for k, line in enumerate(unit.added)}
+    return [{"added": index[i["line"]], "severity": i["severity"], "message": i["message"],
+             "suggestion": i.get("suggestion", "")} for i in issues if i["line"] in index]
+
+
+def unpack_issues(unit: ReviewUnit, packed: List[Dict]) -> List[Dict]:
+    return [{
+        "path": unit.path,
+        "line": unit.added[p["added"]],
+        "severity": p["severity"],
+        "rule": "ai-feedback",
+        "message": p["message"],
+        "suggestion": p["suggestion"],
+    } for p in packed if p["added"] < len(unit.added)]
+
+
+_llm_cache: TieredCache | None = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> TieredCache:
+    """Process-wide LLM response cache, configured from settings."""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = TieredCache(
+                max_items=settings.llm_cache_items,
+                path=settings.llm_cache_path or None,
+                ttl=settings.llm_cache_ttl_hours * 3600 if settings.llm_cache_ttl_hours else None,
+                max_disk_bytes=settings.llm_cache_max_mb * 1024 * 1024 if settings.llm_cache_max_mb else None,
+            )
+        return _llm_cache
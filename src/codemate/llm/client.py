@@ -0,0 +1,114 @@
+# src/codemate/llm/client.py
+import asyncio
+import random
+from abc import ABC, abstractmethod
+from typing import Dict
+import httpx
+from codemate.config import settings
+from .prompt import stub_completion
+
+
+class LLMError(Exception):
+    """Raised when a completion can't be obtained (after retries)."""
+
+
+class LLMBackend(ABC):
+    @abstractmethod
+    async def complete(self, system: str, prompt: str, max_tokens: int) -> str:
+        """Return the model's answer to `prompt`."""
+        raise NotImplementedError
+
+    async def aclose(self):
+        pass
+
+
+class StubBackend(LLMBackend):
+    """Offline backend answering with stub_completion(); `latency` simulates a model."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+
+    async def complete(self, system: str, prompt: str, max_tokens: int) -> str:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return stub_completion(prompt)
+
+
+class HTTPBackend(LLMBackend):
+    """
+    OpenAI-compatible chat completions API (also served by
+    codemate.llm.fake_server). 429s and 5xx are retried, honouring
+    Retry-After, else with exponential backoff and jitter.
+    """
+
+    def __init__(self, base_url: str, model: str, api_key: str | None = None, max_retries: int = 5,
+                 timeout: float = 60.0, transport: httpx.AsyncBaseTransport | None = None):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.transport = transport
+        self.requests = 0
+        self.rate_limited = 0
+        self._clients: Dict[int, httpx.AsyncClient] = {}
+
+    def _client(self) -> httpx.AsyncClient:
+        # A client is bound to the loop it was created on
+        loop_id = id(asyncio.get_running_loop())
+        client = self._clients.get(loop_id)
+        if client is None:
+            client = httpx.AsyncClient(base_url=self.base_url, headers=self.headers,
+                                       timeout=self.timeout, transport=self.transport)
+            self._clients[loop_id] = client
+        return client
+
+    async def complete(self, system: str, prompt: str, max_tokens: int) -> str:
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "system", "content": system}, {"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": 0,
+        }
+        for attempt in range(self.max_retries + 1):
+            try:
+                r = await self._client().post("/chat/completions", json=payload)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise LLMError(f"LLM request failed: {e}")
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            self.requests += 1
+            if r.status_code == 429 or r.status_code >= 500:
+                self.rate_limited += r.status_code == 429
+                if attempt == self.max_retries:
+                    break
+                retry_after = r.headers.get("Retry-After")
+                delay = float(retry_after) + random.uniform(0, 0.1) if retry_after else self._backoff(attempt)
+                await asyncio.sleep(delay)
+                continue
+            if r.status_code >= 400:
+                raise LLMError(f"LLM request failed: {r.status_code} {r.text[:200]}")
+            try:
+                return r.json()["choices"][0]["message"]["content"] or ""
+            except (ValueError, KeyError, IndexError, TypeError):
+                raise LLMError("Malformed LLM response")
+        raise LLMError(f"LLM request failed after {self.max_retries + 1} attempts: {r.status_code}")
+
+    def _backoff(self, attempt: int) -> float:
+        return min(30.0, 0.5 * 2 ** attempt) + random.uniform(0, 0.25)
+
+    async def aclose(self):
+        client = self._clients.pop(id(asyncio.get_running_loop()), None)
+        if client is not None:
+            await client.aclose()
+
+
+def make_llm_backend() -> LLMBackend:
+    """Backend from settings: "stub" (offline) or "http"."""
+    if settings.llm_backend == "http":
+        return HTTPBackend(settings.llm_base_url, settings.llm_model, settings.llm_api_key,
+                           max_retries=settings.llm_max_retries, timeout=settings.llm_timeout_seconds)
+    return StubBackend()
@@ -0,0 +1,87 @@
+"""
+Local fake LLM server speaking the OpenAI chat completions API, for
+testing and benchmarking the AI analyzer offline.
+
+Answers come from stub_completion(). Latency, a concurrency cap (excess
+requests get 429 + Retry-After) and the request count are configurable
+and observable:
+
+    python -m codemate.llm.fake_server --port 8089 --latency 0.5 --max-concurrency 4
+    LLM_BACKEND=http LLM_BASE_URL=http://127.0.0.1:8089/v1 codemate ...
+
+GET /stats returns counters (requests, rate_limited, max_in_flight, prompt_tokens).
+"""
+import argparse
+import asyncio
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from .prompt import estimate_tokens, stub_completion
+
+
+def create_app(latency: float = 0.05, tokens_per_second: float = 0.0, max_concurrency: int | None = None,
+               retry_after: float = 0.05) -> FastAPI:
+    """
+    latency: fixed seconds per request
+    tokens_per_second: extra delay proportional to prompt size (0 = none)
+    max_concurrency: requests beyond this many in flight get a 429
+    """
+    app = FastAPI(title="Codemate fake LLM")
+    stats = {"requests": 0, "rate_limited": 0, "in_flight": 0, "max_in_flight": 0, "prompt_tokens": 0}
+    app.state.stats = stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if max_concurrency is not None and stats["in_flight"] >= max_concurrency:
+            stats["rate_limited"] += 1
+            return JSONResponse({"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                                status_code=429, headers={"Retry-After": str(retry_after)})
+
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            prompt = "\n".join(m.get("content", "") for m in body.get("messages", []) if m.get("role") == "user")
+            tokens = estimate_tokens(prompt)
+            stats["prompt_tokens"] += tokens
+            delay = latency + (tokens / tokens_per_second if tokens_per_second else 0.0)
+            if delay:
+                await asyncio.sleep(delay)
+            content = stub_completion(prompt)
+        finally:
+            stats["in_flight"] -= 1
+
+        return {
+            "id": f"fake-{stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": tokens, "completion_tokens": estimate_tokens(content),
+                      "total_tokens": tokens + estimate_tokens(content)},
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    import uvicorn
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    args = parser.parse_args()
+    app = create_app(args.latency, args.tokens_per_second, args.max_concurrency)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
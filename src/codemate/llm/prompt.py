@@ -0,0 +1,133 @@
+# src/codemate/llm/prompt.py
+import json
+import re
+from typing import Dict, List, NamedTuple, Tuple
+
+# Bump when the prompt or response format changes
+PROMPT_VERSION = "1"
+
+SYSTEM_PROMPT = (
+    "You are a careful code reviewer. You get diff hunks; each line is "
+    "'<new line number> | <+ added, space context, - removed><code>'. "
+    "Comment only on added lines, only where there is a real problem "
+    "(bugs, security, error handling, clarity). Answer with JSON only: "
+    '{"comments": [{"path": str, "line": int, "severity": "error"|"warning"|"info", '
+    '"message": str, "suggestion": str}]}. Return {"comments": []} if nothing is worth saying.'
+)
+
+# Context windows (tokens) of common models; unknown models get the smallest
+MODEL_CONTEXT_TOKENS = {
+    "gpt-4": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4.1": 1000000,
+    "gpt-4.1-mini": 1000000,
+    "gpt-3.5-turbo": 16385,
+}
+DEFAULT_CONTEXT_TOKENS = 8192
+
+
+class ReviewUnit(NamedTuple):
+    """One hunk (or slice of an oversized hunk) of one file, rendered for the prompt."""
+    path: str
+    first_line: int
+    last_line: int
+    added: Tuple[int, ...]  # new-file line numbers of the added lines
+    text: str
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+def context_tokens(model: str) -> int:
+    return MODEL_CONTEXT_TOKENS.get(model, DEFAULT_CONTEXT_TOKENS)
+
+
+def estimate_tokens(text: str) -> int:
+    # ~3 characters per token for code: deliberately on the high side, so
+    # batches stay within the context window without a tokenizer
+    return len(text) // 3 + 1
+
+
+def build_prompt(units: List[ReviewUnit]) -> str:
+    parts = []
+    path = None
+    for unit in units:
+        if unit.path != path:
+            path = unit.path
+            parts.append(f"### {path}")
+        parts.append(unit.text)
+    return "\n".join(parts)
+
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.S)
+
+
+def parse_response(text: str, units: List[ReviewUnit]) -> List[Dict]:
+    """
+    Issues from a model answer; comments on lines the batch didn't add are dropped.
+    Raises ValueError if the answer isn't the requested JSON (empty,
+    truncated, prose), so it isn't mistaken for "no comments".
+    """
+    match = _JSON_OBJECT.search(text or "")
+    if not match:
+        raise ValueError("no JSON object in the answer")
+    data = json.loads(match.group(0))
+    if not isinstance(data, dict) or not isinstance(data.get("comments"), list):
+        raise ValueError('answer has no "comments" list')
+    added = {(u.path, line) for u in units for line in u.added}
+    issues = []
+    for c in data["comments"]:
+        if not isinstance(c, dict):
+            continue
+        try:
+            key = (str(c.get("path")), int(c.get("line")))
+        except (TypeError, ValueError):
+            continue
+        if key not in added:
+            continue
+        severity = c.get("severity")
+        issues.append({
+            "path": key[0],
+            "line": key[1],
+            "severity": severity if severity in ("error", "warning", "info") else "info",
+            "rule": "ai-feedback",
+            "message": str(c.get("message") or "").strip(),
+            "suggestion": str(c.get("suggestion") or ""),
+        })
+    return [i for i in issues if i["message"]]
+
+
+_PROMPT_LINE = re.compile(r"^\s*(\d+) \| \+(.*)$")
+_STUB_CHECKS = (
+    (re.compile(r"\b(TODO|FIXME|XXX)\b"), "info", "Unresolved {0} left in the change."),
+    (re.compile(r"^\s*print\("), "info", "Debug print left in the change."),
+    (re.compile(r"^\s*except\s*:"), "warning", "Bare except hides real errors; catch specific exceptions."),
+    (re.compile(r"\beval\("), "warning", "eval() on dynamic input is dangerous."),
+)
+
+
+def stub_completion(prompt: str) -> str:
+    """
+    Deterministic, offline stand-in for a model answer to `prompt`, flagging
+    a few obvious patterns. Used by the stub backend and the fake LLM server.
+    """
+    comments = []
+    path = None
+    for line in prompt.splitlines():
+        if line.startswith("### "):
+            path = line[4:]
+            continue
+        m = _PROMPT_LINE.match(line)
+        if not m or path is None:
+            continue
+        for pattern, severity, message in _STUB_CHECKS:
+            found = pattern.search(m.group(2))
+            if found:
+                comments.append({"path": path, "line": int(m.group(1)), "severity": severity,
+                                 "message": message.format(found.group(0)), "suggestion": ""})
+                break
+    return json.dumps({"comments": comments})
@@ -0,0 +1,161 @@
+# src/codemate/local.py
+"""
+Local analysis (`codemate --local`): pick the Python files worth
+analyzing, shard them across a process pool and hand back each shard's
+issues as soon as it finishes.
+
+Files can be narrowed to those changed against a git ref and/or to those
+whose content changed since the previous run, tracked in a hash index
+under the repository's .codemate/ directory.
+"""
+import heapq
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+from codemate.analyzers.cache import blob_sha
+from codemate.cache import TieredCache
+from codemate.utils.paths import is_vendored_path
+
+INDEX_PATH = os.path.join(".codemate", "local_index.sqlite3")
+SHARDS_PER_WORKER = 4  # more shards than workers, so a slow shard doesn't hold up the rest
+MIN_SHARD_FILES = 50  # each shard pays for starting the tools once
+
+
+class LocalAnalysisError(Exception):
+    """Raised when the files to analyze can't be determined (e.g. an unknown git ref)."""
+
+
+def _git(repo_path: str, args: List[str]) -> str:
+    try:
+        result = subprocess.run(["git", *args], cwd=repo_path, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise LocalAnalysisError("git is not installed")
+    if result.returncode != 0:
+        raise LocalAnalysisError(f"git {' '.join(args[:2])} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def python_files(repo_path: str) -> List[str]:
+    """All Python files under repo_path (relative, "/"-separated), minus vendored directories."""
+    root = Path(repo_path)
+    found = []
+    for f in root.rglob("*.py"):
+        relative = f.relative_to(root).as_posix()
+        if not is_vendored_path(relative) and not relative.startswith(".codemate/"):
+            found.append(relative)
+    return sorted(found)
+
+
+def changed_against(repo_path: str, ref: str) -> List[str]:
+    """
+    Python files that differ from `ref` in the working tree (committed or
+    not), plus untracked ones; paths relative to repo_path. Deleted files
+    and vendored directories are left out.
+    """
+    changed = _git(repo_path, ["diff", "--name-only", "--relative", "--diff-filter=ACMR", "-z", ref, "--"])
+    untracked = _git(repo_path, ["ls-files", "--others", "--exclude-standard", "-z"])
+    paths = {p for p in (changed + untracked).split("\0") if p.endswith(".py") and not is_vendored_path(p)}
+    return sorted(p for p in paths if os.path.isfile(os.path.join(repo_path, p)))
+
+
+class FileHashIndex:
+    """
+    Content hash of each file as of the last completed analysis. Size and
+    mtime are stored too, so unchanged files are recognized without being
+    read again.
+    """
+
+    def __init__(self, path: str | None = None):
+        self._store = TieredCache(max_items=200000, path=path)
+
+    def changed(self, repo_path: str, paths: Iterable[str]) -> Tuple[List[str], Dict[str, List]]:
+        """(paths whose content differs from the index, their new index entries)."""
+        changed, entries = [], {}
+        for path in paths:
+            full = os.path.join(repo_path, path)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            known = self._store.get(path)
+            if known is not None and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+                continue
+            with open(full, "rb") as fh:
+                sha = blob_sha(fh.read())
+            entry = [st.st_size, st.st_mtime_ns, sha]
+            if known is not None and known[2] == sha:
+                self._store.set(path, entry)  # touched, not changed
+                continue
+            changed.append(path)
+            entries[path] = entry
+        return changed, entries
+
+    def update(self, entries: Dict[str, List]):
+        for path, entry in entries.items():
+            self._store.set(path, entry)
+
+
+def shards(repo_path: str, paths: List[str], count: int) -> List[List[str]]:
+    """Split paths into at most `count` shards of roughly equal total size."""
+    count = max(1, min(count, len(paths)))
+    if count == 1:
+        return [list(paths)] if paths else []
+    sized = sorted(((_size(repo_path, p), p) for p in paths), reverse=True)
+    heap = [(0, i) for i in range(count)]
+    buckets: List[List[str]] = [[] for _ in range(count)]
+    for size, path in sized:
+        total, i = heapq.heappop(heap)
+        buckets[i].append(path)
+        heapq.heappush(heap, (total + size, i))
+    return [b for b in buckets if b]
+
+
+def _size(repo_path: str, path: str) -> int:
+    try:
+        return os.path.getsize(os.path.join(repo_path, path))
+    except OSError:
+        return 0
+
+
+def analyze_shard(repo_path: str, paths: List[str], analyzers: List | None = None) -> Dict:
+    """Run the analyzers on one shard; runs in a worker process."""
+    from codemate.pipeline import run_analyzers
+    # No diff here: "local" puts every line of each file in scope
+    run = run_analyzers(repo_path, [{"filename": p, "patch": None, "local": True} for p in paths], analyzers)
+    return {"paths": paths, "issues": run.issues, "incomplete": run.timed_out + list(run.failed), "error": None}
+
+
+def _failed_shard(paths: List[str], e: BaseException) -> Dict:
+    return {"paths": paths, "issues": [], "incomplete": [], "error": f"{type(e).__name__}: {e}"}
+
+
+def analyze_local(repo_path: str, paths: List[str], jobs: int | None = None,
+                  analyzers: List | None = None) -> Iterator[Dict]:
+    """
+    Analyze `paths` in shards on `jobs` worker processes (default: CPU
+    count), yielding {"paths", "issues", "incomplete", "error"} per shard
+    in completion order. Shards hold at least MIN_SHARD_FILES files; with
+    one job they run one after another in this process.
+
+    A shard that raises (or whose worker died, breaking the pool) is
+    yielded with no issues and the exception under "error", so the other
+    shards' results are still reported.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    parts = shards(repo_path, paths, min(jobs * SHARDS_PER_WORKER, len(paths) // MIN_SHARD_FILES))
+    if jobs == 1 or len(parts) <= 1:
+        for part in parts:
+            try:
+                yield analyze_shard(repo_path, part, analyzers)
+            except Exception as e:
+                yield _failed_shard(part, e)
+        return
+    with ProcessPoolExecutor(max_workers=min(jobs, len(parts))) as pool:
+        futures = {pool.submit(analyze_shard, repo_path, part, analyzers): part for part in parts}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield _failed_shard(futures[future], e)
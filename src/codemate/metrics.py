@@ -0,0 +1,252 @@
+# src/codemate/metrics.py
+"""
+Lightweight in-process metrics, rendered in the Prometheus text format.
+
+Instruments are cheap enough for the hot path: an observation is a
+perf_counter() call, a bisect and a few additions under a lock.
+
+    with stage("fetch_files"):
+        files = provider.list_changed_files(repo, pr_id)
+
+Inside collect_timings(), stage() and analyzer timings are also
+recorded for the current review, so the CLI can print them.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+class GaugeFunction(_Metric):
+    """Gauge read at scrape time: fn returns a number, or {label values tuple: number}."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Callable, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def samples(self) -> List[str]:
+        try:
+            value = self.fn()
+        except Exception as e:
+            print(f"Metric {self.name} failed:", e)
+            return []
+        if value is None:
+            return []
+        if not isinstance(value, dict):
+            value = {(): value}
+        return [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}"
+                for k, v in sorted(value.items()) if v is not None]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, ([*s[0]], s[1], s[2])) for k, s in self._series.items())
+        lines = []
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric; a metric already registered under the same name is replaced."""
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def gauge_function(self, name: str, help: str, fn: Callable, labelnames: Tuple[str, ...] = ()) -> GaugeFunction:
+        return self.register(GaugeFunction(name, help, fn, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "codemate_stage_seconds", "Time spent in each review pipeline stage", ("stage",))
+ANALYZER_SECONDS = REGISTRY.histogram(
+    "codemate_analyzer_seconds", "Time spent in each analyzer", ("analyzer",))
+ANALYZER_RUNS = REGISTRY.counter(
+    "codemate_analyzer_runs_total", "Analyzer runs by outcome", ("analyzer", "outcome"))
+JOB_WAIT_SECONDS = REGISTRY.histogram(
+    "codemate_job_queue_wait_seconds", "Time review jobs waited in the queue")
+JOBS = REGISTRY.counter("codemate_jobs_total", "Finished review jobs by status", ("status",))
+WEBHOOKS = REGISTRY.counter(
+    "codemate_webhooks_total", "Webhook deliveries by platform and outcome", ("platform", "outcome"))
+SUBPROCESSES = REGISTRY.counter("codemate_subprocesses_total", "Tool subprocesses started", ("tool",))
+SUBPROCESSES_RUNNING = REGISTRY.gauge("codemate_subprocesses_running", "Tool subprocesses currently running")
+
+
+# -------------------------
+# Per-review timings (CLI --timings)
+
+class Timings:
+    """Durations recorded while collecting, as (kind, name, seconds)."""
+
+    def __init__(self):
+        self.entries: List[Tuple[str, str, float]] = []
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, name: str, seconds: float):
+        with self._lock:
+            self.entries.append((kind, name, seconds))
+
+    def table(self) -> str:
+        """Plain-text table: calls, total and max seconds per stage/analyzer, in first-seen order."""
+        rows: Dict[Tuple[str, str], List[float]] = {}
+        for kind, name, seconds in self.entries:
+            rows.setdefault((kind, name), []).append(seconds)
+        header = f"{'kind':<10} {'name':<28} {'calls':>5} {'total s':>9} {'max s':>9}"
+        lines = [header, "-" * len(header)]
+        for (kind, name), values in rows.items():
+            lines.append(f"{kind:<10} {name:<28} {len(values):>5} {sum(values):>9.3f} {max(values):>9.3f}")
+        return "\n".join(lines)
+
+
+_timings: ContextVar[Timings | None] = ContextVar("codemate_timings", default=None)
+
+
+@contextmanager
+def collect_timings() -> Iterator[Timings]:
+    timings = Timings()
+    reset = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(reset)
+
+
+def observe_analyzer(name: str, seconds: float, outcome: str = "completed"):
+    ANALYZER_SECONDS.observe(seconds, name)
+    ANALYZER_RUNS.inc(1, name, outcome)
+    timings = _timings.get()
+    if timings is not None:
+        timings.add("analyzer", name, seconds)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a pipeline stage into codemate_stage_seconds (and the current Timings, if any)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - t0
+        STAGE_SECONDS.observe(seconds, name)
+        timings = _timings.get()
+        if timings is not None:
+            timings.add("stage", name, seconds)
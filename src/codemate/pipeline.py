@@ -0,0 +1,184 @@
+# src/codemate/pipeline.py
+from contextlib import ExitStack
+from typing import List, Dict, Any
+from codemate.diff.parser import parse_file_patch
+from codemate.diff.scope import changed_line_map, filter_issues
+from codemate.analyzers.lint_analyzer import LintAnalyzer
+from codemate.analyzers.security_analyzer import SecurityAnalyzer
+from codemate.analyzers.secret_analyzer import SecretAnalyzer
+from codemate.analyzers.runner import AnalyzerRunner, AnalyzerRun
+from codemate.analyzers.cache import CachedAnalyzer, get_analysis_cache
+from codemate.config import settings
+from codemate.state import get_reviewed_heads
+from codemate.store import get_review_store
+from codemate.scoring.scorer import score_from_issues
+from codemate.workspace import WorkspaceError, get_mirror_cache, materialized_workspace
+from codemate.utils.cancel import check_cancelled
+from codemate.metrics import stage
+
+COMPARE_FILES_LIMIT = 300
+
+
+def review_pull_request(provider, reporter, repo: str, pr_id: int, head_sha: str | None = None,
+                        since: str | None = None, analyzers: List | None = None,
+                        dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Run the full review pipeline for one pull request:
+    fetch changed files, parse patches, run analyzers and post results.
+    Returns a small result dict suitable for job status reporting.
+    When run inside a cancellable job, stops before posting if a newer
+    revision of the PR superseded this one.
+
+    With incremental reviews enabled, only the files changed since the last
+    reviewed head (or `since`, if given) are analyzed and a delta review is
+    posted. Falls back to a full review when there is no usable base, e.g.
+    after a force-push. The reviewed head only advances when every
+    analyzer completed.
+
+    With dry_run, the review is computed and returned but nothing is
+    posted, and neither the review store nor the reviewed heads are updated.
+    """
+    heads = get_reviewed_heads() if settings.incremental_reviews else None
+    if since is None and heads is not None:
+        since = heads.get(repo, pr_id)
+    if (since or heads is not None or settings.workspace_enabled) and head_sha is None:
+        with stage("head_sha"):
+            head_sha = provider.get_head_sha(repo, pr_id)
+
+    if since and since == head_sha:
+        return {"repo": repo, "pr": pr_id, "head": head_sha, "issues_count": 0, "skipped": "already reviewed"}
+
+    changed_files = None
+    with stage("fetch_files"):
+        if since:
+            changed_files = _files_since(provider, repo, since, head_sha)
+        incremental = changed_files is not None
+        if not incremental:
+            changed_files = provider.list_changed_files(repo, pr_id)
+    check_cancelled()
+    with stage("parse_patch"):
+        for f in changed_files:
+            f["diff"] = parse_file_patch(f.get("patch"), f["filename"])
+
+    scopes = None
+    if settings.diff_scope:
+        # Let analyzers skip files with nothing added, then drop issues on untouched lines
+        scopes = changed_line_map(changed_files, settings.diff_scope_context)
+        for f in changed_files:
+            f["changed_lines"] = scopes[f["filename"]]
+
+    with stage("analyze"):
+        run = _analyze_at_head(provider, repo, pr_id, head_sha, changed_files, analyzers)
+    issues = run.issues
+    if scopes is not None:
+        issues = filter_issues(issues, scopes)
+
+    # Only the latest head gets reported
+    check_cancelled()
+    score = score_from_issues(issues)
+    if not dry_run:
+        with stage("post_comments"):
+            reporter.post_inline_comments(repo, pr_id, issues, changed_files, head_sha=head_sha)
+        heading = f"Changes since {since[:7]}" if incremental else None
+        with stage("post_summary"):
+            reporter.post_summary(repo, pr_id, issues, heading=heading)
+
+        # A partial run left files unanalyzed; the next push must review them again
+        if heads is not None and head_sha and not run.partial:
+            heads.set(repo, pr_id, head_sha)
+        with stage("store"):
+            get_review_store().record_review(repo, pr_id, head_sha, issues, score, len(changed_files),
+                                             since=since if incremental else None)
+
+    return {
+        "repo": repo,
+        "pr": pr_id,
+        "head": head_sha,
+        "since": since if incremental else None,
+        "files_count": len(changed_files),
+        "files_skipped": sum(1 for f in changed_files if f.get("skipped")),
+        "issues_count": len(issues),
+        "score": score,
+        "issues_out_of_scope": len(run.issues) - len(issues),
+        "analyzers": run.to_dict(),
+    }
+
+
+def _analyze_at_head(provider, repo: str, pr_id: int, head_sha: str | None,
+                     changed_files: List[Dict], analyzers: List | None) -> AnalyzerRun:
+    """
+    Run analyzers on the changed files as they are at the PR head,
+    materialized from a local mirror. If the workspace can't be prepared,
+    only the diff-based analyzers run; those reading file contents are
+    reported failed, so the run is partial rather than a review of
+    whatever happens to be in the current directory.
+    """
+    if not settings.workspace_enabled or not head_sha:
+        return run_analyzers(".", changed_files, analyzers)
+    paths = [f["filename"] for f in changed_files if f.get("status") != "removed"]
+    try:
+        with ExitStack() as stack:
+            with stage("workspace"):
+                repo_path = stack.enter_context(
+                    materialized_workspace(get_mirror_cache(), provider.clone_url(repo), head_sha, paths))
+            return run_analyzers(repo_path, changed_files, analyzers)
+    except WorkspaceError as e:
+        analyzers = analyzers if analyzers is not None else default_analyzers()
+        run = run_analyzers(".", changed_files, [a for a in analyzers if not a.reads_files])
+        for a in analyzers:
+            if a.reads_files:
+                run.failed[a.name] = f"workspace for {head_sha[:7]} unavailable: {e}"
+        return run
+
+
+def _files_since(provider, repo: str, base: str, head: str) -> List[Dict] | None:
+    """Files changed from base to head, or None if a full review is needed."""
+    try:
+        status, files = provider.compare_files(repo, base, head)
+    except Exception as e:
+        print(f"Compare {base[:7]}...{head[:7]} failed, doing a full review:", e)
+        return None
+    # "diverged"/"behind" means history was rewritten; the compare API also
+    # truncates file lists at 300 entries
+    if status != "ahead" or len(files) >= COMPARE_FILES_LIMIT:
+        return None
+    for f in files:
+        # Patch is relative to the previous head, not the PR base
+        f["diff_base"] = "compare"
+    return files
+
+
+def default_analyzers() -> List:
+    # Lint and security tools report per file, so results can be cached by file content
+    cache = get_analysis_cache()
+    inprocess = None
+    if settings.analyzer_mode == "inprocess":
+        try:
+            from codemate.analyzers import inprocess
+        except ImportError:
+            pass  # flake8 missing or incompatible: the subprocess analyzers report it
+    if inprocess is not None:
+        # Library calls sharing one read/tokenize/parse per file
+        analyzers = [CachedAnalyzer(inprocess.InProcessLintAnalyzer(), cache),
+                     CachedAnalyzer(inprocess.InProcessSecurityAnalyzer(), cache)]
+    else:
+        analyzers = [CachedAnalyzer(LintAnalyzer(), cache), CachedAnalyzer(SecurityAnalyzer(), cache)]
+    # These look at the diff, not file content, so they aren't cached
+    if settings.secret_scan:
+        analyzers.append(SecretAnalyzer())
+    if settings.ai_review:
+        # Imported on demand: pulls in the HTTP client
+        from codemate.analyzers.ai_analyzer import AIAnalyzer
+        from codemate.llm.cache import get_llm_cache
+        analyzers.append(AIAnalyzer(cache=get_llm_cache()))
+    return analyzers
+
+
+def run_analyzers(repo_path: str, changed_files: List[Dict], analyzers: List | None = None) -> AnalyzerRun:
+    """Run analyzers concurrently within the configured time limits."""
+    runner = AnalyzerRunner(
+        analyzers if analyzers is not None else default_analyzers(),
+        timeout=settings.analyzer_timeout_seconds,
+        budget=settings.review_budget_seconds,
+    )
+    return runner.run(repo_path, changed_files)
@@ -17,11 +17,51 @@ class ProviderBase(ABC):
         pass
 
     @abstractmethod
-    def post_review_comments(self, repo: str, pr_id: int, comments: List[Dict]):
-        """Post inline review comments."""
+    def post_review_comments(self, repo: str, pr_id: int, comments: List[Dict], commit_sha: str | None = None):
+        """Post inline review comments on `commit_sha` (default: the PR head)."""
         pass
 
     @abstractmethod
     def post_summary(self, repo: str, pr_id: int, body: str):
         """Post overall PR summary."""
         pass
+
+    @abstractmethod
+    def get_head_sha(self, repo: str, pr_id: int) -> str:
+        """Return the current head commit SHA of the PR."""
+        pass
+
+    @abstractmethod
+    def compare_files(self, repo: str, base: str, head: str):
+        """Return (status, changed files) between two commits."""
+        pass
+
+    @abstractmethod
+    def list_open_pull_requests(self, repo: str) -> List[Dict]:
+        """Return the open pull requests of a repository (number, head, ...)."""
+        pass
+
+    @abstractmethod
+    def list_review_comments(self, repo: str, pr_id: int) -> List[Dict]:
+        """Return the inline review comments already on the PR."""
+        pass
+
+    @abstractmethod
+    def list_issue_comments(self, repo: str, pr_id: int) -> List[Dict]:
+        """Return the top-level (conversation) comments of the PR."""
+        pass
+
+    @abstractmethod
+    def update_comment(self, repo: str, comment_id: int, body: str):
+        """Replace the body of a top-level PR comment."""
+        pass
+
+    @abstractmethod
+    def authenticated_login(self) -> str | None:
+        """Return the login comments are posted as, or None if the token can't tell."""
+        pass
+
+    @abstractmethod
+    def clone_url(self, repo: str) -> str:
+        """Return a git URL (with credentials if needed) for the repository."""
+        pass
@@ -1,49 +1,212 @@
+import json
+import logging
+from collections import Counter
 from codemate.providers.github import GitHubProvider
+from codemate.config import settings
+from codemate.diff.parser import parse_file_patch
+from codemate.diff.position import PositionIndex
 from typing import List, Dict
 
+SUMMARY_MARKER = "<!-- codemate:summary -->"
+DELTA_SUMMARY_MARKER = "<!-- codemate:delta-summary -->"  # summary of the commits since the last review
+MAX_COMMENT_CHARS = 65536  # GitHub rejects longer comment bodies
+MAX_MESSAGE_CHARS = 300  # per issue line in the summary
+SUMMARY_TOP_GROUPS = 15  # files/rules listed in the summary tables
+
+_SEVERITY_RANK = {"error": 0, "high": 0, "warning": 1, "medium": 1, "info": 2, "low": 2}
+
+logger = logging.getLogger(__name__)
+
+
 class GitHubReporter:
     def __init__(self, provider: GitHubProvider):
         self.provider = provider
 
-    def post_inline_comments(self, repo: str, pr_id: int, issues: List[Dict]):
+    def post_inline_comments(self, repo: str, pr_id: int, issues: List[Dict],
+                             changed_files: List[Dict] | None = None, head_sha: str | None = None):
         """
         Convert analyzer issues to GitHub review comments.
         GitHub requires:
             - path: file path
             - position: line number in diff (not actual file line)
             - body: comment text
+        File lines are mapped to diff positions with a PositionIndex built
+        from each changed file's patch. Issues on lines outside the diff
+        can't be commented on and are dropped (they still appear in the
+        summary); without changed_files nothing can be placed.
+
+        Files from a delta review (diff_base == "compare") carry the patch
+        between two pushes, whose positions don't match the PR diff. Those
+        are commented by `line`/`side` instead, on added lines only.
+
+        Comments identical to one we already posted on the PR (same path,
+        line and body) are skipped; the rest are posted as several reviews, each
+        bounded by review_comments_per_batch and review_batch_max_bytes,
+        on `head_sha` (the commit that was analyzed) when given.
+        Returns the provider's responses, one per review posted.
         """
+        indexes = {}
+        delta_paths = set()
+        for f in changed_files or []:
+            diff = f.get("diff")
+            if diff is None:
+                diff = parse_file_patch(f.get("patch"), f["filename"])
+            indexes[f["filename"]] = PositionIndex.from_file_diff(diff)
+            if f.get("diff_base") == "compare":
+                delta_paths.add(f["filename"])
+
         comments = []
+        lines = []
         for issue in issues:
-            # Only report added/changed lines
-            if issue["line"] is None:
+            index = indexes.get(issue["path"])
+            if index is None:
+                continue
+            body = _truncate(f"[{issue['rule']}] {issue['message']}", MAX_COMMENT_CHARS)
+            if issue["path"] in delta_paths:
+                if index.is_added(issue["line"]):
+                    comments.append({"path": issue["path"], "line": issue["line"], "side": "RIGHT", "body": body})
+                    lines.append(issue["line"])
+                continue
+            position = index.position(issue["line"])
+            if position is None:
                 continue
             comments.append({
                 "path": issue["path"],
-                "position": issue["line"],
-                "body": f"[{issue['rule']}] {issue['message']}"
+                "position": position,
+                "body": body
             })
+            lines.append(issue["line"])
 
-        if comments:
-            return self.provider.post_review_comments(repo, pr_id, comments)
-        return []
+        if not comments:
+            return []
+        seen = self._posted_comment_keys(repo, pr_id)
+        fresh = []
+        for comment, line in zip(comments, lines):
+            key = (comment["path"], line, comment["body"])
+            if key not in seen:
+                seen.add(key)
+                fresh.append(comment)
 
-    def post_summary(self, repo: str, pr_id: int, issues: List[Dict]):
+        return [self.provider.post_review_comments(repo, pr_id, batch, commit_sha=head_sha)
+                for batch in review_batches(fresh, settings.review_comments_per_batch,
+                                            settings.review_batch_max_bytes)]
+
+    def _posted_comment_keys(self, repo: str, pr_id: int) -> set:
+        """(path, line, body) of the review comments we already posted on the PR, fetched once per report."""
+        try:
+            existing = self.provider.list_review_comments(repo, pr_id)
+            login = self._own_login() if existing else None
+        except Exception:
+            logger.warning("Listing review comments of %s#%s failed, not deduplicating", repo, pr_id, exc_info=True)
+            return set()
+        return {(c.get("path"), c.get("line"), c.get("body")) for c in existing
+                if c.get("side", "RIGHT") == "RIGHT" and _is_own(c, login)}
+
+    def post_summary(self, repo: str, pr_id: int, issues: List[Dict], heading: str | None = None):
         """
         Post a summary comment including total issues and high-level feedback.
+        `heading` is prepended, e.g. to mark a delta review of new commits.
+
+        The summary from a previous run (found by its marker among our own
+        comments) is edited in place rather than a new comment being added for every push. A
+        summary with a heading covers only part of the PR; it has its own
+        marker, so it doesn't overwrite the full-PR summary.
         """
-        if not issues:
-            body = "✅ No issues detected. PR looks good!"
-        else:
-            summary_lines = [
-                f"Total issues detected: {len(issues)}",
-                "",
-                "### Issues breakdown:",
-            ]
-            for issue in issues:
-                summary_lines.append(
-                    f"- `{issue['path']}:{issue['line']}` [{issue['rule']}] {issue['message']}"
-                )
-            body = "\n".join(summary_lines)
-
-        return self.provider.post_summary(repo, pr_id, body)
+        marker = DELTA_SUMMARY_MARKER if heading else SUMMARY_MARKER
+        body = format_summary(issues, heading, settings.summary_top_issues, marker)
+        previous = self._previous_summary(repo, pr_id, marker)
+        if previous is None:
+            return self.provider.post_summary(repo, pr_id, body)
+        if previous.get("body") == body:
+            return previous
+        return self.provider.update_comment(repo, previous["id"], body)
+
+    def _previous_summary(self, repo: str, pr_id: int, marker: str = SUMMARY_MARKER) -> Dict | None:
+        try:
+            comments = self.provider.list_issue_comments(repo, pr_id)
+            login = self._own_login() if comments else None
+        except Exception:
+            logger.warning("Listing comments of %s#%s failed, posting a new summary", repo, pr_id, exc_info=True)
+            return None
+        for comment in reversed(comments):
+            if (comment.get("body") or "").startswith(marker) and _is_own(comment, login):
+                return comment
+        return None
+
+    def _own_login(self) -> str | None:
+        return settings.github_bot_login or self.provider.authenticated_login()
+
+
+def _is_own(comment: Dict, login: str | None) -> bool:
+    """
+    Whether we posted `comment`: by our login when known, else (a GitHub App
+    token, which can't read its own user) by it coming from an app.
+    """
+    user = comment.get("user") or {}
+    if login:
+        return user.get("login") == login
+    return bool(comment.get("performed_via_github_app")) or user.get("type") == "Bot"
+
+
+def review_batches(comments: List[Dict], max_comments: int, max_bytes: int) -> List[List[Dict]]:
+    """Split comments, in order, into batches of at most max_comments and about max_bytes of JSON."""
+    batches: List[List[Dict]] = []
+    current: List[Dict] = []
+    size = 0
+    for comment in comments:
+        cost = len(json.dumps(comment)) + 2
+        if current and (len(current) >= max_comments or size + cost > max_bytes):
+            batches.append(current)
+            current, size = [], 0
+        current.append(comment)
+        size += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def format_summary(issues: List[Dict], heading: str | None = None, top: int = 25,
+                   marker: str = SUMMARY_MARKER) -> str:
+    """
+    Markdown summary: issue counts per file and per rule, then the `top`
+    most severe issues. Always fits in one GitHub comment.
+    """
+    if not issues:
+        body = "✅ No issues detected. PR looks good!"
+    else:
+        by_file = Counter(i["path"] for i in issues)
+        by_rule = Counter(i["rule"] for i in issues)
+        by_severity = Counter(i.get("severity", "info") for i in issues)
+        severities = ", ".join(f"{n} {s}" for s, n in sorted(by_severity.items(),
+                                                             key=lambda item: _SEVERITY_RANK.get(item[0], 3)))
+        summary_lines = [
+            f"Total issues detected: {len(issues)} in {len(by_file)} files ({severities})",
+            "",
+            "### Issues by file:",
+            "| File | Issues |",
+            "| --- | ---: |",
+        ]
+        summary_lines += [f"| `{path}` | {n} |" for path, n in by_file.most_common(SUMMARY_TOP_GROUPS)]
+        if len(by_file) > SUMMARY_TOP_GROUPS:
+            summary_lines.append(f"| … {len(by_file) - SUMMARY_TOP_GROUPS} more files | |")
+        summary_lines += ["", "### Issues by rule:", "| Rule | Issues |", "| --- | ---: |"]
+        summary_lines += [f"| {rule} | {n} |" for rule, n in by_rule.most_common(SUMMARY_TOP_GROUPS)]
+        if len(by_rule) > SUMMARY_TOP_GROUPS:
+            summary_lines.append(f"| … {len(by_rule) - SUMMARY_TOP_GROUPS} more rules | |")
+
+        ranked = sorted(issues, key=lambda i: _SEVERITY_RANK.get(i.get("severity"), 3))
+        summary_lines += ["", "### Top issues:" if len(issues) > top else "### Issues breakdown:"]
+        for issue in ranked[:top]:
+            message = _truncate(" ".join(str(issue["message"]).split()), MAX_MESSAGE_CHARS)
+            summary_lines.append(f"- `{issue['path']}:{issue['line']}` [{issue['rule']}] {message}")
+        if len(issues) > top:
+            summary_lines.append(f"- … and {len(issues) - top} more")
+        body = "\n".join(summary_lines)
+
+    if heading:
+        body = f"## {heading}\n\n{body}"
+    return _truncate(f"{marker}\n{body}", MAX_COMMENT_CHARS)
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
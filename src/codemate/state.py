@@ -0,0 +1,30 @@
+# src/codemate/state.py
+import threading
+from codemate.cache import TieredCache
+from codemate.config import settings
+
+
+class ReviewedHeads:
+    """Last reviewed head SHA per pull request, persisted across restarts."""
+
+    def __init__(self, path: str | None = None):
+        self._store = TieredCache(max_items=10000, path=path)
+
+    def get(self, repo: str, pr_id: int) -> str | None:
+        return self._store.get(f"head:{repo}#{pr_id}")
+
+    def set(self, repo: str, pr_id: int, sha: str):
+        self._store.set(f"head:{repo}#{pr_id}", sha)
+
+
+_reviewed_heads: ReviewedHeads | None = None
+_reviewed_heads_lock = threading.Lock()
+
+
+def get_reviewed_heads() -> ReviewedHeads:
+    """Process-wide reviewed-head store, configured from settings."""
+    global _reviewed_heads
+    with _reviewed_heads_lock:
+        if _reviewed_heads is None:
+            _reviewed_heads = ReviewedHeads(settings.review_state_path or None)
+        return _reviewed_heads
@@ -0,0 +1,302 @@
+# src/codemate/store.py
+import base64
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+from codemate.config import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pull_requests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    repo TEXT NOT NULL,
+    pr INTEGER NOT NULL,
+    title TEXT,
+    author TEXT,
+    branch TEXT,
+    url TEXT,
+    status TEXT NOT NULL,
+    head_sha TEXT,
+    score INTEGER,
+    latest_review_id INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (repo, pr)
+);
+CREATE INDEX IF NOT EXISTS pull_requests_updated ON pull_requests (updated_at, id);
+CREATE INDEX IF NOT EXISTS pull_requests_repo ON pull_requests (repo, updated_at, id);
+CREATE INDEX IF NOT EXISTS pull_requests_status ON pull_requests (status, updated_at, id);
+
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pull_request_id INTEGER NOT NULL,
+    repo TEXT NOT NULL,
+    pr INTEGER NOT NULL,
+    head_sha TEXT,
+    since TEXT,
+    status TEXT NOT NULL,
+    score INTEGER,
+    files_count INTEGER,
+    issues_count INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_head ON reviews (repo, pr, head_sha);
+CREATE INDEX IF NOT EXISTS reviews_created ON reviews (created_at, id);
+CREATE INDEX IF NOT EXISTS reviews_pull_request ON reviews (pull_request_id, id);
+
+CREATE TABLE IF NOT EXISTS issues (
+    review_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    line INTEGER,
+    severity TEXT,
+    rule TEXT,
+    message TEXT,
+    suggestion TEXT
+);
+CREATE INDEX IF NOT EXISTS issues_review ON issues (review_id);
+"""
+
+PR_COLUMNS = ("id", "repo", "pr", "title", "author", "branch", "url", "status", "head_sha", "score",
+              "latest_review_id", "created_at", "updated_at")
+REVIEW_COLUMNS = ("id", "pull_request_id", "repo", "pr", "head_sha", "since", "status", "score",
+                  "files_count", "issues_count", "created_at")
+ISSUE_COLUMNS = ("path", "line", "severity", "rule", "message", "suggestion")
+
+
+class ReviewStore:
+    """
+    Reviews, their issues and scores, in SQLite (in memory without a path).
+
+    Writes are queued and applied by a background thread, several per
+    transaction, so recording a review doesn't block the review path.
+    flush() waits until everything queued so far is written. Reads see
+    committed writes only.
+
+    Lists are newest first and paginated by cursor: pass the returned
+    `next_cursor` back to get the following page.
+    """
+
+    def __init__(self, path: str | None = None, batch_size: int = 256):
+        self.path = path
+        self.batch_size = batch_size
+        if path:
+            parent = os.path.dirname(path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        else:
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+        self._lock = threading.Lock()
+        self._writes: "queue.Queue[Tuple | None]" = queue.Queue()
+        self.version = 0  # bumped after every committed write batch
+        self.writes = 0
+        self.batches = 0
+        self._writer = threading.Thread(target=self._write_loop, name="codemate-store", daemon=True)
+        self._writer.start()
+
+    # -------------------------
+    # Writes (queued)
+
+    def upsert_pull_request(self, repo: str, pr: int, title: str | None = None, author: str | None = None,
+                            branch: str | None = None, url: str | None = None, status: str = "pending",
+                            head_sha: str | None = None):
+        """Create or update a pull request's metadata; None leaves a field unchanged."""
+        self._writes.put(("pull_request", (repo, pr, title, author, branch, url, status, head_sha, time.time())))
+
+    def record_review(self, repo: str, pr: int, head_sha: str | None, issues: List[Dict], score: int | None,
+                      files_count: int = 0, since: str | None = None, status: str = "reviewed"):
+        """Store a finished review with its issues and mark the pull request reviewed."""
+        rows = [tuple(i.get(c) for c in ISSUE_COLUMNS) for i in issues]
+        self._writes.put(("review", (repo, pr, head_sha, since, status, score, files_count, rows, time.time())))
+
+    def flush(self, timeout: float | None = None):
+        """Wait until all writes queued so far are committed."""
+        done = threading.Event()
+        self._writes.put(("flush", done))
+        done.wait(timeout)
+
+    def _write_loop(self):
+        while True:
+            op = self._writes.get()
+            if op is None:
+                return
+            ops = [op]
+            while len(ops) < self.batch_size:
+                try:
+                    op = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if op is None:
+                    self._apply(ops)
+                    return
+                ops.append(op)
+            self._apply(ops)
+
+    def _apply(self, ops: List[Tuple]):
+        flushes = [arg for kind, arg in ops if kind == "flush"]
+        writes = [(kind, arg) for kind, arg in ops if kind != "flush"]
+        if writes:
+            with self._lock:
+                try:
+                    for kind, arg in writes:
+                        if kind == "pull_request":
+                            self._write_pull_request(*arg)
+                        else:
+                            self._write_review(*arg)
+                    self._db.commit()
+                    self.version += 1
+                    self.writes += len(writes)
+                    self.batches += 1
+                except sqlite3.Error as e:
+                    self._db.rollback()
+                    print("Review store write failed:", e)
+        for done in flushes:
+            done.set()
+
+    def _write_pull_request(self, repo, pr, title, author, branch, url, status, head_sha, now) -> int:
+        self._db.execute(
+            "INSERT INTO pull_requests (repo, pr, title, author, branch, url, status, head_sha, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (repo, pr) DO UPDATE SET"
+            " title = COALESCE(excluded.title, title), author = COALESCE(excluded.author, author),"
+            " branch = COALESCE(excluded.branch, branch), url = COALESCE(excluded.url, url),"
+            " status = excluded.status, head_sha = COALESCE(excluded.head_sha, head_sha),"
+            " updated_at = excluded.updated_at",
+            (repo, pr, title, author, branch, url, status, head_sha, now, now),
+        )
+        return self._db.execute("SELECT id FROM pull_requests WHERE repo = ? AND pr = ?", (repo, pr)).fetchone()[0]
+
+    def _write_review(self, repo, pr, head_sha, since, status, score, files_count, rows, now):
+        pr_row = self._write_pull_request(repo, pr, None, None, None, None, status, head_sha, now)
+        cursor = self._db.execute(
+            "INSERT INTO reviews (pull_request_id, repo, pr, head_sha, since, status, score, files_count,"
+            " issues_count, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (pr_row, repo, pr, head_sha, since, status, score, files_count, len(rows), now),
+        )
+        review_id = cursor.lastrowid
+        self._db.executemany(
+            "INSERT INTO issues (review_id, path, line, severity, rule, message, suggestion)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(review_id,) + row for row in rows],
+        )
+        # A delta review (since set) covers only the latest push; the PR's score and
+        # latest review stay those of the last full review, if there is one
+        self._db.execute("UPDATE pull_requests SET score = ?, latest_review_id = ?"
+                         " WHERE id = ? AND (? IS NULL OR latest_review_id IS NULL)",
+                         (score, review_id, pr_row, since))
+
+    # -------------------------
+    # Reads
+
+    def list_pull_requests(self, repo: str | None = None, status: str | None = None, limit: int = 50,
+                           cursor: str | None = None) -> Tuple[List[Dict], str | None]:
+        """Pull requests, most recently updated first; returns (rows, next_cursor)."""
+        return self._page("pull_requests", PR_COLUMNS, "updated_at", repo, status, limit, cursor)
+
+    def list_reviews(self, repo: str | None = None, status: str | None = None, limit: int = 50,
+                     cursor: str | None = None) -> Tuple[List[Dict], str | None]:
+        """Reviews, newest first; returns (rows, next_cursor)."""
+        return self._page("reviews", REVIEW_COLUMNS, "created_at", repo, status, limit, cursor)
+
+    def _page(self, table: str, columns: Tuple[str, ...], order: str, repo: str | None, status: str | None,
+              limit: int, cursor: str | None) -> Tuple[List[Dict], str | None]:
+        where, params = [], []
+        if repo is not None:
+            where.append("repo = ?")
+            params.append(repo)
+        if status is not None:
+            where.append("status = ?")
+            params.append(status)
+        if cursor:
+            # Keyset pagination: resume strictly after the last row of the previous page
+            when, last_id = decode_cursor(cursor)
+            where.append(f"({order} < ? OR ({order} = ? AND id < ?))")
+            params += [when, when, last_id]
+        sql = f"SELECT {', '.join(columns)} FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order} DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        with self._lock:
+            rows = [dict(zip(columns, row)) for row in self._db.execute(sql, params)]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][order], rows[-1]["id"])
+        return rows, next_cursor
+
+    def get_pull_request(self, pull_request_id: int) -> Dict | None:
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(PR_COLUMNS)} FROM pull_requests WHERE id = ?",
+                                   (pull_request_id,)).fetchone()
+        return dict(zip(PR_COLUMNS, row)) if row else None
+
+    def latest_review(self, pull_request_id: int) -> Dict | None:
+        """
+        The pull request's latest full review (its latest_review_id), with
+        its issues under "issues". Delta reviews of later pushes are listed
+        by list_reviews() but don't replace it.
+        """
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join('r.' + c for c in REVIEW_COLUMNS)} FROM reviews r"
+                " JOIN pull_requests p ON p.latest_review_id = r.id WHERE p.id = ?",
+                (pull_request_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            review = dict(zip(REVIEW_COLUMNS, row))
+            review["issues"] = [dict(zip(ISSUE_COLUMNS, r)) for r in self._db.execute(
+                f"SELECT {', '.join(ISSUE_COLUMNS)} FROM issues WHERE review_id = ? ORDER BY rowid", (review["id"],)
+            )]
+        return review
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {table: self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                      for table in ("pull_requests", "reviews", "issues")}
+        return {**counts, "version": self.version, "writes": self.writes, "write_batches": self.batches,
+                "pending_writes": self.pending_writes()}
+
+    def pending_writes(self) -> int:
+        """Writes queued but not yet committed; cheap enough for every metrics scrape."""
+        return self._writes.qsize()
+
+    def close(self):
+        self._writes.put(None)
+        self._writer.join(timeout=5)
+        with self._lock:
+            self._db.close()
+
+
+def encode_cursor(when: float, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{when!r}:{row_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """Inverse of encode_cursor; raises ValueError on malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        when, row_id = raw.split(":")
+        return float(when), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+_review_store: ReviewStore | None = None
+_review_store_lock = threading.Lock()
+
+
+def get_review_store() -> ReviewStore:
+    """Process-wide review store, configured from settings."""
+    global _review_store
+    with _review_store_lock:
+        if _review_store is None:
+            _review_store = ReviewStore(settings.review_store_path or None)
+        return _review_store
@@ -0,0 +1,72 @@
+# src/codemate/utils/aho_corasick.py
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring matcher. Patterns are compiled once into a
+    DFA (goto + failure links folded into one transition table), so
+    scanning is a single pass over the text whatever the number of
+    patterns.
+    """
+
+    __slots__ = ("patterns", "_delta", "_out")
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = list(patterns)
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Tuple[int, ...]] = [()]
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                raise ValueError("empty pattern")
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(())
+                state = nxt
+            out[state] += (index,)
+
+        # Breadth-first: a state's failure target is always resolved before it
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            out[state] += out[fail[state]]
+            # Missing transitions fall back to the failure state's; anything
+            # not in the table leads back to the root
+            row = dict(delta[fail[state]])
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0) if state else 0
+                row[ch] = nxt
+                queue.append(nxt)
+            delta[state] = row
+        self._delta = delta
+        self._out = out
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (end offset, pattern index) for every occurrence, overlapping ones included."""
+        delta, out = self._delta, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                for index in out[state]:
+                    yield i + 1, index
+
+    def matched(self, text: str) -> set:
+        """Indexes of the patterns occurring in `text`."""
+        delta, out = self._delta, self._out
+        found = set()
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
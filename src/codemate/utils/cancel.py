@@ -0,0 +1,108 @@
+# src/codemate/utils/cancel.py
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Set
+
+
+class Cancelled(BaseException):
+    """
+    Raised inside a job when its CancelToken fires.
+    Derives from BaseException so `except Exception` blocks in analyzers
+    don't swallow it.
+    """
+
+
+class CancelToken:
+    """
+    Cooperative cancellation handle for one unit of work.
+    Subprocesses started through codemate.utils.process register here so
+    cancel() can kill them immediately.
+    """
+
+    def __init__(self, parent: "CancelToken | None" = None):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes: Set = set()
+        self._children: Set["CancelToken"] = set()
+        self.reason: str | None = None
+        if parent is not None:
+            parent._add_child(self)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            processes = list(self._processes)
+            children = list(self._children)
+        for proc in processes:
+            _kill(proc)
+        for child in children:
+            child.cancel(reason)
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled(self.reason)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._event.wait(timeout)
+
+    def register(self, proc):
+        with self._lock:
+            if not self._event.is_set():
+                self._processes.add(proc)
+                return
+        _kill(proc)
+
+    def unregister(self, proc):
+        with self._lock:
+            self._processes.discard(proc)
+
+    def _add_child(self, child: "CancelToken"):
+        with self._lock:
+            if not self._event.is_set():
+                self._children.add(child)
+                return
+        child.cancel(self.reason or "cancelled")
+
+
+_current: ContextVar[CancelToken | None] = ContextVar("codemate_cancel_token", default=None)
+
+
+def current_token() -> CancelToken | None:
+    return _current.get()
+
+
+@contextmanager
+def use_token(token: CancelToken | None):
+    """Make `token` the current token for code running in this context."""
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+def check_cancelled():
+    """Raise Cancelled if the current job has been cancelled."""
+    token = _current.get()
+    if token is not None:
+        token.check()
+
+
+def _kill(proc):
+    import os
+    import signal
+    if proc.poll() is not None:
+        return
+    try:
+        # Analyzer tools may fork workers; take down the whole process group
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (AttributeError, OSError):
+        proc.kill()
@@ -0,0 +1,37 @@
+# src/codemate/utils/paths.py
+import fnmatch
+import re
+
+# Directories holding third-party or build output
+VENDORED_DIRS = ("vendor", "vendors", "third_party", "thirdparty", "node_modules", "bower_components",
+                 "dist", "build", "site-packages", ".venv", "venv", "__pycache__")
+
+# Files written by tools rather than people
+GENERATED_PATTERNS = (
+    "*.min.js", "*.min.css", "*.map", "*.bundle.js",
+    "*_pb2.py", "*_pb2_grpc.py", "*.pb.go", "*.pb.cc", "*.pb.h", "*.g.dart", "*.designer.cs",
+    "*.generated.*", "*_generated.*",
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock", "Pipfile.lock",
+    "Cargo.lock", "go.sum", "composer.lock", "Gemfile.lock", "uv.lock",
+)
+
+# Markers tools put at the top of generated files
+GENERATED_MARKERS = re.compile(r"@generated|DO NOT EDIT|auto-?generated|generated by", re.I)
+
+
+def is_vendored_path(path: str) -> bool:
+    parts = path.replace("\\", "/").split("/")[:-1]
+    return any(part in VENDORED_DIRS for part in parts)
+
+
+def is_generated_path(path: str) -> bool:
+    """True for vendored, generated or lock files that aren't worth reviewing."""
+    if is_vendored_path(path):
+        return True
+    name = path.replace("\\", "/").rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in GENERATED_PATTERNS)
+
+
+def has_generated_marker(head: str) -> bool:
+    """Whether the first lines of a file say it was generated."""
+    return bool(GENERATED_MARKERS.search(head))
@@ -0,0 +1,71 @@
+# src/codemate/utils/process.py
+import os
+import subprocess
+from functools import lru_cache
+from typing import List
+from codemate.utils.cancel import Cancelled, current_token
+from codemate.metrics import SUBPROCESSES, SUBPROCESSES_RUNNING
+
+
+class ToolError(Exception):
+    """
+    An analyzer tool is missing, crashed or produced unreadable output.
+    Raised rather than reported as "no issues", so the run marks the
+    analyzer failed and nothing is cached for the files.
+    """
+
+
+def run_command(args: List[str], cwd: str | None = None, timeout: float | None = None) -> subprocess.CompletedProcess:
+    """
+    subprocess.run() replacement for analyzer tools.
+    The child is registered with the current CancelToken, so cancelling the
+    job kills the tool instead of waiting for it to finish.
+    Raises Cancelled if the job was cancelled while the tool ran.
+    """
+    token = current_token()
+    if token is not None:
+        token.check()
+
+    SUBPROCESSES.inc(1, os.path.basename(args[0]))
+    proc = subprocess.Popen(
+        args,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=(os.name == "posix"),
+    )
+    if token is not None:
+        token.register(proc)
+    SUBPROCESSES_RUNNING.inc(1)
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        raise
+    finally:
+        SUBPROCESSES_RUNNING.inc(-1)
+        if token is not None:
+            token.unregister(proc)
+
+    if token is not None and token.cancelled:
+        raise Cancelled(token.reason)
+    return subprocess.CompletedProcess(args, proc.returncode, stdout, stderr)
+
+
+def tool_failure(result: subprocess.CompletedProcess) -> str:
+    """Short description of a failed tool run for ToolError: exit status and last stderr line."""
+    lines = (result.stderr or "").strip().splitlines()
+    detail = f": {lines[-1]}" if lines else ""
+    return f"{os.path.basename(result.args[0])} exited with status {result.returncode}{detail}"
+
+
+@lru_cache(maxsize=None)
+def tool_version(tool: str) -> str:
+    """`<tool> --version` output, memoized for the life of the process."""
+    try:
+        result = subprocess.run([tool, "--version"], capture_output=True, text=True)
+    except FileNotFoundError:
+        return "missing"
+    return result.stdout.strip() or result.stderr.strip()
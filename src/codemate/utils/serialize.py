@@ -0,0 +1,22 @@
+# src/codemate/utils/serialize.py
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used instead
+    orjson = None
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON; uses orjson when installed (several times faster on large issue lists)."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON bytes or text; orjson when installed. Raises ValueError on invalid input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
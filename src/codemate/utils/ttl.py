@@ -0,0 +1,65 @@
+# src/codemate/utils/ttl.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """
+    Small in-memory LRU whose entries expire `ttl` seconds after being set.
+    Thread-safe; values are stored as-is (not copied).
+    """
+
+    def __init__(self, ttl: float, max_items: int = 256):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._items: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and time.monotonic() < entry[1]:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._items[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + self.ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def add(self, key: Hashable, value: Any) -> bool:
+        """Set `key` unless it holds an unexpired value; True if it was set (atomic check-and-set)."""
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and time.monotonic() < entry[1]:
+                return False
+            self._items[key] = (value, time.monotonic() + self.ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+            return True
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "items": len(self._items),
+                    "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0}
@@ -0,0 +1,240 @@
+# src/codemate/webhook/jobs.py
+import queue
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List
+from codemate.utils.cancel import CancelToken, Cancelled, use_token
+from codemate.metrics import JOBS, JOB_WAIT_SECONDS
+
+ACTIVE_STATUSES = ("scheduled", "queued", "running")
+FINISHED_STATUSES = ("done", "failed", "superseded", "cancelled")
+
+
+class QueueFull(Exception):
+    """Raised when the job backlog is at capacity."""
+
+
+class Job:
+    def __init__(self, fn: Callable[..., Any], args: tuple = (), kwargs: Dict | None = None,
+                 key: Hashable | None = None, revision: str | None = None):
+        self.id = uuid.uuid4().hex
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.key = key
+        self.revision = revision
+        self.token = CancelToken()
+        self.status = "queued"
+        self.result: Any = None
+        self.error: str | None = None
+        self.superseded_by: str | None = None
+        self.created_at = datetime.now()
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self._timer: threading.Timer | None = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "revision": self.revision,
+            "result": self.result,
+            "error": self.error,
+            "supersededBy": self.superseded_by,
+            "createdAt": self.created_at.isoformat(),
+            "startedAt": self.started_at.isoformat() if self.started_at else None,
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobQueue:
+    """
+    In-process job queue backed by a fixed pool of worker threads.
+    The backlog (scheduled plus queued jobs) is bounded: submit() raises
+    QueueFull instead of growing without limit, so an accepted job always
+    gets a place in the queue. Finished jobs are kept (up to `history`) for
+    status lookups.
+
+    submit_latest() coalesces work per key (e.g. one pull request): it waits
+    `debounce` seconds before queueing, and a newer revision cancels any
+    scheduled, queued or running job for an older one.
+    """
+
+    def __init__(self, workers: int = 4, max_backlog: int = 100, history: int = 1000,
+                 debounce: float = 0.0):
+        self.workers = workers
+        self.history = history
+        self.debounce = debounce
+        self.max_backlog = max_backlog
+        # Bounded by _admit() rather than maxsize, which doesn't see scheduled jobs
+        self._queue: "queue.Queue[Job | None]" = queue.Queue()
+        self._scheduled = 0
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._latest: Dict[Hashable, Job] = {}
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"codemate-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float | None = None):
+        with self._lock:
+            for job in list(self._latest.values()):
+                self._cancel(job, "cancelled")
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        job = Job(fn, args, kwargs)
+        with self._lock:
+            self._enqueue(job)
+        return job
+
+    def submit_latest(self, key: Hashable, revision: str | None, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        """
+        Submit a job that replaces any pending work for `key`.
+        Resubmitting the revision that is already pending returns that job.
+        """
+        with self._lock:
+            current = self._latest.get(key)
+            if current is not None and current.status in ACTIVE_STATUSES:
+                if revision is not None and current.revision == revision:
+                    return current
+
+            job = Job(fn, args, kwargs, key=key, revision=revision)
+            # A scheduled job being replaced gives its place to the new one
+            self._admit(freed=1 if current is not None and current.status == "scheduled" else 0)
+            if current is not None and current.status in ACTIVE_STATUSES:
+                current.superseded_by = job.id
+                self._cancel(current, "superseded")
+            if self.debounce > 0:
+                job.status = "scheduled"
+                job._timer = threading.Timer(self.debounce, self._enqueue_scheduled, (job,))
+                job._timer.daemon = True
+                self._scheduled += 1
+                self._register(job)
+            else:
+                self._enqueue(job)
+            self._latest[key] = job
+
+        if job._timer is not None:
+            job._timer.start()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in ACTIVE_STATUSES:
+                return False
+            self._cancel(job, "cancelled")
+            if job.status != "running":
+                self._release(job)
+        return True
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def in_flight(self) -> int:
+        """Jobs currently running on a worker."""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status == "running")
+
+    # The helpers below expect self._lock to be held
+
+    def _cancel(self, job: Job, status: str):
+        if job._timer is not None:
+            job._timer.cancel()
+        if job.status == "scheduled":
+            self._scheduled -= 1
+        if job.status in ("scheduled", "queued"):
+            job.status = status
+            job.finished_at = datetime.now()
+        job.token.cancel(status)
+
+    def _register(self, job: Job):
+        self._jobs[job.id] = job
+        self._trim()
+
+    def _admit(self, freed: int = 0):
+        if self._queue.qsize() + self._scheduled - freed >= self.max_backlog:
+            raise QueueFull("Job backlog is full")
+
+    def _enqueue(self, job: Job):
+        self._admit()
+        self._queue.put_nowait(job)
+        self._register(job)
+
+    def _enqueue_scheduled(self, job: Job):
+        # Its place was reserved when it was scheduled
+        with self._lock:
+            if job.status != "scheduled":
+                return
+            self._scheduled -= 1
+            job.status = "queued"
+            self._queue.put_nowait(job)
+
+    def _trim(self):
+        # Drop the oldest finished jobs once history is exceeded
+        excess = len(self._jobs) - self.history
+        if excess <= 0:
+            return
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].status in FINISHED_STATUSES:
+                del self._jobs[job_id]
+                excess -= 1
+
+    def _release(self, job: Job):
+        if job.finished_at is None:
+            job.finished_at = datetime.now()
+        if job.key is not None and self._latest.get(job.key) is job:
+            del self._latest[job.key]
+
+    def _finish(self, job: Job):
+        with self._lock:
+            self._release(job)
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            try:
+                with self._lock:
+                    if job.token.cancelled:
+                        self._release(job)
+                        continue
+                    job.status = "running"
+                    job.started_at = datetime.now()
+                JOB_WAIT_SECONDS.observe((job.started_at - job.created_at).total_seconds())
+                try:
+                    with use_token(job.token):
+                        job.result = job.fn(*job.args, **job.kwargs)
+                    job.status = "done"
+                except Cancelled as e:
+                    job.status = str(e) if str(e) in FINISHED_STATUSES else "cancelled"
+                except Exception as e:
+                    job.error = str(e)
+                    job.status = "failed"
+                    traceback.print_exc()
+                finally:
+                    JOBS.inc(1, job.status)
+                    self._finish(job)
+            finally:
+                self._queue.task_done()
@@ -1,18 +1,41 @@
 from fastapi import FastAPI, Request, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
-from codemate.providers.github import GitHubProvider
-from codemate.diff.parser import parse_patch
-from codemate.analyzers.lint_analyzer import LintAnalyzer
-from codemate.analyzers.security_analyzer import SecurityAnalyzer
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from codemate.providers.github import make_github_provider
 from codemate.reporter.github_reporter import GitHubReporter
+from codemate.pipeline import review_pull_request
+from codemate.webhook.jobs import JobQueue, QueueFull
+from codemate.analyzers.cache import get_analysis_cache
+from codemate.analyzers.secret_rules import get_secret_rules
+from codemate.analyzers.source_cache import get_source_cache
+from codemate.metrics import REGISTRY, WEBHOOKS
+from codemate.llm.cache import get_llm_cache
+from codemate.scoring.scorer import score_from_issues
+from codemate.store import decode_cursor, get_review_store
+from codemate.utils.serialize import dumps, loads
+from codemate.utils.ttl import TTLCache
 from codemate.config import settings
+import os
+import re
+import time
 import hmac
 import hashlib
-import uvicorn
-from datetime import datetime
-from typing import List, Dict, Any
-
-app = FastAPI(title="Codemate PR Review Webhook")
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.secret_scan:
+        get_secret_rules()  # compile the rule set once, before the first review
+    review_queue.start()
+    yield
+    review_queue.stop(timeout=5)
+    get_review_store().flush(timeout=5)
+
+app = FastAPI(title="Codemate PR Review Webhook", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -23,6 +46,8 @@ app.add_middleware(
     allow_headers=["*"],
     expose_headers=["*"],
 )
+# Preflight (OPTIONS) requests are answered by CORSMiddleware before routing
+app.add_middleware(GZipMiddleware, minimum_size=settings.api_gzip_min_bytes)
 
 # -------------------------
 # Simple GET test route
@@ -30,255 +55,426 @@ app.add_middleware(
 def root():
     return {"message": "Codemate webhook server running"}
 
-<<<<<<< HEAD
 # Health check endpoint
 @app.get("/health")
 def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
-# API endpoints for frontend
-@app.get("/api/pull-requests")
-def get_pull_requests():
-    """Get list of pull requests for frontend display"""
-    # This would typically fetch from a database or GitHub API
-    # For now, return mock data that matches frontend expectations
-    return [
-        {
-            "id": "1",
-            "title": "Add user authentication system",
-            "repository": "frontend-app",
-            "author": "johndoe",
-            "branch": "feature/auth-system",
-            "status": "reviewed",
-            "createdAt": "2024-01-15T10:30:00Z",
-            "updatedAt": "2024-01-15T14:20:00Z",
-            "reviewScore": 85,
-            "url": "https://github.com/company/frontend-app/pull/42",
-        },
-        {
-            "id": "2",
-            "title": "Optimize database queries in user service",
-            "repository": "backend-api",
-            "author": "janesmith",
-            "branch": "optimize/user-queries",
-            "status": "pending",
-            "createdAt": "2024-01-16T09:15:00Z",
-            "updatedAt": "2024-01-16T09:15:00Z",
-            "url": "https://github.com/company/backend-api/pull/128",
-        },
-        {
-            "id": "3",
-            "title": "Fix memory leak in websocket connections",
-            "repository": "realtime-service",
-            "author": "mikewilson",
-            "branch": "bugfix/websocket-memory-leak",
-            "status": "approved",
-            "createdAt": "2024-01-14T16:45:00Z",
-            "updatedAt": "2024-01-15T11:30:00Z",
-            "reviewScore": 92,
-            "url": "https://github.com/company/realtime-service/pull/67",
-        }
-    ]
-
-@app.get("/api/pull-requests/{pr_id}")
-def get_pull_request(pr_id: str):
-    """Get specific pull request details"""
-    # Mock implementation - would fetch from database/GitHub
-    return {
-        "id": pr_id,
-        "title": f"Pull Request #{pr_id}",
-        "repository": "example-repo",
-        "author": "developer",
-        "branch": "feature-branch",
-        "status": "pending",
-        "createdAt": datetime.now().isoformat(),
-        "updatedAt": datetime.now().isoformat(),
-        "url": f"https://github.com/company/repo/pull/{pr_id}",
+# API endpoints for frontend, served from the review store
+def _iso(timestamp: float | None) -> str | None:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace("+00:00", "Z") if timestamp else None
+
+def _pull_request_json(row: Dict[str, Any]) -> Dict[str, Any]:
+    pr = {
+        "id": str(row["id"]),
+        "title": row["title"] or f"Pull Request #{row['pr']}",
+        "repository": row["repo"],
+        "number": row["pr"],
+        "author": row["author"],
+        "branch": row["branch"],
+        "status": row["status"],
+        "createdAt": _iso(row["created_at"]),
+        "updatedAt": _iso(row["updated_at"]),
+        "url": row["url"] or f"https://github.com/{row['repo']}/pull/{row['pr']}",
     }
-
-@app.get("/api/reviews/{pr_id}")
-def get_ai_review(pr_id: str):
-    """Get AI review for a specific pull request"""
-    # Mock implementation - would generate or fetch from database
+    if row["score"] is not None:
+        pr["reviewScore"] = row["score"]
+    return pr
+
+_API_SEVERITY = {"error": "high", "high": "high", "warning": "medium", "medium": "medium"}
+
+def _issue_json(review_id: int, n: int, issue: Dict[str, Any]) -> Dict[str, Any]:
+    item = {
+        "id": f"issue-{review_id}-{n}",
+        "type": issue["severity"] if issue["severity"] in ("error", "warning") else "suggestion",
+        "file": issue["path"],
+        "line": issue["line"],
+        "rule": issue["rule"],
+        "message": issue["message"],
+        "severity": _API_SEVERITY.get(issue["severity"], "low"),
+    }
+    if issue["suggestion"]:
+        item["code"] = issue["suggestion"]
+    return item
+
+def _review_json(pr: Dict[str, Any], review: Dict[str, Any]) -> Dict[str, Any]:
+    issues = review["issues"]
+    bugs, suggestions = [], []
+    for n, issue in enumerate(issues):
+        # Errors and security findings are likely bugs, the rest are suggestions
+        if issue["severity"] in ("error", "high") or (issue["rule"] or "").startswith(("B", "secret")):
+            bugs.append(_issue_json(review["id"], n, issue))
+        else:
+            suggestions.append(_issue_json(review["id"], n, issue))
+    style = [i for i in issues if (i["rule"] or "")[:1] in ("E", "W", "C", "F")]
+    rules = Counter(i["rule"] for i in style)
+    scope = f"changes since {review['since'][:7]}" if review["since"] else f"{review['files_count']} changed files"
     return {
-        "id": f"review-{pr_id}",
-        "pullRequestId": pr_id,
-        "overallScore": 85,
-        "summary": "This pull request implements solid changes with good code organization. The implementation follows best practices, though there are some areas for improvement in error handling and documentation.",
-        "codeStructure": {
-            "score": 88,
-            "comments": [
-                "Well-organized component hierarchy",
-                "Good separation of concerns between authentication logic and UI",
-                "Consider extracting some utility functions for better reusability",
-            ],
-        },
+        "id": f"review-{review['id']}",
+        "pullRequestId": str(pr["id"]),
+        "headSha": review["head_sha"],
+        "overallScore": review["score"],
+        "summary": f"{review['issues_count']} issues found in {scope}." if issues else "No issues detected.",
+        "codeStructure": {"score": review["score"], "comments": []},
         "codingStandards": {
-            "score": 82,
-            "comments": [
-                "Consistent naming conventions followed",
-                "Good TypeScript usage with proper type definitions",
-                "Some functions could benefit from JSDoc comments",
-                "Missing prop validation in a few components",
-            ],
+            "score": score_from_issues(style),
+            "comments": [f"{rule}: {n} occurrences" for rule, n in rules.most_common(5)],
         },
-        "possibleBugs": [
-            {
-                "id": "bug-1",
-                "type": "error",
-                "file": "src/auth/AuthProvider.tsx",
-                "line": 45,
-                "message": "Potential race condition in token refresh logic",
-                "code": "if (token && !isExpired(token)) { refreshToken(); }",
-                "severity": "high",
-            },
-            {
-                "id": "bug-2",
-                "type": "warning",
-                "file": "src/components/LoginForm.tsx",
-                "line": 23,
-                "message": "Missing input validation for email format",
-                "severity": "medium",
-            },
-        ],
-        "suggestions": [
-            {
-                "id": "suggestion-1",
-                "type": "suggestion",
-                "file": "src/auth/authUtils.ts",
-                "line": 12,
-                "message": "Consider using a more secure method for token storage",
-                "code": 'localStorage.setItem("token", token); // Consider httpOnly cookies instead',
-                "severity": "medium",
-            },
-        ],
+        "possibleBugs": bugs,
+        "suggestions": suggestions,
         "comments": [],
-        "generatedAt": datetime.now().isoformat(),
+        "generatedAt": _iso(review["created_at"]),
     }
 
+def _page_params(limit: int | None, cursor: str | None):
+    limit = min(max(1, limit or settings.api_page_size), settings.api_max_page_size)
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return limit, cursor
+
+# Serialized API responses: list pages keyed by the store version, so any
+# write invalidates them, and reviews (immutable) by id
+api_cache = TTLCache(settings.api_cache_ttl_seconds, settings.api_cache_items)
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+def _not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+def _json_response(request: Request, body: bytes | None, etag: str,
+                   headers: Dict[str, str] | None = None) -> Response:
+    """JSON body with a strong ETag; 304 without a body if the client already has it."""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", **(headers or {})}
+    if body is None or _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _paged(request: Request, build) -> Response:
+    """Serve a page from api_cache; build() returns (payload, next_cursor) on a miss."""
+    key = (request.url.path, str(request.query_params), get_review_store().version)
+    entry = api_cache.get(key)
+    if entry is None:
+        payload, next_cursor = build()
+        body = dumps(payload)
+        entry = (body, _etag(body), next_cursor)
+        api_cache.set(key, entry)
+    body, etag, next_cursor = entry
+    return _json_response(request, body, etag, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+def _stored_pull_request(pr_id: str) -> Dict[str, Any]:
+    row = get_review_store().get_pull_request(int(pr_id)) if pr_id.isdigit() else None
+    if row is None:
+        raise HTTPException(status_code=404, detail="Pull request not found")
+    return row
+
+@app.get("/api/pull-requests")
+def get_pull_requests(request: Request, repo: str | None = None, status: str | None = None,
+                      limit: int | None = None, cursor: str | None = None):
+    """
+    List pull requests, most recently updated first.
+    Paginated by cursor: the X-Next-Cursor header, when present, is the
+    `cursor` of the next page.
+    """
+    limit, cursor = _page_params(limit, cursor)
+
+    def build():
+        rows, next_cursor = get_review_store().list_pull_requests(repo, status, limit, cursor)
+        return [_pull_request_json(row) for row in rows], next_cursor
+
+    return _paged(request, build)
+
+@app.get("/api/pull-requests/{pr_id}")
+def get_pull_request(request: Request, pr_id: str):
+    """Get specific pull request details"""
+    body = dumps(_pull_request_json(_stored_pull_request(pr_id)))
+    return _json_response(request, body, _etag(body))
+
+@app.get("/api/reviews/{pr_id}")
+def get_ai_review(request: Request, pr_id: str):
+    """
+    Get the latest review of a pull request.
+    Reviews never change once stored, so the ETag is the review id and a
+    revalidation that still matches skips loading and encoding the issues.
+    """
+    pr = _stored_pull_request(pr_id)
+    if pr["latest_review_id"] is None:
+        raise HTTPException(status_code=404, detail="Pull request has not been reviewed yet")
+    etag = f'"review-{pr["latest_review_id"]}"'
+    if _not_modified(request, etag):
+        return _json_response(request, None, etag)
+    body = api_cache.get(("review", pr["latest_review_id"]))
+    if body is None:
+        review = get_review_store().latest_review(pr["id"])
+        body = dumps(_review_json(pr, review))
+        etag = f'"review-{review["id"]}"'
+        api_cache.set(("review", review["id"]), body)
+    return _json_response(request, body, etag)
+
 @app.post("/api/reviews/{pr_id}/trigger")
 def trigger_review(pr_id: str):
-    """Trigger a new AI review for a pull request"""
-    # Mock implementation - would trigger actual analysis
-    return {"success": True, "message": f"Review triggered for PR #{pr_id}"}
-
-# Add OPTIONS handlers for CORS preflight requests
-@app.options("/api/pull-requests")
-async def options_pull_requests():
-    return {"message": "OK"}
-
-@app.options("/api/pull-requests/{pr_id}")
-async def options_pull_request(pr_id: str):
-    return {"message": "OK"}
-
-@app.options("/api/reviews/{pr_id}")
-async def options_review(pr_id: str):
-    return {"message": "OK"}
-
-@app.options("/api/reviews/{pr_id}/trigger")
-async def options_trigger_review(pr_id: str):
-    return {"message": "OK"}
-
-@app.options("/webhook")
-async def options_webhook():
-    return {"message": "OK"}
-
-@app.options("/webhook/pull-requests")
-async def options_webhook_pull_requests():
-    return {"message": "OK"}
-
-@app.options("/pull-requests")
-async def options_pull_requests_alt():
-    return {"message": "OK"}
-
-@app.options("/api/prs")
-async def options_prs():
-    return {"message": "OK"}
-
-@app.options("/prs")
-async def options_prs_alt():
-    return {"message": "OK"}
-
-@app.options("/health")
-async def options_health():
-    return {"message": "OK"}
-=======
-# Placeholder /api/reviews route to avoid 404s
+    """Queue a new review of a stored pull request's current head"""
+    pr = _stored_pull_request(pr_id)
+    try:
+        job = review_queue.submit_latest(
+            (pr["repo"], pr["pr"]), None,
+            review_pull_request, github_provider, github_reporter, pr["repo"], pr["pr"],
+        )
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Review backlog is full, retry later")
+    get_review_store().upsert_pull_request(pr["repo"], pr["pr"], status="pending")
+    return JSONResponse(
+        status_code=202,
+        content={"success": True, "message": f"Review triggered for PR #{pr['pr']}", "job_id": job.id},
+    )
+
 @app.get("/api/reviews")
-def get_reviews():
-    return {"reviews": []}
->>>>>>> cbbf2328fda35f043f5fe1df7f09112bd820e9d6
+def get_reviews(request: Request, repo: str | None = None, status: str | None = None,
+                limit: int | None = None, cursor: str | None = None):
+    """List reviews, newest first; paginated like /api/pull-requests"""
+    limit, cursor = _page_params(limit, cursor)
+    return _paged(request, lambda: _reviews_page(repo, status, limit, cursor))
+
+def _reviews_page(repo: str | None, status: str | None, limit: int, cursor: str | None):
+    rows, next_cursor = get_review_store().list_reviews(repo, status, limit, cursor)
+    reviews = [{
+        "id": f"review-{row['id']}",
+        "pullRequestId": str(row["pull_request_id"]),
+        "repository": row["repo"],
+        "number": row["pr"],
+        "headSha": row["head_sha"],
+        "status": row["status"],
+        "overallScore": row["score"],
+        "issuesCount": row["issues_count"],
+        "generatedAt": _iso(row["created_at"]),
+    } for row in rows]
+    return {"reviews": reviews, "nextCursor": next_cursor}, next_cursor
 # -------------------------
 
 # GitHub setup
-github_provider = GitHubProvider(token=settings.github_token)
+github_provider = make_github_provider(settings.github_token, settings.github_transport, settings.github_api_url)
 github_reporter = GitHubReporter(github_provider)
 
+# Background review workers: the webhook only enqueues, workers do the blocking work
+review_queue = JobQueue(
+    workers=settings.review_workers,
+    max_backlog=settings.review_max_backlog,
+    debounce=settings.review_debounce_seconds,
+)
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Get status of a queued review job"""
+    job = review_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
 def verify_github_signature(secret, signature, payload):
     mac = hmac.new(secret.encode(), msg=payload, digestmod=hashlib.sha256)
     expected = f"sha256={mac.hexdigest()}"
     return hmac.compare_digest(expected, signature)
 
+@app.get("/cache/stats")
+def get_cache_stats():
+    """Hit rate and size of the analyzer result cache"""
+    return get_analysis_cache().stats()
+
+@app.get("/store/stats")
+def get_store_stats():
+    """Row counts and write batching of the review store"""
+    return get_review_store().stats()
+
+@app.get("/cache/llm/stats")
+def get_llm_cache_stats():
+    """Hit rate and size of the LLM response cache; every hit is a model call saved"""
+    return get_llm_cache().stats()
+
+def _hit_rates():
+    # Read the in-memory counters only: a scrape must not scan the cache tables
+    caches = [("analysis", get_analysis_cache()), ("api", api_cache), ("source", get_source_cache())]
+    if settings.ai_review:
+        caches.append(("llm", get_llm_cache()))  # otherwise don't create its database
+    rates = {}
+    for name, cache in caches:
+        hits, misses = cache.hits, cache.misses
+        rates[(name,)] = round(hits / (hits + misses), 4) if hits + misses else 0.0
+    return rates
+
+REGISTRY.gauge_function("codemate_queue_depth", "Review jobs waiting for a worker", lambda: review_queue.depth())
+REGISTRY.gauge_function("codemate_jobs_in_flight", "Review jobs running", lambda: review_queue.in_flight())
+REGISTRY.gauge_function("codemate_github_rate_limit_remaining", "GitHub API requests left in the rate-limit window",
+                        lambda: github_provider.rate_limit_remaining)
+REGISTRY.gauge_function("codemate_github_requests", "GitHub API requests sent",
+                        lambda: github_provider.request_count)
+REGISTRY.gauge_function("codemate_cache_hit_rate", "Hit rate of each cache", _hit_rates, ("cache",))
+REGISTRY.gauge_function("codemate_store_pending_writes", "Review store writes not yet committed",
+                        lambda: get_review_store().pending_writes())
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus metrics: stage and analyzer latency histograms, queue, rate limit and cache gauges"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # GitLab secret from environment
 GITLAB_SECRET = os.getenv("GITLAB_WEBHOOK_SECRET")
 # Bitbucket secret from environment
 BITBUCKET_SECRET = os.getenv("BITBUCKET_WEBHOOK_SECRET")
 
+# Webhook ingress: reject what the headers already rule out, read the body
+# once (bounded) and parse it once. Delivery IDs seen recently are answered
+# without reading the body, so redeliveries and retries don't re-run reviews.
+GITHUB_ACTIONS = ("opened", "synchronize", "reopened")
+GITLAB_ACTIONS = ("open", "update", "reopen")
+seen_deliveries = TTLCache(settings.webhook_delivery_ttl_seconds, settings.webhook_delivery_items)
+_ACTION_PREFIX = re.compile(rb'\s*\{\s*"action"\s*:\s*"([^"\\]*)"')
+
+async def _read_body(request: Request, limit: int) -> bytes:
+    """The raw body; 413 as soon as the declared or streamed size exceeds `limit`."""
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=413, detail="Webhook payload too large")
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise HTTPException(status_code=413, detail="Webhook payload too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def _prefix_action(payload: bytes) -> str | None:
+    """The "action" field if the payload starts with it (GitHub sends it first), without a full parse."""
+    match = _ACTION_PREFIX.match(payload, 0, 512)
+    return match.group(1).decode("utf-8", "replace") if match else None
+
+def _parse(payload: bytes) -> Dict[str, Any]:
+    try:
+        data = loads(payload)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    return data
+
+def _duplicate(platform: str, delivery: tuple | None) -> Dict[str, Any] | None:
+    if delivery is not None and seen_deliveries.get(delivery) is not None:
+        WEBHOOKS.inc(1, platform, "duplicate")
+        return {"message": "Duplicate delivery ignored", "delivery": delivery[1]}
+    return None
+
+def _claim(platform: str, delivery: tuple | None) -> Dict[str, Any] | None:
+    """Mark an authenticated delivery as seen; the duplicate response if another request got there first."""
+    if delivery is None or seen_deliveries.add(delivery, time.time()):
+        return None
+    WEBHOOKS.inc(1, platform, "duplicate")
+    return {"message": "Duplicate delivery ignored", "delivery": delivery[1]}
+
+def _ignored(platform: str, message: str) -> Dict[str, Any]:
+    WEBHOOKS.inc(1, platform, "ignored")
+    return {"message": message}
+
 @app.post("/webhook")
 async def handle_webhook(
     request: Request,
     x_hub_signature_256: str | None = Header(None),
     x_github_event: str | None = Header(None),
+    x_github_delivery: str | None = Header(None),
     x_gitlab_token: str | None = Header(None),
+    x_gitlab_event: str | None = Header(None),
+    x_gitlab_event_uuid: str | None = Header(None),
     x_event_key: str | None = Header(None)
 ):
-    payload = await request.body()
-    data = await request.json()
-
     platform = None
+    limit = settings.webhook_max_body_bytes
 
     # -------------------------
     # GitHub
     if x_hub_signature_256:
         platform = "github"
-        if settings.webhook_secret and not verify_github_signature(settings.webhook_secret, x_hub_signature_256, payload):
-            raise HTTPException(status_code=400, detail="Invalid GitHub signature")
-
         if x_github_event != "pull_request":
-            return {"message": "GitHub event ignored"}
-
-        pr_action = data.get("action")
-        if pr_action not in ["opened", "synchronize", "reopened"]:
-            return {"message": f"PR action {pr_action} ignored"}
-
-        repo_full_name = data["repository"]["full_name"]
-        pr_number = data["pull_request"]["number"]
-
-        changed_files = github_provider.list_changed_files(repo_full_name, pr_number)
-        for f in changed_files:
-            f["parsed_lines"] = parse_patch(f.get("patch", ""))
+            return _ignored(platform, "GitHub event ignored")
+        delivery = (platform, x_github_delivery) if x_github_delivery else None
+        duplicate = _duplicate(platform, delivery)
+        if duplicate:
+            return duplicate
 
-        issues = LintAnalyzer().analyze(".", changed_files)
-        issues += SecurityAnalyzer().analyze(".", changed_files)
-
-        github_reporter.post_inline_comments(repo_full_name, pr_number, issues)
-        github_reporter.post_summary(repo_full_name, pr_number, issues)
-
-        return {"message": f"GitHub PR #{pr_number} analyzed successfully", "issues_count": len(issues)}
+        payload = await _read_body(request, limit)
+        if settings.webhook_secret and not verify_github_signature(settings.webhook_secret, x_hub_signature_256, payload):
+            WEBHOOKS.inc(1, platform, "rejected")
+            raise HTTPException(status_code=400, detail="Invalid GitHub signature")
+        duplicate = _claim(platform, delivery)
+        if duplicate:
+            return duplicate
+
+        pr_action = _prefix_action(payload)
+        if pr_action is not None and pr_action not in GITHUB_ACTIONS:
+            return _ignored(platform, f"PR action {pr_action} ignored")
+        try:
+            data = _parse(payload)
+            pr_action = data.get("action")
+            if pr_action not in GITHUB_ACTIONS:
+                return _ignored(platform, f"PR action {pr_action} ignored")
+
+            repo_full_name = data["repository"]["full_name"]
+            pr_number = data["pull_request"]["number"]
+            head_sha = data["pull_request"].get("head", {}).get("sha")
+            pull_request = data["pull_request"]
+            get_review_store().upsert_pull_request(
+                repo_full_name, pr_number, title=pull_request.get("title"),
+                author=(pull_request.get("user") or {}).get("login"), branch=pull_request.get("head", {}).get("ref"),
+                url=pull_request.get("html_url"), status="pending", head_sha=head_sha,
+            )
+
+            # One pending review per PR: a newer head cancels reviews of older ones
+            try:
+                job = review_queue.submit_latest(
+                    (repo_full_name, pr_number), head_sha,
+                    review_pull_request, github_provider, github_reporter, repo_full_name, pr_number,
+                    head_sha=head_sha,
+                )
+            except QueueFull:
+                raise HTTPException(status_code=503, detail="Review backlog is full, retry later")
+        except Exception:
+            # Not reviewed: let GitHub's redelivery try again
+            if delivery is not None:
+                seen_deliveries.discard(delivery)
+            raise
+
+        WEBHOOKS.inc(1, platform, "queued")
+        return JSONResponse(
+            status_code=202,
+            content={"message": f"GitHub PR #{pr_number} queued for review", "job_id": job.id},
+        )
 
     # -------------------------
     # GitLab
     elif x_gitlab_token:
         platform = "gitlab"
         if GITLAB_SECRET and x_gitlab_token != GITLAB_SECRET:
+            WEBHOOKS.inc(1, platform, "rejected")
             raise HTTPException(status_code=403, detail="Invalid GitLab token")
 
+        if x_gitlab_event and x_gitlab_event != "Merge Request Hook":
+            return _ignored(platform, "GitLab event ignored")
+        delivery = (platform, x_gitlab_event_uuid) if x_gitlab_event_uuid else None
+        duplicate = _duplicate(platform, delivery) or _claim(platform, delivery)
+        if duplicate:
+            return duplicate
+
+        data = _parse(await _read_body(request, limit))
         if data.get("object_kind") != "merge_request":
-            return {"message": "GitLab event ignored"}
+            return _ignored(platform, "GitLab event ignored")
 
         mr_action = data.get("object_attributes", {}).get("action")
-        if mr_action not in ["open", "update", "reopen"]:
-            return {"message": f"MR action {mr_action} ignored"}
+        if mr_action not in GITLAB_ACTIONS:
+            return _ignored(platform, f"MR action {mr_action} ignored")
 
         # TODO: Use GitLab provider & reporter similar to GitHub
         return {"message": "GitLab MR received (demo placeholder)"}
@@ -288,10 +484,16 @@ async def handle_webhook(
     elif x_event_key:
         platform = "bitbucket"
         if BITBUCKET_SECRET and request.headers.get("X-Hub-Signature") != BITBUCKET_SECRET:
+            WEBHOOKS.inc(1, platform, "rejected")
             raise HTTPException(status_code=403, detail="Invalid Bitbucket token")
 
         if not x_event_key.startswith("pullrequest:"):
-            return {"message": "Bitbucket event ignored"}
+            return _ignored(platform, "Bitbucket event ignored")
+        request_uuid = request.headers.get("X-Request-UUID")
+        delivery = (platform, request_uuid) if request_uuid else None
+        duplicate = _duplicate(platform, delivery) or _claim(platform, delivery)
+        if duplicate:
+            return duplicate
 
         # TODO: Use Bitbucket provider & reporter similar to GitHub
         return {"message": "Bitbucket PR received (demo placeholder)"}
@@ -301,4 +503,5 @@ async def handle_webhook(
     
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,236 @@
+# src/codemate/workspace.py
+import base64
+import fcntl
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List
+from urllib.parse import unquote, urlsplit
+from codemate.config import settings
+
+# Repo-level config files analyzers read, materialized alongside changed files
+CONFIG_PATHS = (".flake8", "setup.cfg", "tox.ini", "pyproject.toml", ".bandit")
+
+
+class WorkspaceError(Exception):
+    """Raised when a mirror can't be created/updated or a commit is missing."""
+
+
+def _git(args: List[str], cwd: str | None = None, env: Dict[str, str] | None = None) -> str:
+    try:
+        result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, env=env)
+    except FileNotFoundError:
+        raise WorkspaceError("git is not installed")
+    if result.returncode != 0:
+        # git may echo URLs; never let credentials reach logs or exceptions
+        raise WorkspaceError(f"git {' '.join(args[:2])} failed: {_public_url(result.stderr.strip())}")
+    return result.stdout
+
+
+def _credentials_env(url: str) -> Dict[str, str] | None:
+    """
+    Environment handing the URL's credentials to git as an HTTP
+    Authorization header (GIT_CONFIG_* entries), so they never appear on a
+    command line (visible in `ps`) or in the mirror's config. None if the
+    URL has no credentials.
+    """
+    parts = urlsplit(url)
+    if not parts.username:
+        return None
+    userinfo = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+    env = dict(os.environ)
+    n = int(env.get("GIT_CONFIG_COUNT") or 0)
+    env.update({
+        "GIT_CONFIG_COUNT": str(n + 1),
+        f"GIT_CONFIG_KEY_{n}": "http.extraHeader",
+        f"GIT_CONFIG_VALUE_{n}": "Authorization: Basic " + base64.b64encode(userinfo.encode()).decode(),
+        "GIT_TERMINAL_PROMPT": "0",
+    })
+    return env
+
+
+@contextmanager
+def _locked(path: str, exclusive: bool, blocking: bool = True):
+    """flock()-based lock; works across threads and processes."""
+    with open(path, "a") as fh:
+        flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        if not blocking:
+            flags |= fcntl.LOCK_NB
+        try:
+            fcntl.flock(fh, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+class MirrorCache:
+    """
+    Persistent bare mirrors, one per repository, under `root`.
+    Mirrors are created once and updated with incremental fetches. Files are
+    read blob by blob with `git cat-file`, so no working tree is ever
+    checked out. Least recently used mirrors are evicted once the total
+    size exceeds `budget_bytes`.
+
+    Locking: fetches take an exclusive lock on the mirror, reads a shared
+    one, so parallel jobs on the same repository don't corrupt it.
+    """
+
+    def __init__(self, root: str, budget_bytes: int | None = None, partial_clone: bool = False):
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self.partial_clone = partial_clone
+        os.makedirs(root, exist_ok=True)
+
+    def mirror_path(self, url: str) -> str:
+        # Strip credentials so a rotated token maps to the same mirror
+        public = _public_url(url)
+        name = re.sub(r"[^A-Za-z0-9._-]+", "_", public.rstrip("/").split("/")[-1])[:40]
+        digest = hashlib.sha1(public.encode()).hexdigest()[:12]
+        return os.path.join(self.root, f"{name}-{digest}.git")
+
+    def ensure(self, url: str, sha: str) -> str:
+        """Make sure the mirror for `url` exists and contains commit `sha`."""
+        path = self.mirror_path(url)
+        public, env = _public_url(url), _credentials_env(url)
+        with _locked(path + ".lock", exclusive=True):
+            # Credentials travel in the environment of each command only; the
+            # command lines and the mirror config hold the public URL
+            if not os.path.isdir(path):
+                args = ["clone", "--mirror", "--quiet"]
+                if self.partial_clone:
+                    args.append("--filter=blob:none")
+                _git([*args, public, path], env=env)
+            elif not self._has_commit(path, sha):
+                _git(["fetch", "--prune", "--quiet", public, "+refs/*:refs/*"], cwd=path, env=env)
+            if not self._has_commit(path, sha):
+                # Not reachable from any advertised ref (e.g. a fork's PR head)
+                _git(["fetch", "--quiet", public, sha], cwd=path, env=env)
+            if not self._has_commit(path, sha):
+                raise WorkspaceError(f"Commit {sha} not found in {public}")
+            self._touch(path)
+        self.evict(keep=path)
+        return path
+
+    def _has_commit(self, path: str, sha: str) -> bool:
+        result = subprocess.run(["git", "cat-file", "-e", f"{sha}^{{commit}}"], cwd=path, capture_output=True)
+        return result.returncode == 0
+
+    def _touch(self, path: str):
+        with open(os.path.join(path, "codemate-last-used"), "w") as fh:
+            fh.write(str(time.time()))
+
+    def materialize(self, url: str, sha: str, paths: Iterable[str], dest: str) -> List[str]:
+        """
+        Write `paths` as they are at `sha` into `dest`.
+        Paths that don't exist at `sha` (deleted files) are skipped.
+        Returns the paths written.
+        """
+        mirror = self.ensure(url, sha)
+        written = []
+        with _locked(mirror + ".lock", exclusive=False):
+            # With a partial clone, blobs are fetched lazily from origin and need the credentials too
+            proc = subprocess.Popen(
+                ["git", "cat-file", "--batch"], cwd=mirror, env=_credentials_env(url),
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            )
+            try:
+                for rel in paths:
+                    proc.stdin.write(f"{sha}:{rel}\n".encode())
+                    proc.stdin.flush()
+                    header = proc.stdout.readline().split()
+                    if len(header) != 3:
+                        continue  # "<object> missing"
+                    _, kind, size = header
+                    data = proc.stdout.read(int(size))
+                    proc.stdout.read(1)  # trailing newline
+                    if kind != b"blob":
+                        continue
+                    target = os.path.join(dest, rel)
+                    if not os.path.abspath(target).startswith(os.path.abspath(dest) + os.sep):
+                        continue  # refuse paths escaping the workspace
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    with open(target, "wb") as fh:
+                        fh.write(data)
+                    written.append(rel)
+            finally:
+                proc.stdin.close()
+                proc.wait()
+        return written
+
+    def evict(self, keep: str | None = None):
+        """Remove least recently used mirrors until the cache fits the budget."""
+        if self.budget_bytes is None:
+            return
+        mirrors = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if not name.endswith(".git") or not os.path.isdir(path):
+                continue
+            try:
+                last_used = os.path.getmtime(os.path.join(path, "codemate-last-used"))
+            except OSError:
+                last_used = 0.0
+            mirrors.append((last_used, path, _dir_size(path)))
+
+        total = sum(size for _, _, size in mirrors)
+        for _, path, size in sorted(mirrors):
+            if total <= self.budget_bytes:
+                break
+            if path == keep:
+                continue
+            # Skip mirrors another job is using right now
+            with _locked(path + ".lock", exclusive=True, blocking=False) as acquired:
+                if not acquired:
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+
+def _public_url(url: str) -> str:
+    return re.sub(r"//[^@/]*@", "//", url)
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+@contextmanager
+def materialized_workspace(mirrors: MirrorCache, url: str, sha: str, paths: Iterable[str]):
+    """Per-job temp directory holding `paths` at `sha`; removed on exit."""
+    dest = tempfile.mkdtemp(prefix="codemate-ws-")
+    try:
+        mirrors.materialize(url, sha, [*paths, *CONFIG_PATHS], dest)
+        yield dest
+    finally:
+        shutil.rmtree(dest, ignore_errors=True)
+
+
+_mirror_cache: MirrorCache | None = None
+_mirror_cache_lock = threading.Lock()
+
+
+def get_mirror_cache() -> MirrorCache:
+    """Process-wide mirror cache, configured from settings."""
+    global _mirror_cache
+    with _mirror_cache_lock:
+        if _mirror_cache is None:
+            budget = settings.mirror_budget_mb * 1024 * 1024 if settings.mirror_budget_mb else None
+            _mirror_cache = MirrorCache(settings.mirror_dir, budget, settings.mirror_partial_clone)
+        return _mirror_cache
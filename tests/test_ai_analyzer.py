@@ -0,0 +1,88 @@
+import asyncio
+import httpx
+
+from codemate.analyzers.ai_analyzer import AIAnalyzer
+from codemate.llm.client import HTTPBackend, StubBackend
+from codemate.llm.fake_server import create_app
+from codemate.utils.paths import is_generated_path
+
+
+def _patch(lines: int, start: int = 1) -> str:
+    body = []
+    for n in range(lines):
+        body.append(f"+    x_{n} = compute({n})  # TODO tidy" if n % 10 == 0 else f"+    y_{n} = {n}")
+    return f"@@ -0,0 +{start},{lines} @@\n" + "\n".join(body) + "\n"
+
+
+def _files(count: int = 20, lines: int = 40):
+    files = [{"filename": f"pkg/mod_{i}.py", "status": "added", "patch": _patch(lines)} for i in range(count)]
+    files.append({"filename": "vendor/lib/x.py", "status": "added", "patch": _patch(lines)})
+    files.append({"filename": "web/app.min.js", "status": "added", "patch": _patch(lines)})
+    files.append({"filename": "api_pb2.py", "status": "added", "patch": _patch(lines)})
+    files.append({"filename": "gen.py", "status": "added",
+                  "patch": "@@ -0,0 +1,2 @@\n+# Code generated by protoc. DO NOT EDIT.\n+x = 1  # TODO\n"})
+    return files
+
+
+def _http_backend(app, **kwargs):
+    return HTTPBackend("http://fake-llm/v1", "gpt-4", transport=httpx.ASGITransport(app=app), **kwargs)
+
+
+def test_skips_vendored_and_generated_files():
+    assert is_generated_path("vendor/lib/x.py")
+    assert is_generated_path("static/app.min.js")
+    assert is_generated_path("package-lock.json")
+    assert not is_generated_path("src/vendors.py")
+    paths = {u.path for u in AIAnalyzer(StubBackend()).units(_files(), 6000)}
+    assert paths == {f"pkg/mod_{i}.py" for i in range(20)}
+
+
+def test_hunks_are_batched_within_the_token_budget():
+    analyzer = AIAnalyzer(StubBackend(), model="gpt-4", max_output_tokens=1024)
+    batches = analyzer.batches(_files(count=200))
+    assert 1 < len(batches) < 200
+    budget = analyzer.batch_budget()
+    assert all(sum(u.tokens for u in batch) <= budget for batch in batches)
+    # A bigger context window means fewer requests
+    assert len(AIAnalyzer(StubBackend(), model="gpt-4o").batches(_files(count=200))) == 1
+
+
+def test_oversized_hunk_is_split():
+    analyzer = AIAnalyzer(StubBackend(), model="unknown-model")
+    units = analyzer.units([{"filename": "big.py", "status": "added", "patch": _patch(5000)}], 2000)
+    assert len(units) > 1
+    assert sum(len(u.added) for u in units) == 5000
+
+
+def test_batches_run_concurrently_and_map_issues_back():
+    app = create_app(latency=0.02)
+    backend = _http_backend(app)
+    analyzer = AIAnalyzer(backend, model="gpt-4", concurrency=3)
+    issues = analyzer.analyze(".", _files(count=200))
+
+    batches = analyzer.batches(_files(count=200))
+    assert app.state.stats["requests"] == len(batches)
+    assert app.state.stats["max_in_flight"] <= 3
+    assert len(issues) == 200 * 4  # one TODO every 10 added lines
+    assert {i["rule"] for i in issues} == {"ai-feedback"}
+    assert all(i["path"].startswith("pkg/") for i in issues)
+
+
+def test_rate_limited_requests_are_retried():
+    app = create_app(latency=0.05, max_concurrency=1, retry_after=0.01)
+    backend = _http_backend(app, max_retries=50)
+    issues = AIAnalyzer(backend, model="gpt-4", concurrency=4).analyze(".", _files(count=200))
+    assert backend.rate_limited > 0
+    assert app.state.stats["rate_limited"] == backend.rate_limited
+    assert len(issues) == 800
+
+
+def test_results_stream_as_batches_complete():
+    analyzer = AIAnalyzer(StubBackend(latency=0.01), model="gpt-4", concurrency=2)
+
+    async def collect():
+        return [len(batch) async for batch in analyzer.astream(_files(count=200))]
+
+    counts = asyncio.run(collect())
+    assert len(counts) == len(analyzer.batches(_files(count=200)))
+    assert sum(counts) == 800
@@ -0,0 +1,148 @@
+import subprocess
+
+import pytest
+
+from codemate.analyzers import security_analyzer
+from codemate.analyzers.base import AnalyzerBase
+from codemate.analyzers.cache import CachedAnalyzer, blob_sha
+from codemate.analyzers.runner import AnalyzerRunner
+from codemate.analyzers.security_analyzer import SecurityAnalyzer
+from codemate.cache import TieredCache
+
+
+class CountingAnalyzer(AnalyzerBase):
+    def __init__(self):
+        self.seen = []
+
+    def analyze(self, repo_path, changed_files):
+        self.seen.append([f["filename"] for f in changed_files])
+        return [
+            {"path": f["filename"], "line": 1, "severity": "warning", "rule": "X1", "message": "m", "suggestion": ""}
+            for f in changed_files
+            if f["filename"] != "clean.py"
+        ]
+
+
+def _files(*names):
+    return [{"filename": n, "status": "modified", "patch": ""} for n in names]
+
+
+def test_blob_sha_matches_git():
+    assert blob_sha(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+def test_only_changed_content_is_reanalyzed(tmp_path):
+    (tmp_path / "a.py").write_text("a = 1\n")
+    (tmp_path / "clean.py").write_text("b = 2\n")
+    inner = CountingAnalyzer()
+    analyzer = CachedAnalyzer(inner, TieredCache())
+
+    first = analyzer.analyze(str(tmp_path), _files("a.py", "clean.py"))
+    second = analyzer.analyze(str(tmp_path), _files("a.py", "clean.py"))
+    assert first == second
+    assert inner.seen == [["a.py", "clean.py"]]
+
+    (tmp_path / "a.py").write_text("a = 3\n")
+    analyzer.analyze(str(tmp_path), _files("a.py", "clean.py"))
+    assert inner.seen[-1] == ["a.py"]
+    assert analyzer.cache.stats()["hits"] == 3
+
+
+def test_renamed_file_is_reanalyzed_under_its_new_path(tmp_path):
+    # Per-path config (per-file-ignores, excludes) can change the result for the same content
+    (tmp_path / "a.py").write_text("a = 1\n")
+    inner = CountingAnalyzer()
+    analyzer = CachedAnalyzer(inner, TieredCache())
+    analyzer.analyze(str(tmp_path), _files("a.py"))
+    (tmp_path / "a.py").rename(tmp_path / "b.py")
+    assert analyzer.analyze(str(tmp_path), _files("b.py"))[0]["path"] == "b.py"
+    assert inner.seen == [["a.py"], ["b.py"]]
+
+
+def test_bandit_config_is_part_of_the_fingerprint(tmp_path):
+    analyzer = SecurityAnalyzer()
+    (tmp_path / "pyproject.toml").write_text('[project]\nname = "x"\n')
+    base = analyzer.config_fingerprint(str(tmp_path))
+
+    (tmp_path / "pyproject.toml").write_text('[project]\nname = "y"\n')
+    assert analyzer.config_fingerprint(str(tmp_path)) == base
+
+    (tmp_path / "pyproject.toml").write_text('[project]\nname = "y"\n\n[tool.bandit]\nskips = ["B101"]\n')
+    with_section = analyzer.config_fingerprint(str(tmp_path))
+    assert with_section != base
+
+    (tmp_path / ".bandit").write_text("[bandit]\nskips = B105\n")
+    assert analyzer.config_fingerprint(str(tmp_path)) not in (base, with_section)
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    (tmp_path / "a.py").write_text("a = 1\n")
+    db = str(tmp_path / "cache" / "results.sqlite3")
+    CachedAnalyzer(CountingAnalyzer(), TieredCache(path=db)).analyze(str(tmp_path), _files("a.py"))
+
+    inner = CountingAnalyzer()
+    cache = TieredCache(path=db)
+    assert CachedAnalyzer(inner, cache).analyze(str(tmp_path), _files("a.py"))[0]["rule"] == "X1"
+    assert inner.seen == []
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["disk_bytes"] > 0
+
+
+def test_memory_tier_is_lru_bounded():
+    cache = TieredCache(max_items=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["memory_items"] == 2
+
+
+@pytest.mark.parametrize("returncode, stdout", [(2, ""), (1, "Traceback (most recent call last):")])
+def test_tool_failure_fails_the_analyzer_and_caches_nothing(tmp_path, monkeypatch, returncode, stdout):
+    (tmp_path / "a.py").write_text("import pickle\n")
+    failed = subprocess.CompletedProcess(["bandit"], returncode, stdout, "bandit: error: boom\n")
+    monkeypatch.setattr(security_analyzer, "run_command", lambda args, cwd=None: failed)
+    cache = TieredCache()
+    run = AnalyzerRunner([CachedAnalyzer(SecurityAnalyzer(), cache)]).run(
+        str(tmp_path), [{"filename": "a.py", "status": "added", "patch": "@@ -0,0 +1 @@\n+import pickle"}])
+    assert list(run.failed) == ["SecurityAnalyzer"]
+    assert f"bandit exited with status {returncode}: bandit: error: boom" in run.failed["SecurityAnalyzer"]
+    assert cache.stats()["memory_items"] == 0
+
+
+class PatchOnlyAnalyzer(CountingAnalyzer):
+    def targets(self, repo_path, changed_files):
+        return [f["filename"] for f in changed_files if f.get("patch")]
+
+    def analyze(self, repo_path, changed_files):
+        return super().analyze(repo_path, [f for f in changed_files if f.get("patch")])
+
+
+def test_files_out_of_the_analyzers_scope_are_not_cached(tmp_path):
+    (tmp_path / "a.py").write_text("a = 1\n")
+    inner = PatchOnlyAnalyzer()
+    analyzer = CachedAnalyzer(inner, TieredCache())
+
+    assert analyzer.analyze(str(tmp_path), [{"filename": "a.py", "status": "modified", "patch": None}]) == []
+    assert analyzer.cache.stats()["memory_items"] == 0
+
+    # Same content, now in scope: analyzed rather than a cached "clean"
+    issues = analyzer.analyze(str(tmp_path), [{"filename": "a.py", "status": "modified", "patch": "@@"}])
+    assert [i["rule"] for i in issues] == ["X1"]
+    assert inner.seen == [["a.py"]]
+
+
+def test_files_not_on_disk_are_never_cached(tmp_path):
+    # Without a workspace the PR files aren't checked out; GitHub's blob SHA must not stand in
+    inner = CountingAnalyzer()
+    analyzer = CachedAnalyzer(inner, TieredCache())
+    files = [{"filename": "a.py", "status": "modified", "patch": "", "sha": blob_sha(b"a = 1\n")}]
+    analyzer.analyze(str(tmp_path), files)
+    assert analyzer.cache.stats()["memory_items"] == 0
+
+    (tmp_path / "a.py").write_text("a = 1\n")
+    analyzer.analyze(str(tmp_path), files)
+    assert inner.seen == [["a.py"], ["a.py"]]
@@ -0,0 +1,55 @@
+import sys
+import time
+
+from codemate.analyzers.base import AnalyzerBase
+from codemate.analyzers.runner import AnalyzerRunner
+from codemate.utils.process import run_command
+
+
+class SleepAnalyzer(AnalyzerBase):
+    def __init__(self, seconds, rule):
+        self.seconds = seconds
+        self.rule = rule
+
+    @property
+    def name(self):
+        return self.rule
+
+    def analyze(self, repo_path, changed_files):
+        run_command([sys.executable, "-c", f"import time; time.sleep({self.seconds})"])
+        return [{"path": "a.py", "line": 1, "severity": "info", "rule": self.rule, "message": "", "suggestion": ""}]
+
+
+class BrokenAnalyzer(AnalyzerBase):
+    def analyze(self, repo_path, changed_files):
+        raise ValueError("bad config")
+
+
+def test_analyzers_run_concurrently():
+    runner = AnalyzerRunner([SleepAnalyzer(0.5, "one"), SleepAnalyzer(0.5, "two")])
+    t0 = time.monotonic()
+    run = runner.run(".", [])
+    assert time.monotonic() - t0 < 0.9
+    assert [i["rule"] for i in run.issues] == ["one", "two"]
+    assert sorted(run.completed) == ["one", "two"]
+    assert not run.partial
+
+
+def test_timeout_returns_partial_results_and_kills_tool():
+    runner = AnalyzerRunner([SleepAnalyzer(0.1, "fast"), SleepAnalyzer(30, "slow"), BrokenAnalyzer()], timeout=1.0)
+    t0 = time.monotonic()
+    run = runner.run(".", [])
+    assert time.monotonic() - t0 < 3
+    assert [i["rule"] for i in run.issues] == ["fast"]
+    assert run.completed == ["fast"]
+    assert run.timed_out == ["slow"]
+    assert run.failed == {"BrokenAnalyzer": "bad config"}
+    assert run.partial
+
+
+def test_total_budget_caps_the_run():
+    runner = AnalyzerRunner([SleepAnalyzer(30, "slow")], timeout=60, budget=0.5)
+    t0 = time.monotonic()
+    run = runner.run(".", [])
+    assert time.monotonic() - t0 < 2
+    assert run.timed_out == ["slow"]
@@ -0,0 +1,57 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from codemate.store import ReviewStore
+from codemate.webhook import server
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = ReviewStore()
+    monkeypatch.setattr(server, "get_review_store", lambda: store)
+    server.api_cache.clear()
+    yield store
+    store.close()
+
+
+def _issues(count):
+    return [{"path": f"pkg/m{n % 9}.py", "line": n, "severity": "warning", "rule": "E501",
+             "message": f"line too long ({80 + n} > 79 characters)", "suggestion": ""} for n in range(count)]
+
+
+def test_list_etag_revalidates_until_a_write(store):
+    store.record_review("o/r", 1, "h1", _issues(2), 96)
+    store.flush()
+    client = TestClient(server.app)
+
+    first = client.get("/api/pull-requests")
+    etag = first.headers["ETag"]
+    again = client.get("/api/pull-requests", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+
+    store.record_review("o/r", 2, "h2", [], 100)
+    store.flush()
+    changed = client.get("/api/pull-requests", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert [pr["number"] for pr in changed.json()] == [2, 1]
+
+
+def test_review_etag_and_gzip(store):
+    store.record_review("o/r", 1, "h1", _issues(500), 0)
+    store.flush()
+    client = TestClient(server.app)
+    pr_id = client.get("/api/pull-requests").json()[0]["id"]
+
+    resp = client.get(f"/api/reviews/{pr_id}", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert len(resp.json()["suggestions"]) == 500
+    cached = client.get(f"/api/reviews/{pr_id}", headers={"If-None-Match": resp.headers["ETag"]})
+    assert cached.status_code == 304
+
+
+def test_preflight_is_answered_by_cors_middleware(store):
+    client = TestClient(server.app)
+    resp = client.options("/api/reviews/1/trigger", headers={
+        "Origin": "https://dashboard.example", "Access-Control-Request-Method": "POST"})
+    assert resp.status_code == 200
+    assert resp.headers["Access-Control-Allow-Origin"] == "*"
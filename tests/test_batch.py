@@ -0,0 +1,148 @@
+import threading
+import time
+
+import pytest
+
+from codemate.batch import (Checkpoint, ProviderPool, RateLimitBudget, format_report, parse_target, read_targets,
+                            run_batch)
+
+
+class FakeProvider:
+    def __init__(self, heads=None):
+        self.heads = heads or {n: f"sha{n}" for n in (1, 2, 3)}
+        self.request_count = 0
+        self.rate_limit_remaining = None
+        self.rate_limit_reset = None
+
+    def list_open_pull_requests(self, repo):
+        self.request_count += 1
+        return [{"number": n, "head": {"sha": sha}} for n, sha in self.heads.items()]
+
+    def get_head_sha(self, repo, pr_id):
+        self.request_count += 1
+        return self.heads[pr_id]
+
+
+class FakeReview:
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, provider, reporter, repo, pr_id, head_sha=None, dry_run=False):
+        with self.lock:
+            self.calls.append((repo, pr_id, head_sha, dry_run))
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.02)
+        provider.request_count += 3
+        with self.lock:
+            self.running -= 1
+        if pr_id in self.fail:
+            raise RuntimeError("boom")
+        return {"head": head_sha, "files_count": 2, "issues_count": pr_id, "score": 90}
+
+
+def test_parse_targets(tmp_path):
+    assert parse_target("o/r#12") == ("o/r", 12)
+    assert parse_target("o/r 12") == ("o/r", 12)
+    assert parse_target(" o/r ") == ("o/r", None)
+    for bad in ("o", "o/r#x", "/r"):
+        with pytest.raises(ValueError):
+            parse_target(bad)
+    path = tmp_path / "targets.txt"
+    path.write_text("# backfill\no/r#1\n\nx/y\n")
+    assert read_targets(str(path)) == [("o/r", 1), ("x/y", None)]
+
+
+def test_batch_expands_repos_limits_concurrency_and_reports():
+    review = FakeReview(fail={2})
+    pool = ProviderPool(FakeProvider, 2)
+    report = run_batch([("o/r", None), ("o/r", 3), ("x/y", 9)], pool, lambda p: None, review, concurrency=2)
+
+    assert sorted(c[:3] for c in review.calls) == [("o/r", 1, "sha1"), ("o/r", 2, "sha2"), ("o/r", 3, "sha3"),
+                                                   ("x/y", 9, None)]
+    assert review.max_running <= 2
+    by_pr = {(e["repo"], e["pr"]): e for e in report["results"]}
+    assert by_pr[("o/r", 2)]["status"] == "failed" and by_pr[("o/r", 2)]["error"] == "boom"
+    assert by_pr[("x/y", 9)] == dict(by_pr[("x/y", 9)], status="done", issues=9, requests=3)
+    assert report["requests"] == 1 + 4 * 3
+
+    text = format_report(report)
+    assert "3 reviewed, 1 failed, 0 already done" in text
+    assert "o/r#2" in text and "boom" in text
+
+
+def test_checkpoint_resumes_and_dry_run_skips_it(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    first = FakeReview(fail={2})
+    run_batch([("o/r", None)], ProviderPool(FakeProvider, 1), lambda p: None, first, checkpoint=Checkpoint(path))
+
+    # Only the failed PR is retried
+    second = FakeReview()
+    report = run_batch([("o/r", None)], ProviderPool(FakeProvider, 1), lambda p: None, second,
+                       checkpoint=Checkpoint(path))
+    assert [c[1] for c in second.calls] == [2]
+    assert report["skipped"] == 2
+
+    with open(path, "a") as fh:
+        fh.write('{"repo": "o/r", "pr"')  # torn line from an interrupted run
+    dry = FakeReview()
+    report = run_batch([("o/r", 4)], ProviderPool(FakeProvider, 1), lambda p: None, dry,
+                       checkpoint=Checkpoint(path), dry_run=True)
+    assert dry.calls == [("o/r", 4, None, True)]
+    assert (("o/r", 4)) not in Checkpoint(path).done
+    assert len(Checkpoint(path).done) == 3
+
+
+def test_rate_limit_budget_waits_for_reset():
+    now = [1000.0]
+    budget = RateLimitBudget(reserve=100, initial_cost=10, clock=lambda: now[0])
+    budget.start()  # no reading yet
+    budget.finish(requests=10, remaining=115, reset=1000.2)
+    budget.start()  # 115 - 10 > 100
+    started = threading.Event()
+
+    def second():
+        budget.start()
+        started.set()
+
+    threading.Thread(target=second, daemon=True).start()
+    assert not started.wait(0.05)  # 115 - 2 * 10 <= 100
+    budget.finish(requests=10, remaining=500, reset=1060)
+    assert started.wait(1)
+    assert budget.waited_seconds > 0
+
+    # An exhausted window doesn't block once its reset time has passed
+    budget.observe(remaining=0, reset=1060)
+    now[0] = 1061.0
+    budget.start()
+    assert budget.in_flight == 2
+
+
+def test_checkpointed_prs_with_new_commits_are_reviewed_again(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    heads = {1: "a1", 2: "a2"}
+    run_batch([("o/r", None)], ProviderPool(lambda: FakeProvider(heads), 1), lambda p: None, FakeReview(),
+              checkpoint=Checkpoint(path))
+
+    heads[2] = "b2"
+    review = FakeReview()
+    report = run_batch([("o/r", None), ("o/r", 1), ("o/r", 2)], ProviderPool(lambda: FakeProvider(heads), 1),
+                       lambda p: None, review, checkpoint=Checkpoint(path))
+    assert review.calls == [("o/r", 2, "b2", False)]
+    assert report["skipped"] == 1
+    assert Checkpoint(path).done[("o/r", 2)]["head"] == "b2"
+
+
+def test_rate_limit_readings_never_raise_the_budget_within_a_window():
+    budget = RateLimitBudget(reserve=100, clock=lambda: 1000.0)
+    budget.observe(remaining=300, reset=2000)
+    budget.observe(remaining=450, reset=2000)  # a slow review's older reading
+    assert budget.remaining == 300
+    budget.observe(remaining=4900, reset=1500)  # from the previous window
+    assert (budget.remaining, budget.reset) == (300, 2000)
+    budget.observe(remaining=4990, reset=5600)  # the window reset
+    assert (budget.remaining, budget.reset) == (4990, 5600)
@@ -0,0 +1,70 @@
+from unidiff import PatchSet
+
+from codemate.diff.model import ADDED, parse_diff, to_legacy
+from codemate.diff.parser import parse_file_patch, parse_patch
+
+MULTI_FILE = """diff --git a/x.py b/y.py
+similarity index 90%
+rename from x.py
+rename to y.py
+--- a/x.py
++++ b/y.py
+@@ -1,3 +1,3 @@ def f():
+ a
+-b
++c
+
+@@ -10 +10,2 @@
+-old
++new
++--- not a header
+\\ No newline at end of file
+diff --git a/z.py b/z.py
+deleted file mode 100644
+--- a/z.py
++++ /dev/null
+@@ -1 +0,0 @@
+-gone
+"""
+
+
+def _unidiff_legacy(text):
+    mapped = []
+    for patched_file in PatchSet(text.splitlines(True)):
+        for hunk in patched_file:
+            for line in hunk:
+                mapped.append({
+                    "path": patched_file.path,
+                    "line": getattr(line, "target_line_no", None),
+                    "content": line.value.rstrip("\n"),
+                    "is_added": line.is_added,
+                    "is_removed": line.is_removed
+                })
+    return mapped
+
+
+def test_legacy_adapter_matches_unidiff():
+    assert parse_patch(MULTI_FILE) == _unidiff_legacy(MULTI_FILE)
+
+
+def test_hunks_and_line_numbers():
+    files = parse_diff(MULTI_FILE)
+    assert [f.path for f in files] == ["y.py", "z.py"]
+    second = files[0].hunks[1]
+    assert (second.old_start, second.old_count, second.new_start, second.new_count) == (10, 1, 10, 2)
+    assert list(files[0].added_line_numbers()) == [2, 10, 11]
+    assert [line.content for line in files[0].iter_lines(added_only=True)] == ["c", "new", "--- not a header"]
+    assert all(line.kind == ADDED for line in files[0].iter_lines(added_only=True))
+
+
+def test_headerless_github_patch():
+    diff = parse_file_patch("@@ -0,0 +1,2 @@\n+import os\n+x = 1", "pkg/a.py")
+    assert diff.path == "pkg/a.py"
+    assert [(line.new_line, line.content) for line in diff.iter_lines()] == [(1, "import os"), (2, "x = 1")]
+    assert to_legacy([diff])[0] == {"path": "pkg/a.py", "line": 1, "content": "import os",
+                                    "is_added": True, "is_removed": False}
+
+
+def test_empty_and_missing_patches():
+    assert parse_patch("") == []
+    assert len(parse_file_patch(None, "bin.png")) == 0
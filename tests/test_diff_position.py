@@ -0,0 +1,66 @@
+from codemate.diff.parser import parse_file_patch
+from codemate.diff.position import PositionIndex
+from codemate.reporter.github_reporter import GitHubReporter
+
+PATCH = """@@ -1,4 +1,5 @@
+ import os
+-import sys
++import re
++import json
+
+ x = 1
+@@ -20,3 +21,3 @@ def f():
+     a = 1
+-    b = 2
++    b = 3
+     return a"""
+
+
+def _index():
+    return PositionIndex.from_file_diff(parse_file_patch(PATCH, "m.py"))
+
+
+def test_positions_count_lines_below_first_hunk_header():
+    index = _index()
+    # Position 1 is " import os"; removed line at 2 shifts the rest
+    assert [index.position(n) for n in (1, 2, 3, 4, 5)] == [1, 3, 4, 5, 6]
+    # Second @@ header occupies position 7
+    assert [index.position(n) for n in (21, 22, 23)] == [8, 10, 11]
+
+
+def test_lines_outside_diff_are_not_commentable():
+    index = _index()
+    assert index.position(6) is None
+    assert index.position(20) is None
+    assert index.position(24) is None
+    assert index.position(None) is None
+    assert index.intervals() == [(1, 5), (21, 23)]
+    assert index.is_added(3) and not index.is_added(1)
+
+
+class RecordingProvider:
+    def __init__(self):
+        self.comments = None
+
+    def post_review_comments(self, repo, pr_id, comments, commit_sha=None):
+        self.comments = comments
+
+    def list_review_comments(self, repo, pr_id):
+        return []
+
+
+def _issue(path, line):
+    return {"path": path, "line": line, "severity": "warning", "rule": "R", "message": "m", "suggestion": ""}
+
+
+def test_reporter_places_or_drops_issues():
+    provider = RecordingProvider()
+    changed_files = [{"filename": "m.py", "patch": PATCH},
+                     {"filename": "n.py", "patch": PATCH, "diff_base": "compare"}]
+    issues = [_issue("m.py", 3), _issue("m.py", 50), _issue("other.py", 1),
+              _issue("n.py", 3), _issue("n.py", 1)]
+    GitHubReporter(provider).post_inline_comments("o/r", 1, issues, changed_files)
+    assert provider.comments == [
+        {"path": "m.py", "position": 4, "body": "[R] m"},
+        {"path": "n.py", "line": 3, "side": "RIGHT", "body": "[R] m"},
+    ]
@@ -0,0 +1,45 @@
+from codemate.diff.parser import parse_file_patch
+from codemate.diff.scope import ChangedLines, changed_line_map, filter_issues
+
+PATCH = """@@ -10,4 +10,5 @@
+ a
+-b
++c
++d
+ e
+ f
+@@ -40,2 +41,2 @@
+-x
++y
+ z"""
+
+
+def _issue(path, line):
+    return {"path": path, "line": line, "severity": "warning", "rule": "R", "message": "m", "suggestion": ""}
+
+
+def test_changed_lines_are_merged_intervals():
+    diff = parse_file_patch(PATCH, "m.py")
+    assert ChangedLines.from_file_diff(diff).ranges() == [(11, 12), (41, 41)]
+    assert ChangedLines.from_file_diff(diff, context=2).ranges() == [(9, 14), (39, 43)]
+    assert 12 in ChangedLines.from_file_diff(diff)
+    assert 13 not in ChangedLines.from_file_diff(diff)
+
+
+def test_filter_keeps_only_issues_on_changed_lines():
+    changed_files = [
+        {"filename": "m.py", "patch": PATCH},
+        {"filename": "big.py", "patch": ""},  # patch omitted by GitHub: scope unknown
+    ]
+    issues = [_issue("m.py", 11), _issue("m.py", 1), _issue("m.py", 41),
+              _issue("big.py", 500), _issue("vendored.py", 1)]
+    kept = filter_issues(issues, changed_line_map(changed_files))
+    assert [(i["path"], i["line"]) for i in kept] == [("m.py", 11), ("m.py", 41), ("big.py", 500)]
+
+    widened = filter_issues([_issue("m.py", 13)], changed_line_map(changed_files, context=1))
+    assert len(widened) == 1
+
+
+def test_pure_deletion_has_empty_scope():
+    scopes = changed_line_map([{"filename": "m.py", "patch": "@@ -1,2 +1 @@\n-a\n b"}])
+    assert scopes["m.py"] is not None and not scopes["m.py"]
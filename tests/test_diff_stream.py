@@ -0,0 +1,115 @@
+import httpx
+
+from codemate.diff.parser import parse_file_patch
+from codemate.diff.stream import DiffSplitter, iter_file_patches
+from codemate.providers.github import GitHubProvider
+from codemate.providers.github_async import AsyncGitHubProvider
+
+RAW_DIFF = (
+    "diff --git a/app.py b/app.py\n"
+    "index 1111111..2222222 100644\n"
+    "--- a/app.py\n"
+    "+++ b/app.py\n"
+    "@@ -1,2 +1,3 @@\n"
+    " import os\n"
+    "+import sys\n"
+    " print(os.name)\n"
+    "diff --git a/package-lock.json b/package-lock.json\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ b/package-lock.json\n"
+    "@@ -0,0 +1,2 @@\n"
+    "+{\n"
+    "+}\n"
+    "diff --git a/logo.png b/logo.png\n"
+    "Binary files a/logo.png and b/logo.png differ\n"
+    "diff --git a/old.py b/new.py\n"
+    "similarity index 90%\n"
+    "rename from old.py\n"
+    "rename to new.py\n"
+    "--- a/old.py\n"
+    "+++ b/new.py\n"
+    "@@ -1 +1 @@\n"
+    "-a = 1\n"
+    "+a = 2\n"
+).encode()
+
+
+def _chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_split_is_independent_of_chunk_boundaries():
+    whole = list(iter_file_patches([RAW_DIFF]))
+    for size in (1, 7, 64):
+        assert list(iter_file_patches(_chunks(RAW_DIFF, size))) == whole
+
+    by_name = {f["filename"]: f for f in whole}
+    assert list(by_name) == ["app.py", "package-lock.json", "logo.png", "new.py"]
+    assert by_name["package-lock.json"]["status"] == "added"
+    assert by_name["new.py"]["status"] == "renamed"
+    assert by_name["logo.png"]["skipped"] == "binary"
+    assert by_name["app.py"]["patch"].startswith("@@ -1,2 +1,3 @@\n")
+    assert list(parse_file_patch(by_name["app.py"]["patch"], "app.py").added_line_numbers()) == [2]
+
+
+def test_skip_rules_and_memory_ceilings():
+    skipped = {f["filename"]: f["skipped"] for f in iter_file_patches(
+        _chunks(RAW_DIFF, 5), DiffSplitter(skip=lambda path: "generated" if path.endswith(".json") else None))}
+    assert skipped == {"app.py": None, "package-lock.json": "generated", "logo.png": "binary", "new.py": None}
+
+    files = list(iter_file_patches([RAW_DIFF], DiffSplitter(max_file_bytes=20)))
+    assert all(f["patch"] == "" for f in files)
+    assert files[0]["skipped"] == "too large"
+
+    splitter = DiffSplitter(max_total_bytes=85)
+    files = list(iter_file_patches([RAW_DIFF], splitter))
+    assert files[0]["patch"] and files[1]["skipped"] is None
+    assert files[3]["skipped"] == "memory ceiling"
+    assert splitter.total_bytes <= 85
+
+
+def test_over_long_line_is_not_buffered():
+    huge = b"diff --git a/min.js b/min.js\n--- a/min.js\n+++ b/min.js\n@@ -0,0 +1 @@\n+" + b"x" * 10000 + b"\n"
+    splitter = DiffSplitter(max_file_bytes=100)
+    files = []
+    for chunk in _chunks(huge + RAW_DIFF, 256):
+        files.extend(splitter.feed(chunk))
+        assert len(splitter._pending) <= 100 + 256
+    files.extend(splitter.close())
+    assert files[0]["filename"] == "min.js" and files[0]["skipped"] == "too large"
+    assert [f["filename"] for f in files[1:]] == ["app.py", "package-lock.json", "logo.png", "new.py"]
+
+
+def test_sync_provider_streams_missing_patches(monkeypatch):
+    provider = GitHubProvider("t")
+    monkeypatch.setattr(provider, "fetch_pr", lambda repo, pr_id: {"files": [
+        {"filename": "app.py", "status": "modified", "changes": 1},
+        {"filename": "new.py", "status": "renamed", "changes": 2, "patch": "@@ -1 +1 @@\n-a\n+b\n"},
+    ]})
+    monkeypatch.setattr(provider, "stream_diff", lambda repo, pr_id: iter(_chunks(RAW_DIFF, 16)))
+
+    files = {f["filename"]: f for f in provider.list_changed_files("o/r", 1)}
+    assert files["app.py"]["patch"].startswith("@@ -1,2 +1,3 @@")
+    # Listed patches are kept; files beyond the listing are added
+    assert files["new.py"]["patch"] == "@@ -1 +1 @@\n-a\n+b\n"
+    assert files["package-lock.json"]["skipped"] == "generated"
+    assert files["package-lock.json"]["patch"] == ""
+    assert files["logo.png"]["skipped"] == "binary"
+
+
+def test_async_provider_streams_missing_patches():
+    def handler(request: httpx.Request):
+        if request.url.path.endswith("/files"):
+            return httpx.Response(200, json=[{"filename": "app.py", "status": "modified", "changes": 1}])
+        if request.headers.get("Accept") == "application/vnd.github.v3.diff":
+            return httpx.Response(200, content=RAW_DIFF)
+        return httpx.Response(200, json={"number": 1, "head": {"sha": "abc"}})
+
+    provider = AsyncGitHubProvider("t", transport=httpx.MockTransport(handler))
+    try:
+        files = {f["filename"]: f for f in provider.list_changed_files("o/r", 1)}
+    finally:
+        provider.close()
+    assert files["app.py"]["patch"].startswith("@@ -1,2 +1,3 @@")
+    assert files["new.py"]["status"] == "renamed"
@@ -0,0 +1,119 @@
+import httpx
+import pytest
+
+from codemate.providers.github_async import AsyncGitHubProvider
+
+
+def _files_page(page, count):
+    return [{"filename": f"f{page}_{i}.py", "status": "modified", "sha": "x", "patch": "@@"} for i in range(count)]
+
+
+class FakeGitHub:
+    """Minimal stand-in for the PR endpoints, recording requests."""
+
+    def __init__(self, pages=3, last_page_size=7):
+        self.pages = pages
+        self.last_page_size = last_page_size
+        self.requests = []
+        self.throttle_next = 0
+
+    def __call__(self, request: httpx.Request):
+        self.requests.append((request.method, request.url.path, request.url.params.get("page")))
+        if self.throttle_next:
+            self.throttle_next -= 1
+            return httpx.Response(403, headers={"Retry-After": "0"}, json={"message": "secondary rate limit"})
+
+        headers = {"X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": "0"}
+        if request.url.path.endswith("/files"):
+            page = int(request.url.params["page"])
+            if page == 1 and self.pages > 1:
+                headers["Link"] = (f'<https://api.github.com/x/files?page=2&per_page=100>; rel="next", '
+                                   f'<https://api.github.com/x/files?page={self.pages}&per_page=100>; rel="last"')
+            size = self.last_page_size if page == self.pages else 100
+            return httpx.Response(200, headers=headers, json=_files_page(page, size))
+
+        etag = '"pr-v1"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers=headers)
+        headers["ETag"] = etag
+        return httpx.Response(200, headers=headers, json={"number": 1, "head": {"sha": "abc"}})
+
+
+def test_pages_fetched_without_trailing_empty_request():
+    fake = FakeGitHub(pages=3)
+    provider = AsyncGitHubProvider("t", transport=httpx.MockTransport(fake))
+    try:
+        files = provider.list_changed_files("o/r", 1)
+    finally:
+        provider.close()
+    assert len(files) == 207
+    assert files[0] == {"filename": "f1_0.py", "status": "modified", "sha": "x", "patch": "@@"}
+    pages = sorted(int(p) for m, path, p in fake.requests if path.endswith("/files"))
+    assert pages == [1, 2, 3]
+    assert provider.rate_limit_remaining == 4999
+
+
+def test_conditional_get_served_from_etag_cache():
+    fake = FakeGitHub(pages=1)
+    provider = AsyncGitHubProvider("t", transport=httpx.MockTransport(fake))
+    try:
+        assert provider.get_head_sha("o/r", 1) == "abc"
+        assert provider.get_head_sha("o/r", 1) == "abc"
+    finally:
+        provider.close()
+    assert provider.not_modified_count == 1
+
+
+def test_not_modified_is_served_from_the_etag_that_was_sent():
+    fake = FakeGitHub(pages=1)
+
+    def evicting(request):
+        # Other requests evict the entry while this one is in flight
+        if request.headers.get("If-None-Match"):
+            provider._etags.clear()
+        return fake(request)
+
+    provider = AsyncGitHubProvider("t", transport=httpx.MockTransport(evicting))
+    try:
+        assert provider.get_head_sha("o/r", 1) == "abc"
+        assert provider.get_head_sha("o/r", 1) == "abc"
+    finally:
+        provider.close()
+    assert provider.not_modified_count == 1
+    assert len(provider._etags) == 1
+
+
+def test_secondary_rate_limit_is_retried():
+    fake = FakeGitHub(pages=1)
+    fake.throttle_next = 2
+    provider = AsyncGitHubProvider("t", transport=httpx.MockTransport(fake))
+    try:
+        assert provider.get_head_sha("o/r", 1) == "abc"
+    finally:
+        provider.close()
+    assert len(fake.requests) == 3
+
+
+def test_server_errors_retry_gets_but_never_posts(monkeypatch):
+    monkeypatch.setattr("codemate.providers.github_async.random.uniform", lambda a, b: 0.0)
+    monkeypatch.setattr("codemate.providers.github_async.asyncio.sleep", _no_sleep)
+    calls = []
+
+    def bad_gateway(request):
+        calls.append(request.method)
+        if len(calls) == 1 or request.method == "POST":
+            return httpx.Response(502, json={"message": "Bad Gateway"})
+        return httpx.Response(200, json={"number": 1, "head": {"sha": "abc"}})
+
+    provider = AsyncGitHubProvider("t", transport=httpx.MockTransport(bad_gateway))
+    try:
+        assert provider.get_head_sha("o/r", 1) == "abc"
+        with pytest.raises(httpx.HTTPStatusError):
+            provider._run(provider.request("POST", "/repos/o/r/pulls/1/reviews", json={"event": "COMMENT"}))
+    finally:
+        provider.close()
+    assert calls == ["GET", "GET", "POST"]
+
+
+async def _no_sleep(delay):
+    pass
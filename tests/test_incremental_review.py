@@ -0,0 +1,223 @@
+import json
+
+import pytest
+
+from codemate import pipeline
+from codemate.analyzers.base import AnalyzerBase
+from codemate.state import ReviewedHeads
+from codemate.store import ReviewStore
+
+
+@pytest.fixture(autouse=True)
+def no_workspace(monkeypatch):
+    monkeypatch.setattr(pipeline.settings, "workspace_enabled", False)
+    store = ReviewStore()
+    monkeypatch.setattr(pipeline, "get_review_store", lambda: store)
+
+
+class FakeProvider:
+    def __init__(self):
+        self.head = "c1"
+        self.compare_status = "ahead"
+        self.calls = []
+
+    def get_head_sha(self, repo, pr_id):
+        self.calls.append("head")
+        return self.head
+
+    def list_changed_files(self, repo, pr_id):
+        self.calls.append("files")
+        return [{"filename": "a.py", "status": "modified", "patch": ""},
+                {"filename": "b.py", "status": "added", "patch": ""}]
+
+    def compare_files(self, repo, base, head):
+        self.calls.append(f"compare {base}...{head}")
+        return self.compare_status, [{"filename": "b.py", "status": "modified", "patch": ""}]
+
+
+class FakeReporter:
+    def __init__(self):
+        self.summaries = []
+
+    def post_inline_comments(self, repo, pr_id, issues, changed_files=None, head_sha=None):
+        pass
+
+    def post_summary(self, repo, pr_id, issues, heading=None):
+        self.summaries.append(heading)
+
+
+class RecordingAnalyzer(AnalyzerBase):
+    def __init__(self):
+        self.seen = []
+
+    def analyze(self, repo_path, changed_files):
+        self.seen.append(sorted(f["filename"] for f in changed_files))
+        return []
+
+
+def _review(provider, reporter, analyzer, **kwargs):
+    return pipeline.review_pull_request(provider, reporter, "o/r", 5, analyzers=[analyzer], **kwargs)
+
+
+def test_second_push_reviews_only_new_changes(monkeypatch):
+    monkeypatch.setattr(pipeline, "get_reviewed_heads", lambda: heads)
+    heads = ReviewedHeads()
+    provider, reporter, analyzer = FakeProvider(), FakeReporter(), RecordingAnalyzer()
+
+    _review(provider, reporter, analyzer, head_sha="c1")
+    assert heads.get("o/r", 5) == "c1"
+
+    result = _review(provider, reporter, analyzer, head_sha="c2")
+    assert analyzer.seen == [["a.py", "b.py"], ["b.py"]]
+    assert provider.calls == ["files", "compare c1...c2"]
+    assert reporter.summaries == [None, "Changes since c1"]
+    assert result["since"] == "c1"
+    assert heads.get("o/r", 5) == "c2"
+
+    # Redelivery of an already reviewed head does nothing
+    assert _review(provider, reporter, analyzer, head_sha="c2")["skipped"]
+    assert len(analyzer.seen) == 2
+
+
+def test_force_push_falls_back_to_full_review(monkeypatch):
+    heads = ReviewedHeads()
+    heads.set("o/r", 5, "old")
+    monkeypatch.setattr(pipeline, "get_reviewed_heads", lambda: heads)
+    provider, reporter, analyzer = FakeProvider(), FakeReporter(), RecordingAnalyzer()
+    provider.compare_status = "diverged"
+
+    result = _review(provider, reporter, analyzer, head_sha="new")
+    assert analyzer.seen == [["a.py", "b.py"]]
+    assert result["since"] is None
+    assert reporter.summaries == [None]
+
+
+def test_explicit_since_without_state(monkeypatch):
+    monkeypatch.setattr(pipeline.settings, "incremental_reviews", False)
+    provider, reporter, analyzer = FakeProvider(), FakeReporter(), RecordingAnalyzer()
+
+    _review(provider, reporter, analyzer, since="c0")
+    assert provider.calls == ["head", "compare c0...c1"]
+    assert analyzer.seen == [["b.py"]]
+
+
+def test_dry_run_posts_and_records_nothing(monkeypatch):
+    heads = ReviewedHeads()
+    monkeypatch.setattr(pipeline, "get_reviewed_heads", lambda: heads)
+    provider, reporter, analyzer = FakeProvider(), FakeReporter(), RecordingAnalyzer()
+
+    result = _review(provider, reporter, analyzer, head_sha="c1", dry_run=True)
+    assert analyzer.seen == [["a.py", "b.py"]]
+    assert result["files_count"] == 2 and result["score"] is not None
+    assert reporter.summaries == []
+    assert heads.get("o/r", 5) is None
+    store = pipeline.get_review_store()
+    store.flush()
+    assert store.list_reviews()[0] == []
+
+
+class FlagEveryAddedLine(AnalyzerBase):
+    def analyze(self, repo_path, changed_files):
+        return [{"path": f["filename"], "line": 1, "severity": "info", "rule": "R", "message": "m",
+                 "suggestion": ""} for f in changed_files]
+
+
+def test_successive_delta_reviews_on_one_provider_post_on_each_head(monkeypatch):
+    import httpx
+    from codemate.providers.github_async import AsyncGitHubProvider
+    from codemate.reporter.github_reporter import DELTA_SUMMARY_MARKER, SUMMARY_MARKER, GitHubReporter
+
+    monkeypatch.setattr(pipeline, "get_reviewed_heads", lambda: heads)
+    heads = ReviewedHeads()
+    patch = "@@ -0,0 +1 @@\n+x = 1"
+    reviews, comments = [], {}
+
+    def github(request):
+        path, method = request.url.path, request.method
+        if path == "/repos/o/r/pulls/5":
+            return httpx.Response(200, json={"number": 5, "head": {"sha": "c1"}})
+        if path == "/repos/o/r/pulls/5/files":
+            return httpx.Response(200, json=[{"filename": "a.py", "status": "added", "patch": patch}])
+        if path.startswith("/repos/o/r/compare/"):
+            name = path.rsplit("...", 1)[1] + ".py"
+            return httpx.Response(200, json={"status": "ahead",
+                                             "files": [{"filename": name, "status": "added", "patch": patch}]})
+        if path == "/repos/o/r/pulls/5/reviews":
+            reviews.append(json.loads(request.content)["commit_id"])
+            return httpx.Response(200, json={"id": len(reviews)})
+        if path == "/repos/o/r/issues/5/comments" and method == "POST":
+            comments[len(comments) + 1] = json.loads(request.content)["body"]
+            return httpx.Response(201, json={"id": len(comments), "body": comments[len(comments)]})
+        if path.startswith("/repos/o/r/issues/comments/"):
+            comment_id = int(path.rsplit("/", 1)[1])
+            comments[comment_id] = json.loads(request.content)["body"]
+            return httpx.Response(200, json={"id": comment_id, "body": comments[comment_id]})
+        if path == "/repos/o/r/issues/5/comments":
+            return httpx.Response(200, json=[{"id": i, "body": b, "user": {"login": "codemate"}}
+                                             for i, b in comments.items()])
+        if path == "/user":
+            return httpx.Response(200, json={"login": "codemate"})
+        return httpx.Response(200, json=[])
+
+    provider = AsyncGitHubProvider("t", transport=httpx.MockTransport(github))
+    reporter = GitHubReporter(provider)
+    try:
+        for head in ("c1", "c2", "c3"):
+            pipeline.review_pull_request(provider, reporter, "o/r", 5, head_sha=head,
+                                         analyzers=[FlagEveryAddedLine()])
+    finally:
+        provider.close()
+
+    assert reviews == ["c1", "c2", "c3"]
+    # The full-PR summary stays; the delta summary is a separate comment, edited per push
+    assert len(comments) == 2
+    assert comments[1].startswith(SUMMARY_MARKER) and "a.py" in comments[1]
+    assert comments[2].startswith(DELTA_SUMMARY_MARKER) and "Changes since c2" in comments[2]
+
+
+class BrokenAnalyzer(AnalyzerBase):
+    def analyze(self, repo_path, changed_files):
+        raise RuntimeError("tool crashed")
+
+
+def test_partial_run_does_not_advance_the_reviewed_head(monkeypatch):
+    heads = ReviewedHeads()
+    heads.set("o/r", 5, "c1")
+    monkeypatch.setattr(pipeline, "get_reviewed_heads", lambda: heads)
+    provider, reporter = FakeProvider(), FakeReporter()
+
+    result = pipeline.review_pull_request(provider, reporter, "o/r", 5, head_sha="c2",
+                                          analyzers=[RecordingAnalyzer(), BrokenAnalyzer()])
+    assert result["analyzers"]["failed"] == {"BrokenAnalyzer": "tool crashed"}
+    assert heads.get("o/r", 5) == "c1"
+
+    # The next push is still reviewed from c1, covering the files left unanalyzed
+    analyzer = RecordingAnalyzer()
+    _review(provider, reporter, analyzer, head_sha="c3")
+    assert provider.calls[-1] == "compare c1...c3"
+    assert heads.get("o/r", 5) == "c3"
+
+
+class DiffOnlyAnalyzer(RecordingAnalyzer):
+    reads_files = False
+
+
+def test_workspace_failure_skips_content_analyzers(monkeypatch):
+    from codemate.workspace import WorkspaceError
+
+    def unavailable(*args):
+        raise WorkspaceError("mirror fetch failed")
+
+    monkeypatch.setattr(pipeline.settings, "workspace_enabled", True)
+    monkeypatch.setattr(pipeline.settings, "incremental_reviews", False)
+    monkeypatch.setattr(pipeline, "materialized_workspace", unavailable)
+    monkeypatch.setattr(pipeline, "get_mirror_cache", lambda: None)
+    provider, reporter = FakeProvider(), FakeReporter()
+    provider.clone_url = lambda repo: "https://example.invalid/o/r.git"
+    content, diff_only = RecordingAnalyzer(), DiffOnlyAnalyzer()
+
+    result = pipeline.review_pull_request(provider, reporter, "o/r", 5, head_sha="c1",
+                                          analyzers=[content, diff_only])
+    assert content.seen == [] and diff_only.seen == [["a.py", "b.py"]]
+    assert result["analyzers"]["failed"] == {"RecordingAnalyzer": "workspace for c1 unavailable: mirror fetch failed"}
+    assert result["analyzers"]["completed"] == ["DiffOnlyAnalyzer"]
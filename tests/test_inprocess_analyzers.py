@@ -0,0 +1,93 @@
+import shutil
+import pytest
+
+from codemate.analyzers import inprocess
+from codemate.analyzers.inprocess import InProcessLintAnalyzer, InProcessSecurityAnalyzer
+from codemate.analyzers.lint_analyzer import LintAnalyzer
+from codemate.analyzers.security_analyzer import SecurityAnalyzer
+from codemate.analyzers.source_cache import SourceCache
+
+SOURCE = '''import os
+import subprocess
+
+
+def run(cmd,shell=True):
+    x = 1  # noqa: F841
+    y = 2
+    assert cmd
+    return subprocess.call(cmd, shell=True)  # nosec B602
+'''
+
+
+def _tree(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text(SOURCE)
+    (tmp_path / "b.py").write_text(SOURCE)  # same content, parsed once
+    (tmp_path / "broken.py").write_text("def f(:\n")
+    return [
+        {"filename": "pkg/a.py", "status": "modified", "patch": "@@ -0,0 +1 @@\n+x"},
+        {"filename": "b.py", "status": "added", "patch": "@@ -0,0 +1 @@\n+x"},
+        {"filename": "broken.py", "status": "added", "patch": "@@ -0,0 +1 @@\n+x"},
+        {"filename": "gone.py", "status": "removed", "patch": None},
+    ]
+
+
+def _keys(issues):
+    return sorted((i["path"], i["line"], i["rule"], i["message"]) for i in issues)
+
+
+def test_lint_matches_flake8_codes_and_noqa(tmp_path):
+    issues = InProcessLintAnalyzer(SourceCache()).analyze(str(tmp_path), _tree(tmp_path))
+    by_file = {}
+    for i in issues:
+        by_file.setdefault(i["path"], []).append((i["line"], i["rule"]))
+    assert by_file["pkg/a.py"] == [(1, "F401"), (5, "E231"), (7, "F841")]
+    assert by_file["broken.py"] == [(1, "E999")]
+    assert set(issues[0]) == {"path", "line", "severity", "rule", "message", "suggestion"}
+
+
+def test_lint_reads_flake8_config(tmp_path):
+    changed_files = _tree(tmp_path)
+    (tmp_path / "setup.cfg").write_text("[flake8]\nextend-ignore = E2,F8\n")
+    issues = InProcessLintAnalyzer(SourceCache()).analyze(str(tmp_path), changed_files)
+    assert {i["rule"] for i in issues} == {"F401", "E999"}
+
+
+def test_security_honours_nosec(tmp_path):
+    issues = InProcessSecurityAnalyzer(SourceCache()).analyze(str(tmp_path), _tree(tmp_path))
+    assert {(i["path"], i["line"], i["rule"]) for i in issues} >= {("pkg/a.py", 2, "blacklist"), ("b.py", 8, "assert_used")}
+    assert not [i for i in issues if i["line"] == 9]
+
+
+def test_analyzers_share_one_parse_per_content(tmp_path):
+    sources = SourceCache()
+    changed_files = _tree(tmp_path)
+    InProcessLintAnalyzer(sources).analyze(str(tmp_path), changed_files)
+    InProcessSecurityAnalyzer(sources).analyze(str(tmp_path), changed_files)
+    # Six lookups, two distinct contents (a.py and b.py are identical)
+    assert sources.stats() == {"hits": 4, "misses": 2, "items": 2}
+
+
+@pytest.mark.skipif(shutil.which("flake8") is None or shutil.which("bandit") is None,
+                    reason="flake8/bandit not installed")
+def test_same_results_as_subprocess_analyzers(tmp_path):
+    changed_files = _tree(tmp_path)[:2]
+    for subprocess_analyzer, inprocess_analyzer in [
+        (LintAnalyzer(), InProcessLintAnalyzer(SourceCache())),
+        (SecurityAnalyzer(), InProcessSecurityAnalyzer(SourceCache())),
+    ]:
+        expected = subprocess_analyzer.analyze(str(tmp_path), changed_files)
+        assert _keys(inprocess_analyzer.analyze(str(tmp_path), changed_files)) == _keys(expected)
+
+
+@pytest.mark.skipif(shutil.which("bandit") is None, reason="bandit not installed")
+def test_incompatible_bandit_falls_back_to_the_command(tmp_path, monkeypatch):
+    from bandit.core import manager
+    monkeypatch.delattr(manager, "_parse_nosec_comment")
+    monkeypatch.setattr(inprocess, "_supported", {})
+    changed_files = _tree(tmp_path)[:2]
+    analyzer = InProcessSecurityAnalyzer(SourceCache())
+    assert _keys(analyzer.analyze(str(tmp_path), changed_files)) == \
+        _keys(SecurityAnalyzer().analyze(str(tmp_path), changed_files))
+    assert analyzer.version() == SecurityAnalyzer().version()
+    assert inprocess.lint_supported()
@@ -0,0 +1,140 @@
+import sys
+import threading
+import time
+import pytest
+
+from codemate.utils.cancel import check_cancelled
+from codemate.utils.process import run_command
+from codemate.store import ReviewStore
+from codemate.webhook.jobs import JobQueue, QueueFull
+
+
+def test_jobs_run_in_background_workers():
+    q = JobQueue(workers=2, max_backlog=10)
+    q.start()
+    try:
+        job = q.submit(lambda a, b: a + b, 2, 3)
+        q._queue.join()
+        assert q.get(job.id).status == "done"
+        assert q.get(job.id).result == 5
+    finally:
+        q.stop(timeout=1)
+
+
+def test_failed_job_records_error():
+    def boom():
+        raise RuntimeError("broken")
+
+    q = JobQueue(workers=1, max_backlog=10)
+    q.start()
+    try:
+        job = q.submit(boom)
+        q._queue.join()
+        assert job.status == "failed"
+        assert job.error == "broken"
+    finally:
+        q.stop(timeout=1)
+
+
+def test_backlog_is_bounded():
+    q = JobQueue(workers=1, max_backlog=2)
+    # Workers not started: the backlog fills up
+    q.submit(lambda: None)
+    q.submit(lambda: None)
+    with pytest.raises(QueueFull):
+        q.submit(lambda: None)
+
+
+def test_scheduled_jobs_count_against_the_backlog():
+    q = JobQueue(workers=1, max_backlog=2, debounce=30)
+    try:
+        first = q.submit_latest(("o/r", 1), "a", lambda: None)
+        q.submit_latest(("o/r", 2), "a", lambda: None)
+        with pytest.raises(QueueFull):
+            q.submit_latest(("o/r", 3), "a", lambda: None)
+        with pytest.raises(QueueFull):
+            q.submit(lambda: None)
+        # A newer revision takes the place of the one it replaces
+        assert q.submit_latest(("o/r", 1), "b", lambda: None).status == "scheduled"
+        assert first.status == "superseded"
+        # Cancelling frees a place
+        assert q.cancel(first.id) is False
+        assert q.cancel(q.submit_latest(("o/r", 2), "a", lambda: None).id) is True
+        assert q.submit_latest(("o/r", 3), "a", lambda: None).status == "scheduled"
+    finally:
+        q.stop(timeout=1)
+
+
+def test_webhook_returns_202_and_job_status(monkeypatch):
+    from fastapi.testclient import TestClient
+    from codemate.webhook import server
+
+    started = threading.Event()
+
+    def fake_review(provider, reporter, repo, pr_id, **kwargs):
+        started.set()
+        return {"repo": repo, "pr": pr_id, "issues_count": 0}
+
+    monkeypatch.setattr(server, "review_pull_request", fake_review)
+    store = ReviewStore()
+    monkeypatch.setattr(server, "get_review_store", lambda: store)
+    monkeypatch.setattr(server.settings, "webhook_secret", None)
+    monkeypatch.setattr(server.review_queue, "debounce", 0.0)
+
+    with TestClient(server.app) as client:
+        resp = client.post(
+            "/webhook",
+            json={"action": "opened", "repository": {"full_name": "o/r"}, "pull_request": {"number": 7}},
+            headers={"X-Hub-Signature-256": "sha256=x", "X-GitHub-Event": "pull_request"},
+        )
+        assert resp.status_code == 202
+        job_id = resp.json()["job_id"]
+        assert started.wait(5)
+        server.review_queue._queue.join()
+
+        status = client.get(f"/jobs/{job_id}").json()
+        assert status["status"] == "done"
+        assert status["result"]["pr"] == 7
+        assert client.get("/jobs/missing").status_code == 404
+
+
+def test_debounce_coalesces_bursts_to_latest_revision():
+    ran = []
+    q = JobQueue(workers=1, max_backlog=10, debounce=0.2)
+    q.start()
+    try:
+        jobs = [q.submit_latest(("o/r", 1), sha, ran.append, sha) for sha in ("a", "b", "c")]
+        # Redelivery of the pending revision is deduplicated
+        assert q.submit_latest(("o/r", 1), "c", ran.append, "c") is jobs[-1]
+        time.sleep(0.5)
+        q._queue.join()
+        assert ran == ["c"]
+        assert [j.status for j in jobs] == ["superseded", "superseded", "done"]
+        assert jobs[0].superseded_by == jobs[1].id
+    finally:
+        q.stop(timeout=1)
+
+
+def test_newer_revision_kills_running_subprocess():
+    started = threading.Event()
+
+    def slow_review():
+        started.set()
+        run_command([sys.executable, "-c", "import time; time.sleep(30)"])
+        check_cancelled()
+        return "posted"
+
+    q = JobQueue(workers=2, max_backlog=10)
+    q.start()
+    try:
+        old = q.submit_latest(("o/r", 1), "old", slow_review)
+        assert started.wait(5)
+        t0 = time.monotonic()
+        new = q.submit_latest(("o/r", 1), "new", lambda: "posted")
+        q._queue.join()
+        assert time.monotonic() - t0 < 5
+        assert old.status == "superseded"
+        assert old.result is None
+        assert new.status == "done"
+    finally:
+        q.stop(timeout=1)
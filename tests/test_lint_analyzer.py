@@ -0,0 +1,47 @@
+import shutil
+import pytest
+
+from codemate.analyzers.lint_analyzer import LintAnalyzer
+
+pytestmark = pytest.mark.skipif(shutil.which("flake8") is None, reason="flake8 not installed")
+
+
+def _tree(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text("import os\n")
+    (tmp_path / "b.py").write_text("x=1\n")
+    (tmp_path / "c.py").write_text("y = 2\n")
+    (tmp_path / "notes.txt").write_text("import os\n")
+    return [
+        {"filename": "pkg/a.py", "status": "modified", "patch": ""},
+        {"filename": "b.py", "status": "added", "patch": ""},
+        {"filename": "c.py", "status": "modified", "patch": ""},
+        {"filename": "notes.txt", "status": "modified", "patch": ""},
+        {"filename": "gone.py", "status": "removed", "patch": None},
+    ]
+
+
+def test_skips_deleted_and_non_python_files(tmp_path):
+    analyzer = LintAnalyzer()
+    assert analyzer.targets(str(tmp_path), _tree(tmp_path)) == ["pkg/a.py", "b.py", "c.py"]
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_batched_results_are_demultiplexed_per_file(tmp_path, jobs):
+    changed_files = _tree(tmp_path)
+    issues = LintAnalyzer(jobs=jobs, min_chunk_files=1).analyze(str(tmp_path), changed_files)
+    assert [(i["path"], i["line"], i["rule"]) for i in issues] == [
+        ("pkg/a.py", 1, "F401"),
+        ("b.py", 1, "E225"),
+    ]
+    assert set(issues[0]) == {"path", "line", "severity", "rule", "message", "suggestion"}
+
+
+def test_chunks_are_size_balanced(tmp_path):
+    names = []
+    for n, size in enumerate([900, 500, 400, 300, 200, 100]):
+        (tmp_path / f"m{n}.py").write_text("#" * size)
+        names.append(f"m{n}.py")
+    chunks = LintAnalyzer(jobs=2, min_chunk_files=1)._chunks(str(tmp_path), names)
+    totals = sorted(sum((tmp_path / n).stat().st_size for n in c) for c in chunks)
+    assert totals == [1200, 1200]
@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+from codemate.analyzers.ai_analyzer import AIAnalyzer
+from codemate.analyzers.runner import AnalyzerRunner
+from codemate.cache import TieredCache
+from codemate.llm.cache import unit_key
+from codemate.llm.client import LLMError, StubBackend
+
+
+def _patch(start: int, indent: str = "    ", seed: int = 0) -> str:
+    body = [f"+{indent}x_{n} = compute({n}, {seed})  # TODO" if n % 5 == 0 else f"+{indent}y_{n} = {n}"
+            for n in range(20)]
+    return f"@@ -{start},0 +{start},20 @@\n" + "\n".join(body) + "\n"
+
+
+def _files(start: int = 1, indent: str = "    ", count: int = 30):
+    return [{"filename": f"m{i}.py", "status": "modified", "patch": _patch(start, indent, i)} for i in range(count)]
+
+
+def test_key_ignores_line_numbers_and_whitespace_but_not_model():
+    analyzer = AIAnalyzer(StubBackend())
+    a = analyzer.units(_files(1)[:1], 6000)[0]
+    b = analyzer.units(_files(120, indent="\t")[:1], 6000)[0]
+    assert a.text != b.text
+    assert unit_key(a, "gpt-4") == unit_key(b, "gpt-4")
+    assert unit_key(a, "gpt-4") != unit_key(a, "gpt-4o")
+
+
+def test_rebased_pr_is_served_from_cache(tmp_path):
+    cache = TieredCache(path=str(tmp_path / "llm.sqlite3"))
+    first = StubBackend()
+    issues = AIAnalyzer(first, model="gpt-4", cache=cache).analyze(".", _files(1))
+    assert first.requests > 0 and len(issues) == 30 * 4
+
+    # Same hunks, 100 lines further down, in a new process
+    cache.close()
+    cache = TieredCache(path=str(tmp_path / "llm.sqlite3"))
+    second = StubBackend()
+    rebased = AIAnalyzer(second, model="gpt-4", cache=cache).analyze(".", _files(101))
+    assert second.requests == 0
+    assert sorted((i["path"], i["line"]) for i in rebased) == sorted((i["path"], i["line"] + 100) for i in issues)
+    assert cache.stats()["disk_hits"] == 30
+
+
+def test_ttl_expires_entries(monkeypatch, tmp_path):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = TieredCache(path=str(tmp_path / "c.sqlite3"), ttl=60)
+    cache.set("k", [1])
+    now[0] += 30
+    assert cache.get("k") == [1]
+    now[0] += 31
+    assert cache.get("k") is None
+    assert cache.stats()["expired"] == 1
+    assert cache.stats()["disk_items"] == 0
+
+
+def test_disk_tier_is_size_bounded(tmp_path):
+    cache = TieredCache(max_items=1000, path=str(tmp_path / "c.sqlite3"), max_disk_bytes=10_000)
+    for n in range(100):
+        cache.set(f"k{n}", "x" * 500)
+    stats = cache.stats()
+    assert stats["disk_bytes"] <= 10_000
+    assert stats["evictions"] > 0
+    # Oldest entries go first
+    cache.close()
+    reopened = TieredCache(path=str(tmp_path / "c.sqlite3"))
+    assert reopened.get("k0") is None
+    assert reopened.get("k99") == "x" * 500
+
+
+def test_unusable_answers_are_not_cached():
+    class TruncatingBackend(StubBackend):
+        async def complete(self, system, prompt, max_tokens):
+            answer = await super().complete(system, prompt, max_tokens)
+            return answer[:len(answer) // 2]
+
+    cache = TieredCache()
+    with pytest.raises(LLMError, match="unusable answer"):
+        AIAnalyzer(TruncatingBackend(), model="gpt-4", cache=cache).analyze(".", _files(1, count=3))
+    assert cache.stats()["memory_items"] == 0
+
+    retry = StubBackend()
+    assert AIAnalyzer(retry, model="gpt-4", cache=cache).analyze(".", _files(1, count=3))
+    assert retry.requests > 0
+
+
+def test_failed_batch_fails_the_analyzer_after_the_others_finish():
+    class FlakyBackend(StubBackend):
+        async def complete(self, system, prompt, max_tokens):
+            answer = await super().complete(system, prompt, max_tokens)
+            if self.requests == 1:
+                raise LLMError("503 from the model server")
+            return answer
+
+    cache = TieredCache()
+    analyzer = AIAnalyzer(FlakyBackend(), model="gpt-4", cache=cache, max_output_tokens=7000)
+    assert len(analyzer.batches(_files(1))) > 1
+    run = AnalyzerRunner([analyzer]).run(".", _files(1))
+    assert list(run.failed) == ["AIAnalyzer"]
+    assert "AI review batches failed: 503 from the model server" in run.failed["AIAnalyzer"]
+    # The batches that did complete are cached; the failed one is sent again next time
+    assert 0 < cache.stats()["memory_items"] < 30
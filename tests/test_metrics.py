@@ -0,0 +1,68 @@
+import sys
+
+from codemate.analyzers.base import AnalyzerBase
+from codemate.analyzers.runner import AnalyzerRunner
+from codemate.metrics import Registry, collect_timings, stage
+from codemate.utils.process import run_command
+
+
+def test_histogram_renders_prometheus_buckets():
+    registry = Registry()
+    h = registry.histogram("t_seconds", "Test", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        h.observe(value, "fetch")
+    registry.gauge_function("t_depth", "Depth", lambda: 7)
+    text = registry.render()
+    assert '# TYPE t_seconds histogram' in text
+    assert 't_seconds_bucket{stage="fetch",le="0.1"} 1' in text
+    assert 't_seconds_bucket{stage="fetch",le="1.0"} 3' in text
+    assert 't_seconds_bucket{stage="fetch",le="+Inf"} 4' in text
+    assert 't_seconds_count{stage="fetch"} 4' in text
+    assert "t_depth 7" in text
+
+
+class Sleepy(AnalyzerBase):
+    def analyze(self, repo_path, changed_files):
+        run_command([sys.executable, "-c", "pass"])
+        return []
+
+
+def test_stages_and_analyzers_are_timed():
+    with collect_timings() as timings:
+        with stage("parse_patch"):
+            pass
+        AnalyzerRunner([Sleepy()]).run(".", [])
+    kinds = [(kind, name) for kind, name, _ in timings.entries]
+    assert ("stage", "parse_patch") in kinds and ("analyzer", "Sleepy") in kinds
+    assert "parse_patch" in timings.table()
+
+
+def test_metrics_endpoint(monkeypatch):
+    from fastapi.testclient import TestClient
+    from codemate.webhook import server
+
+    with stage("fetch_files"):
+        pass
+    text = TestClient(server.app).get("/metrics").text
+    assert 'codemate_stage_seconds_count{stage="fetch_files"}' in text
+    assert "codemate_queue_depth 0" in text
+    assert 'codemate_cache_hit_rate{cache="analysis"}' in text
+
+
+def test_metrics_scrape_runs_no_queries(monkeypatch):
+    from fastapi.testclient import TestClient
+    from codemate.cache import TieredCache
+    from codemate.store import ReviewStore
+    from codemate.webhook import server
+
+    def fail(*args, **kwargs):
+        raise AssertionError("scanned on scrape")
+
+    monkeypatch.setattr(TieredCache, "stats", fail)
+    monkeypatch.setattr(ReviewStore, "stats", fail)
+    monkeypatch.setattr(server.settings, "ai_review", False)
+    monkeypatch.setattr(server, "get_llm_cache", fail)
+    text = TestClient(server.app).get("/metrics").text
+    assert "codemate_store_pending_writes" in text
+    assert 'codemate_cache_hit_rate{cache="source"}' in text
+    assert 'cache="llm"' not in text
@@ -0,0 +1,113 @@
+from codemate.config import settings
+from codemate.reporter.github_reporter import SUMMARY_MARKER, GitHubReporter, format_summary, review_batches
+
+
+def _patch(lines):
+    return f"@@ -0,0 +1,{lines} @@\n" + "".join(f"+line {n}\n" for n in range(1, lines + 1))
+
+
+def _issue(path, line, rule="R", severity="warning"):
+    return {"path": path, "line": line, "severity": severity, "rule": rule, "message": f"m{line}", "suggestion": ""}
+
+
+class FakeProvider:
+    def __init__(self, review_comments=(), issue_comments=()):
+        self.review_comments = list(review_comments)
+        self.issue_comments = list(issue_comments)
+        self.reviews = []
+        self.posted = []
+        self.updated = []
+        self.list_calls = 0
+
+    def list_review_comments(self, repo, pr_id):
+        self.list_calls += 1
+        return self.review_comments
+
+    def post_review_comments(self, repo, pr_id, comments, commit_sha=None):
+        self.reviews.append(comments)
+        return {"id": len(self.reviews)}
+
+    def list_issue_comments(self, repo, pr_id):
+        return self.issue_comments
+
+    def post_summary(self, repo, pr_id, body):
+        self.posted.append(body)
+        return {"id": 99, "body": body}
+
+    def update_comment(self, repo, comment_id, body):
+        self.updated.append((comment_id, body))
+        return {"id": comment_id, "body": body}
+
+    def authenticated_login(self):
+        return "codemate"
+
+
+BOT = {"login": "codemate", "type": "User"}
+
+
+def test_comments_are_batched_and_deduplicated(monkeypatch):
+    monkeypatch.setattr(settings, "review_comments_per_batch", 4)
+    provider = FakeProvider(review_comments=[
+        {"path": "a.py", "line": 2, "side": "RIGHT", "body": "[R] m2", "user": BOT},
+        {"path": "a.py", "line": 3, "side": "RIGHT", "body": "[R] other", "user": BOT},
+    ])
+    issues = [_issue("a.py", n) for n in range(1, 11)] + [_issue("a.py", 1)]
+    responses = GitHubReporter(provider).post_inline_comments("o/r", 1, issues, [{"filename": "a.py",
+                                                                                 "patch": _patch(10)}])
+    assert provider.list_calls == 1
+    assert [len(r) for r in provider.reviews] == [4, 4, 1]
+    assert len(responses) == 3
+    posted = [c["body"] for r in provider.reviews for c in r]
+    assert "[R] m2" not in posted and posted.count("[R] m1") == 1
+
+
+def test_batches_respect_payload_size():
+    comments = [{"path": "a.py", "position": n, "body": "x" * 100} for n in range(10)]
+    batches = review_batches(comments, 50, 450)
+    assert [len(b) for b in batches] == [3, 3, 3, 1]
+    assert [c for b in batches for c in b] == comments
+
+
+def test_summary_is_grouped_and_truncated():
+    issues = [_issue(f"f{n % 30}.py", n, rule=f"R{n % 3}", severity="error" if n == 77 else "warning")
+              for n in range(200)]
+    body = format_summary(issues, top=10)
+    assert body.startswith(SUMMARY_MARKER)
+    assert "Total issues detected: 200 in 30 files (1 error, 199 warning)" in body
+    assert "| … 15 more files | |" in body and "| R0 | 67 |" in body
+    top = [line for line in body.splitlines() if line.startswith("- `")]
+    assert len(top) == 10 and top[0].startswith("- `f17.py:77`")
+    assert "- … and 190 more" in body
+
+
+def test_previous_summary_is_updated_in_place():
+    provider = FakeProvider(issue_comments=[{"id": 7, "body": "LGTM", "user": {"login": "dev"}},
+                                            {"id": 8, "body": f"{SUMMARY_MARKER}\nold", "user": BOT}])
+    reporter = GitHubReporter(provider)
+    reporter.post_summary("o/r", 1, [_issue("a.py", 1)])
+    assert provider.posted == [] and provider.updated[0][0] == 8
+
+    fresh = FakeProvider(issue_comments=[{"id": 7, "body": "LGTM"}])
+    GitHubReporter(fresh).post_summary("o/r", 1, [])
+    assert fresh.updated == [] and fresh.posted[0].endswith("No issues detected. PR looks good!")
+
+
+def test_only_our_own_comments_are_matched(monkeypatch):
+    # A quoted summary or a copied comment from someone else is left alone
+    someone = {"login": "dev", "type": "User"}
+    provider = FakeProvider(
+        review_comments=[{"path": "a.py", "line": 1, "side": "RIGHT", "body": "[R] m1", "user": someone}],
+        issue_comments=[{"id": 8, "body": f"{SUMMARY_MARKER}\nquoted", "user": someone}],
+    )
+    reporter = GitHubReporter(provider)
+    reporter.post_inline_comments("o/r", 1, [_issue("a.py", 1)], [{"filename": "a.py", "patch": _patch(1)}])
+    reporter.post_summary("o/r", 1, [])
+    assert [c["body"] for r in provider.reviews for c in r] == ["[R] m1"]
+    assert provider.updated == [] and len(provider.posted) == 1
+
+    # GitHub App tokens can't read their user: comments made by an app count as ours
+    monkeypatch.setattr(provider, "authenticated_login", lambda: None)
+    provider.issue_comments.append({"id": 9, "body": f"{SUMMARY_MARKER}\nold", "user": {"login": "codemate[bot]",
+                                    "type": "Bot"}, "performed_via_github_app": {"slug": "codemate"}})
+    reporter.post_summary("o/r", 1, [])
+    assert provider.updated[0][0] == 9
@@ -0,0 +1,91 @@
+import pytest
+
+from codemate.store import ReviewStore, decode_cursor
+
+
+def _issue(n, severity="warning", rule="E501"):
+    return {"path": f"f{n % 7}.py", "line": n, "severity": severity, "rule": rule, "message": f"m{n}",
+            "suggestion": ""}
+
+
+@pytest.fixture
+def store():
+    store = ReviewStore()
+    yield store
+    store.close()
+
+
+def test_writes_are_batched_and_reviews_update_pull_requests(store):
+    store.upsert_pull_request("o/r", 1, title="Fix it", author="dev", status="pending", head_sha="a1")
+    store.record_review("o/r", 1, "a1", [_issue(n) for n in range(5)], 90, files_count=2)
+    store.record_review("o/r", 1, "b2", [_issue(1, "error", "B105")], 95, since="a1")
+    store.flush()
+
+    assert store.batches <= 3 and store.writes == 3
+    pr = store.list_pull_requests()[0][0]
+    assert (pr["title"], pr["author"], pr["status"], pr["head_sha"], pr["score"]) == \
+        ("Fix it", "dev", "reviewed", "b2", 90)
+    assert store.list_reviews()[0][0]["since"] == "a1"
+    assert store.stats()["issues"] == 6
+
+
+def test_delta_reviews_keep_the_full_review_as_the_pull_requests_view(store):
+    store.record_review("o/r", 1, "a1", [_issue(n) for n in range(40)], 60, files_count=9)
+    store.record_review("o/r", 1, "b2", [], 100, files_count=1, since="a1")
+    store.flush()
+
+    pr = store.list_pull_requests()[0][0]
+    assert (pr["head_sha"], pr["score"]) == ("b2", 60)
+    review = store.latest_review(pr["id"])
+    assert (review["id"], review["head_sha"], review["since"]) == (pr["latest_review_id"], "a1", None)
+    assert len(review["issues"]) == 40
+
+    # The next full review replaces it
+    store.record_review("o/r", 1, "c3", [_issue(1)], 95, files_count=9)
+    store.flush()
+    pr = store.list_pull_requests()[0][0]
+    assert pr["score"] == 95 and store.latest_review(pr["id"])["head_sha"] == "c3"
+
+
+def test_cursor_pagination_and_filters(store):
+    for n in range(25):
+        store.upsert_pull_request("o/a" if n % 2 else "o/b", n, status="reviewed" if n % 3 else "pending")
+    store.flush()
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = store.list_pull_requests(limit=10, cursor=cursor)
+        seen += [r["pr"] for r in rows]
+        if cursor is None:
+            break
+    assert seen == list(range(24, -1, -1))
+
+    rows, cursor = store.list_pull_requests(repo="o/a", status="pending", limit=100)
+    assert [r["pr"] for r in rows] == [21, 15, 9, 3] and cursor is None
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_api_serves_stored_reviews(monkeypatch, store):
+    from fastapi.testclient import TestClient
+    from codemate.webhook import server
+
+    monkeypatch.setattr(server, "get_review_store", lambda: store)
+    for n in range(3):
+        store.record_review("o/r", n, f"h{n}", [_issue(1), _issue(2, "error", "F821")], 93)
+    store.flush()
+
+    client = TestClient(server.app)
+    resp = client.get("/api/pull-requests", params={"limit": 2})
+    assert [pr["number"] for pr in resp.json()] == [2, 1]
+    page = client.get("/api/pull-requests", params={"cursor": resp.headers["X-Next-Cursor"]})
+    assert [pr["number"] for pr in page.json()] == [0] and "X-Next-Cursor" not in page.headers
+    assert client.get("/api/pull-requests", params={"cursor": "bogus"}).status_code == 400
+
+    pr_id = resp.json()[0]["id"]
+    review = client.get(f"/api/reviews/{pr_id}").json()
+    assert review["overallScore"] == 93 and review["pullRequestId"] == pr_id
+    assert [b["rule"] for b in review["possibleBugs"]] == ["F821"]
+    assert [s["rule"] for s in review["suggestions"]] == ["E501"]
+    assert client.get("/api/reviews/999").status_code == 404
+    assert len(client.get("/api/reviews", params={"repo": "o/r"}).json()["reviews"]) == 3
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import codemate
+
+SRC = str(Path(codemate.__file__).resolve().parent.parent)
+
+# Cumulative import time of the CLI module for `--help`, in microseconds.
+# It is a few ms when only argparse is loaded; eager imports of settings,
+# HTTP clients or analyzers cost well over 100 ms.
+CLI_IMPORT_BUDGET_US = 50000
+
+HEAVY = ("requests", "httpx", "pydantic_settings", "unidiff", "uvicorn", "fastapi",
+         "codemate.config", "codemate.pipeline", "codemate.providers.github")
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in (SRC, os.environ.get("PYTHONPATH")) if p))
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, timeout=60)
+
+
+def _import_times(stderr: str) -> dict:
+    """{module: cumulative microseconds} from `python -X importtime` output."""
+    times = {}
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_help_imports_nothing_heavy():
+    proc = _python("-X", "importtime", "-m", "codemate", "--help")
+    assert proc.returncode == 0, proc.stderr
+    assert "--local" in proc.stdout
+
+    times = _import_times(proc.stderr)
+    assert "codemate.cli.cli" in times
+    assert not [m for m in HEAVY if m in times]
+    assert times["codemate.cli.cli"] < CLI_IMPORT_BUDGET_US
+
+
+def test_local_analysis_path_skips_network_libraries():
+    proc = _python("-c", "import sys, codemate.pipeline, codemate.metrics; "
+                         "print(' '.join(m for m in ('requests', 'httpx', 'uvicorn') if m in sys.modules))")
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == ""
@@ -0,0 +1,121 @@
+import hashlib
+import hmac
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from codemate.store import ReviewStore
+from codemate.utils.ttl import TTLCache
+from codemate.webhook import server
+
+SECRET = "s3cret"
+
+
+def _headers(body: bytes, event="pull_request", delivery="d-1"):
+    signature = "sha256=" + hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+    headers = {"X-Hub-Signature-256": signature, "X-GitHub-Event": event, "Content-Type": "application/json"}
+    if delivery:
+        headers["X-GitHub-Delivery"] = delivery
+    return headers
+
+
+def _payload(action="opened", number=7) -> bytes:
+    return json.dumps({"action": action, "repository": {"full_name": "o/r"},
+                       "pull_request": {"number": number, "head": {"sha": "abc"}}}).encode()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    submitted = []
+
+    class Job:
+        id = "job-1"
+
+    def submit_latest(key, revision, fn, *args, **kwargs):
+        submitted.append(key)
+        return Job()
+
+    monkeypatch.setattr(server.settings, "webhook_secret", SECRET)
+    monkeypatch.setattr(server, "seen_deliveries", TTLCache(60, 100))
+    monkeypatch.setattr(server.review_queue, "submit_latest", submit_latest)
+    store = ReviewStore()
+    monkeypatch.setattr(server, "get_review_store", lambda: store)
+    with TestClient(server.app) as c:
+        c.submitted = submitted
+        yield c
+
+
+def test_redelivery_is_deduplicated(client):
+    body = _payload()
+    first = client.post("/webhook", content=body, headers=_headers(body))
+    again = client.post("/webhook", content=body, headers=_headers(body))
+    assert first.status_code == 202
+    assert again.status_code == 200
+    assert again.json()["message"] == "Duplicate delivery ignored"
+    assert client.submitted == [("o/r", 7)]
+
+    other = client.post("/webhook", content=body, headers=_headers(body, delivery="d-2"))
+    assert other.status_code == 202
+    assert len(client.submitted) == 2
+
+
+def test_forged_delivery_does_not_block_the_real_one(client):
+    body = _payload()
+    forged = client.post("/webhook", content=body, headers=dict(_headers(body), **{"X-Hub-Signature-256": "sha256=0"}))
+    assert forged.status_code == 400
+    assert client.post("/webhook", content=body, headers=_headers(body)).status_code == 202
+
+
+def test_failed_enqueue_allows_redelivery(client, monkeypatch):
+    submit_latest = server.review_queue.submit_latest
+    full = [True]
+
+    def maybe_full(*args, **kwargs):
+        if full[0]:
+            raise server.QueueFull()
+        return submit_latest(*args, **kwargs)
+
+    monkeypatch.setattr(server.review_queue, "submit_latest", maybe_full)
+    body = _payload()
+    assert client.post("/webhook", content=body, headers=_headers(body)).status_code == 503
+    full[0] = False
+    assert client.post("/webhook", content=body, headers=_headers(body)).status_code == 202
+
+
+def test_ignored_events_and_actions(client, monkeypatch):
+    # Decided from the header alone; the body is never read or parsed
+    resp = client.post("/webhook", content=b"not json", headers=_headers(b"not json", event="push"))
+    assert resp.json() == {"message": "GitHub event ignored"}
+
+    parsed = []
+    monkeypatch.setattr(server, "loads", lambda data: parsed.append(data) or json.loads(data))
+    body = _payload(action="closed")
+    resp = client.post("/webhook", content=body, headers=_headers(body))
+    assert resp.json() == {"message": "PR action closed ignored"}
+    assert parsed == []
+    assert client.submitted == []
+
+
+def test_body_parsed_once_and_size_limited(client, monkeypatch):
+    parsed = []
+    monkeypatch.setattr(server, "loads", lambda data: parsed.append(data) or json.loads(data))
+    body = json.dumps({"repository": {"full_name": "o/r"}, "action": "synchronize",
+                       "pull_request": {"number": 3}}).encode()
+    assert client.post("/webhook", content=body, headers=_headers(body)).status_code == 202
+    assert len(parsed) == 1
+
+    monkeypatch.setattr(server.settings, "webhook_max_body_bytes", 64)
+    big = _payload() + b" " * 100
+    assert client.post("/webhook", content=big, headers=_headers(big, delivery="d-big")).status_code == 413
+    invalid = b"{broken"
+    assert client.post("/webhook", content=invalid, headers=_headers(invalid, delivery="d-bad")).status_code == 400
+
+
+def test_ttl_cache_add_is_check_and_set():
+    cache = TTLCache(60, 10)
+    assert cache.add("k", 1)
+    assert not cache.add("k", 2)
+    assert cache.get("k") == 1
+    cache.discard("k")
+    assert cache.add("k", 3)
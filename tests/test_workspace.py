@@ -0,0 +1,125 @@
+import os
+import subprocess
+import threading
+
+import pytest
+
+from codemate.workspace import MirrorCache, WorkspaceError, materialized_workspace
+
+
+def _git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def origin(tmp_path):
+    repo = tmp_path / "origin"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+    _git(repo, "config", "user.email", "t@example.com")
+    _git(repo, "config", "user.name", "t")
+    (repo / "pkg").mkdir()
+    (repo / "pkg" / "a.py").write_text("a = 1\n")
+    (repo / "old.py").write_text("old\n")
+    (repo / "setup.cfg").write_text("[flake8]\nmax-line-length = 120\n")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "one")
+    first = _git(repo, "rev-parse", "HEAD")
+    (repo / "pkg" / "a.py").write_text("a = 2\n")
+    (repo / "old.py").unlink()
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "two")
+    return repo, first, _git(repo, "rev-parse", "HEAD")
+
+
+def test_materializes_only_requested_files_at_sha(tmp_path, origin):
+    repo, first, second = origin
+    mirrors = MirrorCache(str(tmp_path / "mirrors"))
+    url = f"file://{repo}"
+
+    with materialized_workspace(mirrors, url, first, ["pkg/a.py", "old.py"]) as ws:
+        assert open(os.path.join(ws, "pkg/a.py")).read() == "a = 1\n"
+        assert os.path.exists(os.path.join(ws, "old.py"))
+        assert os.path.exists(os.path.join(ws, "setup.cfg"))
+    assert not os.path.exists(ws)
+
+    with materialized_workspace(mirrors, url, second, ["pkg/a.py", "old.py"]) as ws:
+        assert open(os.path.join(ws, "pkg/a.py")).read() == "a = 2\n"
+        assert not os.path.exists(os.path.join(ws, "old.py"))
+        assert sorted(os.listdir(ws)) == ["pkg", "setup.cfg"]
+
+
+def test_mirror_is_updated_incrementally(tmp_path, origin):
+    repo, first, _ = origin
+    mirrors = MirrorCache(str(tmp_path / "mirrors"))
+    url = f"file://{repo}"
+    mirror = mirrors.ensure(url, first)
+
+    (repo / "new.py").write_text("n = 1\n")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "three")
+    third = _git(repo, "rev-parse", "HEAD")
+
+    assert mirrors.ensure(url, third) == mirror
+    assert mirrors.materialize(url, third, ["new.py"], str(tmp_path / "ws")) == ["new.py"]
+    with pytest.raises(WorkspaceError):
+        mirrors.ensure(url, "0" * 40)
+
+
+def test_parallel_jobs_share_one_mirror(tmp_path, origin):
+    repo, first, second = origin
+    mirrors = MirrorCache(str(tmp_path / "mirrors"))
+    results, errors = [], []
+
+    def job(i):
+        try:
+            dest = str(tmp_path / f"ws{i}")
+            results.append(mirrors.materialize(f"file://{repo}", (first, second)[i % 2], ["pkg/a.py"], dest))
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=job, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert results == [["pkg/a.py"]] * 6
+    assert len([n for n in os.listdir(tmp_path / "mirrors") if n.endswith(".git")]) == 1
+
+
+def test_least_recently_used_mirror_is_evicted(tmp_path, origin):
+    repo, first, _ = origin
+    clone = tmp_path / "clone"
+    _git(tmp_path, "clone", "-q", str(repo), str(clone))
+
+    mirrors = MirrorCache(str(tmp_path / "mirrors"), budget_bytes=1)
+    old = mirrors.ensure(f"file://{repo}", first)
+    new = mirrors.ensure(f"file://{clone}", first)
+    assert not os.path.exists(old)
+    assert os.path.exists(new)
+
+
+def test_credentials_stay_off_command_lines_config_and_errors(tmp_path, origin, monkeypatch):
+    repo, first, _ = origin
+    url = f"file://x-access-token:s3cret@{repo}"
+    calls = []
+    real_run = subprocess.run
+
+    def run(args, **kwargs):
+        calls.append((args, kwargs.get("env") or {}))
+        return real_run(args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", run)
+    mirrors = MirrorCache(str(tmp_path / "mirrors"), partial_clone=True)
+    mirror = mirrors.ensure(url, first)
+    assert mirrors.materialize(url, first, ["pkg/a.py"], str(tmp_path / "ws")) == ["pkg/a.py"]
+    with pytest.raises(WorkspaceError) as e:
+        mirrors.ensure(url, "0" * 40)
+
+    assert not [args for args, _ in calls if "s3cret" in " ".join(args)]
+    clone_env = next(env for args, env in calls if args[1] == "clone")
+    assert clone_env["GIT_CONFIG_VALUE_" + str(int(clone_env["GIT_CONFIG_COUNT"]) - 1)].startswith(
+        "Authorization: Basic ")
+    assert "s3cret" not in open(os.path.join(mirror, "config")).read()
+    assert "s3cret" not in str(e.value)